@@ -0,0 +1,209 @@
+"""Read-through on-disk cache in front of a Minio client.
+
+    cache = ObjectCache(client, "/var/cache/minio", max_bytes=2 * 1024**3)
+    with cache.get("my-bucket", "config/settings.json") as data:
+        settings = json.loads(data[:])
+
+Objects live under ``<cache_dir>/<hash of bucket/key>/<etag>`` and are
+returned memory-mapped. Entries younger than ``max_age`` seconds are served
+without contacting MinIO; older ones are revalidated with a conditional GET
+(If-None-Match) that also brings the new content when the object changed.
+Total size is bounded with LRU eviction.
+"""
+import hashlib
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from minio import Minio
+from minio.error import InvalidResponseError, ServerError
+
+STREAM_CHUNK = 1024 * 1024
+
+def _not_modified(err) -> bool:
+    """True if a failed conditional GET was a 304 Not Modified"""
+    if isinstance(err, ServerError):
+        return err.status_code == 304
+    # minio raises InvalidResponseError for a 304 that carries an XML
+    # content type, and only keeps the status in a private attribute
+    return getattr(err, '_code', None) == 304
+
+class _Entry:
+    __slots__ = ('path', 'etag', 'size', 'validated_at')
+
+    def __init__(self, path, etag, size, validated_at):
+        self.path = path
+        self.etag = etag
+        self.size = size
+        self.validated_at = validated_at
+
+class ObjectCache:
+    """Size-bounded LRU cache of MinIO objects on local disk"""
+
+    def __init__(self, client: Minio, cache_dir: str, max_bytes: int = 1024 ** 3, max_age: float = 5.0):
+        self.client = client
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.size = 0
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'evictions': 0}
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Index what a previous run left on disk, least recently used first"""
+        found = []
+        for prefix in os.listdir(self.cache_dir):
+            prefix_dir = os.path.join(self.cache_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for digest in os.listdir(prefix_dir):
+                key_dir = os.path.join(prefix_dir, digest)
+                versions = []
+                for name in os.listdir(key_dir):
+                    path = os.path.join(key_dir, name)
+                    if name.endswith('.tmp'):
+                        self._remove_file(path)
+                    else:
+                        versions.append((os.stat(path), name, path))
+                if not versions:
+                    continue
+                # Only the newest version counts, older ones were left behind while mapped
+                versions.sort(key=lambda version: version[0].st_mtime)
+                for _, _, path in versions[:-1]:
+                    self._remove_file(path)
+                stat, name, path = versions[-1]
+                found.append((stat.st_atime, digest, _Entry(path, name, stat.st_size, 0)))
+        for _, digest, entry in sorted(found, key=lambda item: item[0]):
+            self._entries[digest] = entry
+            self.size += entry.size
+        self._evict()
+
+    @staticmethod
+    def _digest(bucket: str, key: str) -> str:
+        return hashlib.sha256(f'{bucket}/{key}'.encode('utf-8')).hexdigest()
+
+    def _key_lock(self, digest: str) -> threading.Lock:
+        """One fetch per object at a time; concurrent readers wait for it instead of piling onto MinIO"""
+        with self._lock:
+            lock = self._key_locks.get(digest)
+            if lock is None:
+                lock = self._key_locks[digest] = threading.Lock()
+            return lock
+
+    #ANCHOR Reads
+    def get(self, bucket: str, key: str):
+        """Return the object's content as a read-only mmap (b'' for empty objects).
+
+        Close the mmap (or use it in a ``with`` block) when done.
+        """
+        for attempt in range(2):
+            entry = self._lookup(bucket, key)
+            if entry.size == 0:
+                return b''
+            try:
+                with open(entry.path, 'rb') as f:
+                    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except FileNotFoundError:
+                # Evicted between lookup and open; the second lookup fetches it again
+                if attempt:
+                    raise
+
+    def get_path(self, bucket: str, key: str) -> str:
+        """Path of the up-to-date cached file, for callers that open it themselves"""
+        return self._lookup(bucket, key).path
+
+    def _lookup(self, bucket: str, key: str) -> _Entry:
+        digest = self._digest(bucket, key)
+        with self._key_lock(digest):
+            with self._lock:
+                entry = self._entries.get(digest)
+                if entry is not None:
+                    self._entries.move_to_end(digest)
+                    if time.monotonic() - entry.validated_at < self.max_age:
+                        self.stats['hits'] += 1
+                        return entry
+
+            headers = {'If-None-Match': f'"{entry.etag}"'} if entry is not None else None
+            try:
+                response = self.client.get_object(bucket, key, request_headers=headers)
+            except (ServerError, InvalidResponseError) as err:
+                if entry is None or not _not_modified(err):
+                    raise
+                with self._lock:
+                    entry.validated_at = time.monotonic()
+                    self.stats['revalidated'] += 1
+                return entry
+
+            try:
+                return self._store(digest, response)
+            finally:
+                response.close()
+                response.release_conn()
+
+    def _store(self, digest: str, response) -> _Entry:
+        """Write a fetched object into its content-addressed file and account for it"""
+        etag = response.headers.get('ETag', '').strip('"') or 'unknown'
+        key_dir = os.path.join(self.cache_dir, digest[:2], digest)
+        os.makedirs(key_dir, exist_ok=True)
+        path = os.path.join(key_dir, etag)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+
+        size = 0
+        with open(tmp_path, 'wb') as f:
+            for chunk in response.stream(STREAM_CHUNK):
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.stats['misses'] += 1
+            old = self._entries.pop(digest, None)
+            if old is not None:
+                self.size -= old.size
+                if old.path != path:
+                    self._remove_file(old.path)
+            entry = self._entries[digest] = _Entry(path, etag, size, time.monotonic())
+            self.size += size
+            self._evict(keep=digest)
+        return entry
+
+    #ANCHOR Eviction
+    def _evict(self, keep: str = None):
+        """Drop least recently used entries until the cache fits (caller holds the lock, or during init)"""
+        while self.size > self.max_bytes and self._entries:
+            digest, entry = next(iter(self._entries.items()))
+            if digest == keep:
+                if len(self._entries) == 1:
+                    # A single object larger than the cache is still served
+                    break
+                self._entries.move_to_end(digest)
+                continue
+            del self._entries[digest]
+            self._key_locks.pop(digest, None)
+            self.size -= entry.size
+            self.stats['evictions'] += 1
+            self._remove_file(entry.path)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            # Still mapped somewhere on Windows; the next start cleans it up
+            pass
+
+    def invalidate(self, bucket: str, key: str):
+        """Forget an object, e.g. after overwriting it"""
+        digest = self._digest(bucket, key)
+        with self._lock:
+            entry = self._entries.pop(digest, None)
+            if entry is not None:
+                self.size -= entry.size
+                self._remove_file(entry.path)
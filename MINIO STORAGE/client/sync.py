@@ -0,0 +1,338 @@
+"""Mirror a local directory to a bucket and back.
+
+    python sync.py push <local dir> <bucket> [--prefix p/] [--delete] [--workers N] [--dry-run]
+    python sync.py pull <bucket> <local dir> [--prefix p/] [--delete] [--workers N] [--dry-run]
+
+Both sides are listed concurrently. Files whose size and ETag already match
+are skipped; local ETags are cached in ``.minio-sync.json`` keyed by size and
+mtime so unchanged files are not re-hashed. Changed files go through a
+bounded worker pool and remote deletions are batched with remove_objects.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from minio import Minio
+from minio.deleteobjects import DeleteObject
+from minio.error import S3Error
+
+from urllib3.exceptions import HTTPError
+
+from transfer import DEFAULT_PART_SIZE, MIB, choose_part_size, create_client, download_file, upload_file
+
+CACHE_FILE = '.minio-sync.json'
+HASH_CHUNK = 4 * MIB
+# Part sizes other tools commonly use, tried when a multipart ETag has to be reproduced
+COMMON_PART_SIZES = (5 * MIB, 8 * MIB, 16 * MIB, 64 * MIB, 128 * MIB)
+
+#ANCHOR Listing
+def list_local(root: str) -> dict:
+    """Map relative path (with /) to (size, mtime_ns) for every file under root"""
+    files = {}
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    rel_path = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                    if rel_path != CACHE_FILE and not rel_path.endswith('.part'):
+                        stat = entry.stat(follow_symlinks=False)
+                        files[rel_path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+def list_remote(client: Minio, bucket: str, prefix: str, pool: ThreadPoolExecutor) -> dict:
+    """Map key (without prefix) to (size, etag), listing each top-level folder in parallel"""
+    objects = {}
+    folders = []
+    for obj in client.list_objects(bucket, prefix=prefix):
+        if obj.is_dir:
+            folders.append(obj.object_name)
+        else:
+            objects[obj.object_name[len(prefix):]] = (obj.size, obj.etag)
+
+    def list_folder(folder):
+        return [
+            (obj.object_name[len(prefix):], (obj.size, obj.etag))
+            for obj in client.list_objects(bucket, prefix=folder, recursive=True)
+            if not obj.object_name.endswith('/')
+        ]
+
+    for listed in pool.map(list_folder, folders):
+        objects.update(listed)
+    return objects
+
+def local_path(root: str, rel_path: str) -> str:
+    """Path of an object key under root; ValueError for keys that would land outside it"""
+    parts = rel_path.split('/')
+    if any(part in ('', '.', '..') or os.path.isabs(part) or os.path.splitdrive(part)[0]
+           or (os.altsep and os.altsep in part) or os.sep in part for part in parts):
+        raise ValueError(f"unsafe object key: {rel_path!r}")
+    path = os.path.join(root, *parts)
+    # Also catches symlinked directories under root that point elsewhere
+    real_root = os.path.realpath(root)
+    if not os.path.realpath(path).startswith(real_root.rstrip(os.sep) + os.sep):
+        raise ValueError(f"object key escapes {root}: {rel_path!r}")
+    return path
+
+#ANCHOR ETags
+def file_etag(path: str, part_size: int = 0) -> str:
+    """S3 ETag of the file: its MD5, or for multipart uploads the MD5 of part MD5s plus -<parts>"""
+    if not part_size:
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    part_digests = []
+    with open(path, 'rb') as f:
+        while True:
+            part = hashlib.md5()
+            remaining = part_size
+            while remaining:
+                chunk = f.read(min(HASH_CHUNK, remaining))
+                if not chunk:
+                    break
+                part.update(chunk)
+                remaining -= len(chunk)
+            if remaining == part_size:
+                break
+            part_digests.append(part.digest())
+    return f'{hashlib.md5(b"".join(part_digests)).hexdigest()}-{len(part_digests)}'
+
+class ChecksumCache:
+    """Per-file ETags remembered while the file's size and mtime stay the same"""
+
+    def __init__(self, root: str):
+        self.path = os.path.join(root, CACHE_FILE)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def _entry(self, rel_path: str, size: int, mtime_ns: int) -> dict:
+        entry = self._entries.get(rel_path)
+        if entry is None or entry['size'] != size or entry['mtime_ns'] != mtime_ns:
+            entry = self._entries[rel_path] = {'size': size, 'mtime_ns': mtime_ns, 'etags': []}
+        return entry
+
+    def matches(self, root: str, rel_path: str, size: int, mtime_ns: int, remote_etag: str) -> bool:
+        """Whether the local file has the given remote ETag, hashing only when the cache can't tell"""
+        with self._lock:
+            etags = list(self._entry(rel_path, size, mtime_ns)['etags'])
+        if remote_etag in etags:
+            return True
+
+        path = os.path.join(root, rel_path)
+        if '-' not in remote_etag:
+            candidates = [0]
+        else:
+            parts = int(remote_etag.rsplit('-', 1)[1])
+            # Only part sizes that split this file into that many parts
+            candidates = [
+                part_size for part_size in dict.fromkeys((choose_part_size(size),) + COMMON_PART_SIZES)
+                if -(-size // part_size) == parts
+            ]
+        for part_size in candidates:
+            etag = file_etag(path, part_size)
+            self.remember(rel_path, size, mtime_ns, etag)
+            if etag == remote_etag:
+                return True
+        return False
+
+    def remember(self, rel_path: str, size: int, mtime_ns: int, etag: str):
+        with self._lock:
+            etags = self._entry(rel_path, size, mtime_ns)['etags']
+            if etag not in etags:
+                etags.append(etag)
+
+    def forget(self, rel_path: str):
+        with self._lock:
+            self._entries.pop(rel_path, None)
+
+    def save(self):
+        with self._lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+
+#ANCHOR Sync
+class SyncResult:
+    def __init__(self):
+        self.transferred = 0
+        self.skipped = 0
+        self.deleted = 0
+        self.errors = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, field: str, size: int = 0):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+            self.bytes += size
+
+def _unchanged(pool: ThreadPoolExecutor, cache: ChecksumCache, root: str, pairs) -> list:
+    """Check (rel_path, size, mtime_ns, remote_etag) tuples in parallel; hashing releases the GIL"""
+    return list(pool.map(lambda pair: cache.matches(root, *pair), pairs))
+
+def _run_transfers(tasks, workers: int, result: SyncResult):
+    """Run (label, size, call) tasks on a bounded pool, counting failures instead of stopping"""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(call): (label, size) for label, size, call in tasks}
+        for future in as_completed(futures):
+            label, size = futures[future]
+            try:
+                future.result()
+                result.add('transferred', size)
+            except (S3Error, OSError, HTTPError) as err:
+                print("Failed:", label, err)
+                result.add('errors')
+
+def push(client: Minio, root: str, bucket: str, prefix: str = '', delete: bool = False,
+         workers: int = 8, dry_run: bool = False) -> SyncResult:
+    """Upload new and changed files under root, optionally deleting remote objects that are gone locally"""
+    result = SyncResult()
+    cache = ChecksumCache(root)
+
+    bucket_exists = client.bucket_exists(bucket)
+    if not bucket_exists and not dry_run:
+        client.make_bucket(bucket)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        local_future = pool.submit(list_local, root)
+        # A bucket a dry run did not create has nothing in it
+        remote = list_remote(client, bucket, prefix, pool) if bucket_exists else {}
+        local = local_future.result()
+
+        # Same size on both sides: compare ETags, anything else is changed
+        same_size = [
+            (rel_path, size, mtime_ns, remote[rel_path][1])
+            for rel_path, (size, mtime_ns) in local.items()
+            if rel_path in remote and remote[rel_path][0] == size
+        ]
+        unchanged = {pair[0] for pair, same in zip(same_size, _unchanged(pool, cache, root, same_size)) if same}
+
+    def upload(rel_path, size, mtime_ns):
+        written = upload_file(client, bucket, prefix + rel_path, os.path.join(root, rel_path), DEFAULT_PART_SIZE, 4)
+        cache.remember(rel_path, size, mtime_ns, written.etag)
+
+    tasks = []
+    for rel_path, (size, mtime_ns) in local.items():
+        if rel_path in unchanged:
+            result.add('skipped')
+            continue
+        print("Upload:", rel_path)
+        if not dry_run:
+            tasks.append((rel_path, size, lambda r=rel_path, s=size, m=mtime_ns: upload(r, s, m)))
+    _run_transfers(tasks, workers, result)
+
+    if delete:
+        stale = [prefix + key for key in remote if key not in local]
+        for key in stale:
+            print("Delete:", key)
+        if stale and not dry_run:
+            # remove_objects sends up to 1000 keys per request and is lazy, so drain it
+            failed = {error.name for error in client.remove_objects(bucket, (DeleteObject(key) for key in stale))}
+            for key in failed:
+                print("Failed to delete:", key)
+            result.deleted += len(stale) - len(failed)
+            result.errors += len(failed)
+
+    if not dry_run:
+        cache.save()
+    return result
+
+def pull(client: Minio, bucket: str, root: str, prefix: str = '', delete: bool = False,
+         workers: int = 8, dry_run: bool = False) -> SyncResult:
+    """Download new and changed objects into root, optionally deleting local files that are gone remotely"""
+    result = SyncResult()
+    if not dry_run:
+        os.makedirs(root, exist_ok=True)
+    cache = ChecksumCache(root)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # A directory a dry run did not create has nothing in it
+        local_future = pool.submit(list_local, root) if os.path.isdir(root) else None
+        remote = list_remote(client, bucket, prefix, pool)
+        local = local_future.result() if local_future is not None else {}
+
+        same_size = [
+            (rel_path, size, local[rel_path][1], etag)
+            for rel_path, (size, etag) in remote.items()
+            if rel_path in local and local[rel_path][0] == size
+        ]
+        unchanged = {pair[0] for pair, same in zip(same_size, _unchanged(pool, cache, root, same_size)) if same}
+
+    def download(rel_path, path, size, etag):
+        if size > DEFAULT_PART_SIZE:
+            download_file(client, bucket, prefix + rel_path, path, DEFAULT_PART_SIZE, 4)
+        else:
+            client.fget_object(bucket, prefix + rel_path, path)
+        stat = os.stat(path)
+        cache.remember(rel_path, stat.st_size, stat.st_mtime_ns, etag)
+
+    tasks = []
+    for rel_path, (size, etag) in remote.items():
+        if rel_path in unchanged:
+            result.add('skipped')
+            continue
+        try:
+            path = local_path(root, rel_path)
+        except ValueError as err:
+            print("Skipped:", err)
+            result.add('errors')
+            continue
+        print("Download:", rel_path)
+        if not dry_run:
+            tasks.append((rel_path, size, lambda r=rel_path, p=path, s=size, e=etag: download(r, p, s, e)))
+    _run_transfers(tasks, workers, result)
+
+    if delete:
+        for rel_path in local:
+            if rel_path not in remote:
+                print("Delete:", rel_path)
+                if not dry_run:
+                    os.remove(local_path(root, rel_path))
+                    cache.forget(rel_path)
+                    result.add('deleted')
+
+    if not dry_run:
+        cache.save()
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync a local directory with a MinIO bucket")
+    parser.add_argument("command", choices=("push", "pull"))
+    parser.add_argument("source", help="local dir (push) or bucket (pull)")
+    parser.add_argument("target", help="bucket (push) or local dir (pull)")
+    parser.add_argument("--prefix", default="", help="object key prefix inside the bucket")
+    parser.add_argument("--delete", action="store_true", help="remove what no longer exists on the source side")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    prefix = args.prefix.strip('/') + '/' if args.prefix.strip('/') else ''
+    # Each transfer may itself run a few parallel parts
+    client = create_client(max_connections=args.workers * 4)
+    started = time.perf_counter()
+    try:
+        if args.command == "push":
+            result = push(client, args.source, args.target, prefix, args.delete, args.workers, args.dry_run)
+        else:
+            result = pull(client, args.source, args.target, prefix, args.delete, args.workers, args.dry_run)
+    except S3Error as err:
+        print("MinIO error:", err)
+        sys.exit(1)
+
+    print(f"{result.transferred} transferred ({result.bytes / MIB:.1f} MiB), {result.skipped} unchanged, "
+          f"{result.deleted} deleted, {result.errors} errors in {time.perf_counter() - started:.1f}s")
+    sys.exit(1 if result.errors else 0)
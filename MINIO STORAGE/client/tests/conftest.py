@@ -0,0 +1,111 @@
+import hashlib
+import os
+import sys
+
+import pytest
+
+# The client scripts are flat and import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from minio.error import InvalidResponseError, ServerError
+
+class FakeObject:
+    def __init__(self, object_name, size=0, etag=None, is_dir=False):
+        self.object_name = object_name
+        self.size = size
+        self.etag = etag
+        self.is_dir = is_dir
+
+class FakeResponse:
+    def __init__(self, data, etag):
+        self.data = data
+        self.headers = {'ETag': f'"{etag}"'}
+
+    def stream(self, chunk_size):
+        for start in range(0, len(self.data), chunk_size):
+            yield self.data[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+class FakeMinio:
+    """In-memory stand-in for the Minio client calls the scripts use; counts every call"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.calls = []
+        # Real servers may send the 304 with an XML content type, which minio
+        # reports as InvalidResponseError instead of ServerError
+        self.xml_not_modified = False
+        # Range offsets whose ranged GET fails with a server error
+        self.failing_offsets = set()
+
+    def put(self, bucket, name, data: bytes):
+        self.buckets.setdefault(bucket, {})[name] = data
+
+    def bucket_exists(self, bucket):
+        return bucket in self.buckets
+
+    def make_bucket(self, bucket):
+        self.buckets[bucket] = {}
+
+    def list_objects(self, bucket, prefix='', recursive=False):
+        folders = set()
+        for name in sorted(self.buckets.get(bucket, {})):
+            if not name.startswith(prefix):
+                continue
+            rest = name[len(prefix):]
+            if not recursive and '/' in rest:
+                folders.add(prefix + rest.split('/', 1)[0] + '/')
+                continue
+            data = self.buckets[bucket][name]
+            yield FakeObject(name, len(data), hashlib.md5(data).hexdigest())
+        for folder in sorted(folders):
+            yield FakeObject(folder, is_dir=True)
+
+    def fput_object(self, bucket, name, path, **options):
+        self.calls.append(('upload', name))
+        with open(path, 'rb') as f:
+            self.put(bucket, name, f.read())
+        return FakeObject(name, etag=hashlib.md5(self.buckets[bucket][name]).hexdigest())
+
+    def fget_object(self, bucket, name, path):
+        self.calls.append(('download', name))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(self.buckets[bucket][name])
+
+    def remove_objects(self, bucket, delete_objects):
+        for delete_object in delete_objects:
+            self.calls.append(('delete', delete_object.name))
+            del self.buckets[bucket][delete_object.name]
+        return iter(())
+
+    def stat_object(self, bucket, name):
+        data = self.buckets[bucket][name]
+        return FakeObject(name, len(data), hashlib.md5(data).hexdigest())
+
+    def get_object(self, bucket, name, offset=0, length=0, request_headers=None):
+        data = self.buckets[bucket][name]
+        etag = hashlib.md5(data).hexdigest()
+        if offset or length:
+            if offset in self.failing_offsets:
+                raise ServerError('range failed', 500)
+            if request_headers and request_headers.get('If-Match') != etag:
+                raise ServerError('precondition failed', 412)
+            self.calls.append(('range', name, offset, length))
+            return FakeResponse(data[offset:offset + length if length else None], etag)
+        if request_headers and request_headers.get('If-None-Match') == f'"{etag}"':
+            self.calls.append(('not modified', name))
+            if self.xml_not_modified:
+                raise InvalidResponseError(304, 'application/xml', None)
+            raise ServerError('not modified', 304)
+        self.calls.append(('get', name))
+        return FakeResponse(data, etag)
+
+@pytest.fixture
+def client():
+    return FakeMinio()
@@ -0,0 +1,73 @@
+from object_cache import ObjectCache
+
+def read(cache, key, bucket='bucket'):
+    data = cache.get(bucket, key)
+    try:
+        return bytes(data[:])
+    finally:
+        if data:
+            data.close()
+
+def test_fresh_entries_are_served_without_contacting_minio(client, tmp_path):
+    client.put('bucket', 'a.txt', b'hello')
+    cache = ObjectCache(client, str(tmp_path), max_age=60)
+    assert read(cache, 'a.txt') == b'hello'
+    assert read(cache, 'a.txt') == b'hello'
+    assert client.calls == [('get', 'a.txt')]
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1
+
+def test_stale_entries_are_revalidated(client, tmp_path):
+    client.put('bucket', 'a.txt', b'hello')
+    cache = ObjectCache(client, str(tmp_path), max_age=0)
+    read(cache, 'a.txt')
+    assert read(cache, 'a.txt') == b'hello'
+    assert client.calls[-1] == ('not modified', 'a.txt')
+
+    client.put('bucket', 'a.txt', b'changed')
+    assert read(cache, 'a.txt') == b'changed'
+    assert cache.stats['revalidated'] == 1 and cache.stats['misses'] == 2
+
+def test_xml_not_modified_responses_count_as_revalidated(client, tmp_path):
+    client.put('bucket', 'a.txt', b'hello')
+    client.xml_not_modified = True
+    cache = ObjectCache(client, str(tmp_path), max_age=0)
+    read(cache, 'a.txt')
+    assert read(cache, 'a.txt') == b'hello'
+    assert client.calls == [('get', 'a.txt'), ('not modified', 'a.txt')]
+    assert cache.stats['revalidated'] == 1
+
+def test_least_recently_used_objects_are_evicted(client, tmp_path):
+    for name in ('a', 'b', 'c'):
+        client.put('bucket', name, name.encode() * 10)
+    cache = ObjectCache(client, str(tmp_path), max_bytes=25, max_age=60)
+    read(cache, 'a')
+    read(cache, 'b')
+    read(cache, 'a')
+    read(cache, 'c')
+    assert cache.size == 20 and cache.stats['evictions'] == 1
+    client.calls.clear()
+    read(cache, 'a')
+    read(cache, 'b')
+    assert client.calls == [('get', 'b')]
+
+def test_cache_survives_a_restart(client, tmp_path):
+    client.put('bucket', 'a.txt', b'hello')
+    read(ObjectCache(client, str(tmp_path), max_age=60), 'a.txt')
+
+    restarted = ObjectCache(client, str(tmp_path), max_age=60)
+    assert restarted.size == 5
+    # Entries from disk are revalidated before use
+    assert read(restarted, 'a.txt') == b'hello'
+    assert client.calls[-1] == ('not modified', 'a.txt')
+
+def test_empty_objects_and_invalidate(client, tmp_path):
+    client.put('bucket', 'empty', b'')
+    client.put('bucket', 'a.txt', b'hello')
+    cache = ObjectCache(client, str(tmp_path), max_age=60)
+    assert cache.get('bucket', 'empty') == b''
+
+    read(cache, 'a.txt')
+    cache.invalidate('bucket', 'a.txt')
+    assert cache.size == 0
+    read(cache, 'a.txt')
+    assert client.calls.count(('get', 'a.txt')) == 2
@@ -0,0 +1,106 @@
+import hashlib
+import os
+
+import pytest
+
+import sync
+
+def write(root, rel_path, data: bytes):
+    path = os.path.join(root, *rel_path.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def test_file_etag_single_and_multipart(tmp_path):
+    data = os.urandom(2500)
+    write(str(tmp_path), 'blob', data)
+    path = str(tmp_path / 'blob')
+
+    assert sync.file_etag(path) == hashlib.md5(data).hexdigest()
+    parts = [hashlib.md5(data[start:start + 1000]).digest() for start in (0, 1000, 2000)]
+    assert sync.file_etag(path, 1000) == hashlib.md5(b''.join(parts)).hexdigest() + '-3'
+
+def test_checksum_cache_skips_rehashing_unchanged_files(tmp_path, monkeypatch):
+    write(str(tmp_path), 'a.txt', b'hello')
+    stat = os.stat(tmp_path / 'a.txt')
+    etag = hashlib.md5(b'hello').hexdigest()
+    cache = sync.ChecksumCache(str(tmp_path))
+    assert cache.matches(str(tmp_path), 'a.txt', stat.st_size, stat.st_mtime_ns, etag)
+    cache.save()
+
+    hashed = []
+    monkeypatch.setattr(sync, 'file_etag', lambda *args: hashed.append(args) or 'different')
+    reloaded = sync.ChecksumCache(str(tmp_path))
+    assert reloaded.matches(str(tmp_path), 'a.txt', stat.st_size, stat.st_mtime_ns, etag)
+    assert hashed == []
+    # A new mtime means the file may have changed and is hashed again
+    assert not reloaded.matches(str(tmp_path), 'a.txt', stat.st_size, stat.st_mtime_ns + 1, etag)
+    assert len(hashed) == 1
+
+def test_push_uploads_only_changed_files_and_deletes_stale(client, tmp_path):
+    root = str(tmp_path)
+    write(root, 'same.txt', b'unchanged')
+    write(root, 'dir/new.txt', b'new file')
+    write(root, 'edited.txt', b'local edit')
+    client.put('bucket', 'p/same.txt', b'unchanged')
+    client.put('bucket', 'p/edited.txt', b'remote old')
+    client.put('bucket', 'p/gone.txt', b'deleted locally')
+
+    result = sync.push(client, root, 'bucket', prefix='p/', delete=True, workers=2)
+    assert sorted(client.calls) == [('delete', 'p/gone.txt'), ('upload', 'p/dir/new.txt'), ('upload', 'p/edited.txt')]
+    assert (result.transferred, result.skipped, result.deleted, result.errors) == (2, 1, 1, 0)
+    assert client.buckets['bucket']['p/edited.txt'] == b'local edit'
+
+    # A second run finds nothing to do
+    client.calls.clear()
+    result = sync.push(client, root, 'bucket', prefix='p/', delete=True, workers=2)
+    assert client.calls == [] and result.skipped == 3
+
+def test_pull_downloads_changed_objects(client, tmp_path):
+    root = str(tmp_path)
+    client.put('bucket', 'same.txt', b'unchanged')
+    client.put('bucket', 'dir/new.txt', b'new object')
+    write(root, 'same.txt', b'unchanged')
+    write(root, 'stale.txt', b'only local')
+
+    result = sync.pull(client, 'bucket', root, delete=True, workers=2)
+    assert client.calls == [('download', 'dir/new.txt')]
+    assert (result.transferred, result.skipped, result.deleted) == (1, 1, 1)
+    assert not os.path.exists(os.path.join(root, 'stale.txt'))
+    with open(os.path.join(root, 'dir', 'new.txt'), 'rb') as f:
+        assert f.read() == b'new object'
+
+def test_dry_run_changes_nothing(client, tmp_path):
+    root = str(tmp_path / 'local')
+    write(root, 'a.txt', b'local')
+    result = sync.push(client, root, 'bucket', dry_run=True)
+    # Neither the bucket nor the checksum cache was created
+    assert client.calls == [] and client.buckets == {}
+    assert os.listdir(root) == ['a.txt']
+    assert result.transferred == 0
+
+    client.put('bucket', 'b.txt', b'remote')
+    missing = str(tmp_path / 'missing')
+    result = sync.pull(client, 'bucket', missing, delete=True, dry_run=True)
+    assert client.calls == [] and not os.path.exists(missing)
+    result = sync.pull(client, 'bucket', root, delete=True, dry_run=True)
+    assert client.calls == [] and os.listdir(root) == ['a.txt']
+
+@pytest.mark.parametrize('key', ['a/../../outside.txt', '/etc/outside.txt', 'a/./b.txt', 'a//b.txt'])
+def test_pull_rejects_keys_outside_the_target(client, tmp_path, key):
+    root = tmp_path / 'target'
+    client.put('bucket', key, b'payload')
+    client.put('bucket', 'ok.txt', b'fine')
+
+    result = sync.pull(client, 'bucket', str(root))
+    assert result.errors == 1 and result.transferred == 1
+    assert client.calls == [('download', 'ok.txt')]
+    assert not (tmp_path / 'outside.txt').exists()
+
+def test_local_path_rejects_symlinks_out_of_root(tmp_path):
+    root = tmp_path / 'root'
+    root.mkdir()
+    (root / 'link').symlink_to(tmp_path)
+    with pytest.raises(ValueError):
+        sync.local_path(str(root), 'link/escaped.txt')
+    assert sync.local_path(str(root), 'dir/file.txt') == os.path.join(str(root), 'dir', 'file.txt')
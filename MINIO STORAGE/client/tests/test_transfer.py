@@ -0,0 +1,31 @@
+import os
+
+import pytest
+from minio.error import ServerError
+
+from transfer import download_file
+
+DATA = bytes(range(256)) * 40
+
+def test_ranges_are_reassembled_in_order(client, tmp_path):
+    client.put('bucket', 'big.bin', DATA)
+    path = tmp_path / 'out' / 'big.bin'
+    assert download_file(client, 'bucket', 'big.bin', str(path), part_size=4096, workers=3) == len(DATA)
+
+    assert path.read_bytes() == DATA
+    # The last range only covers what is left of the object
+    assert sorted(call[2:] for call in client.calls) == [(0, 4096), (4096, 4096), (8192, 2048)]
+    assert os.listdir(tmp_path / 'out') == ['big.bin']
+
+def test_failed_range_leaves_no_partial_file(client, tmp_path):
+    client.put('bucket', 'big.bin', DATA)
+    client.failing_offsets.add(4096)
+    path = tmp_path / 'big.bin'
+    path.write_bytes(b'previous version')
+
+    with pytest.raises(ServerError):
+        download_file(client, 'bucket', 'big.bin', str(path), part_size=4096, workers=3)
+
+    # The old file is untouched and the half-written download is gone
+    assert path.read_bytes() == b'previous version'
+    assert os.listdir(tmp_path) == ['big.bin']
@@ -0,0 +1,167 @@
+"""Parallel transfers of large objects with bounded memory.
+
+    python transfer.py upload <bucket> <object> <file> [--part-size MB] [--workers N]
+    python transfer.py download <bucket> <object> <file> [--part-size MB] [--workers N]
+
+Uploads stream the file through multipart upload with parts sent in
+parallel; downloads fetch byte ranges in parallel and write them in place
+into a preallocated file. At most ``workers`` parts (uploads) or
+``workers`` streaming chunks (downloads) are held in memory at a time.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import certifi
+import urllib3
+from minio import Minio
+from minio.error import S3Error
+from urllib3.exceptions import HTTPError
+
+MIB = 1024 * 1024
+# S3 multipart limits: parts of at least 5 MiB, at most 10000 parts
+MIN_PART_SIZE = 5 * MIB
+MAX_PARTS = 10000
+DEFAULT_PART_SIZE = 16 * MIB
+DEFAULT_WORKERS = 8
+# Bytes read from a ranged GET before they are written out
+STREAM_CHUNK = MIB
+RANGE_RETRIES = 3
+
+def create_client(max_connections: int = 32) -> Minio:
+    """Minio client from the MINIO_* variables with a connection pool sized for parallel transfers"""
+    secure = os.getenv("MINIO_USE_SSL", "false").lower() == "true"
+    timeout = 300
+    http_client = urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=timeout, read=timeout),
+        maxsize=max_connections,
+        cert_reqs='CERT_REQUIRED',
+        ca_certs=os.environ.get('SSL_CERT_FILE') or certifi.where(),
+        retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+    )
+    return Minio(
+        os.getenv("MINIO_ENDPOINT", "localhost:9000"),
+        access_key=os.getenv("MINIO_ACCESS_KEY", "minioadmin"),
+        secret_key=os.getenv("MINIO_SECRET_KEY", "minioadmin123"),
+        secure=secure,
+        http_client=http_client
+    )
+
+def choose_part_size(size: int, part_size: int = DEFAULT_PART_SIZE) -> int:
+    """Grow part_size in MiB steps until the object fits in MAX_PARTS parts"""
+    part_size = max(part_size, MIN_PART_SIZE)
+    while size > part_size * MAX_PARTS:
+        part_size += MIN_PART_SIZE
+    return part_size
+
+#ANCHOR Upload
+def upload_file(client: Minio, bucket: str, object_name: str, path: str,
+                part_size: int = DEFAULT_PART_SIZE, workers: int = DEFAULT_WORKERS,
+                content_type: str = "application/octet-stream"):
+    """Upload a local file with parallel multipart upload.
+
+    minio's multipart upload reads one part per worker and blocks the reader
+    while all workers are busy, so memory stays at about workers * part_size.
+    """
+    size = os.path.getsize(path)
+    return client.fput_object(
+        bucket, object_name, path,
+        content_type=content_type,
+        part_size=choose_part_size(size, part_size),
+        num_parallel_uploads=workers
+    )
+
+#ANCHOR Download
+def _preallocate(path: str, size: int):
+    with open(path, 'wb') as f:
+        if size and hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(f.fileno(), 0, size)
+        else:
+            f.truncate(size)
+
+def _download_range(client: Minio, bucket: str, object_name: str, etag: str, path: str, offset: int, length: int):
+    """Fetch one byte range and write it in place, retrying from where it stopped"""
+    written = 0
+    attempt = 0
+    with open(path, 'r+b') as f:
+        while written < length:
+            response = None
+            try:
+                # If-Match: every range must come from the same object version
+                response = client.get_object(
+                    bucket, object_name,
+                    offset=offset + written,
+                    length=length - written,
+                    request_headers={'If-Match': etag}
+                )
+                f.seek(offset + written)
+                for chunk in response.stream(STREAM_CHUNK):
+                    f.write(chunk)
+                    written += len(chunk)
+            except HTTPError:
+                attempt += 1
+                if attempt > RANGE_RETRIES:
+                    raise
+            finally:
+                if response is not None:
+                    response.close()
+                    response.release_conn()
+    return length
+
+def download_file(client: Minio, bucket: str, object_name: str, path: str,
+                  part_size: int = DEFAULT_PART_SIZE, workers: int = DEFAULT_WORKERS) -> int:
+    """Download an object with parallel ranged GETs; returns its size.
+
+    Data lands in ``path + '.part'`` which replaces ``path`` only once every
+    range has been written.
+    """
+    stat = client.stat_object(bucket, object_name)
+    size = stat.size
+    tmp_path = path + '.part'
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    _preallocate(tmp_path, size)
+
+    try:
+        ranges = [(offset, min(part_size, size - offset)) for offset in range(0, size, part_size)]
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(ranges)))) as pool:
+            futures = [
+                pool.submit(_download_range, client, bucket, object_name, stat.etag, tmp_path, offset, length)
+                for offset, length in ranges
+            ]
+            for future in futures:
+                future.result()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return size
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel MinIO upload/download")
+    parser.add_argument("command", choices=("upload", "download"))
+    parser.add_argument("bucket")
+    parser.add_argument("object")
+    parser.add_argument("file")
+    parser.add_argument("--part-size", type=int, default=DEFAULT_PART_SIZE // MIB, help="MiB per part / range")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    client = create_client(max_connections=args.workers * 2)
+    started = time.perf_counter()
+    try:
+        if args.command == "upload":
+            result = upload_file(client, args.bucket, args.object, args.file, args.part_size * MIB, args.workers)
+            size = os.path.getsize(args.file)
+            print("Uploaded object:", result.object_name, "etag", result.etag)
+        else:
+            size = download_file(client, args.bucket, args.object, args.file, args.part_size * MIB, args.workers)
+            print("Downloaded object:", args.object, "to", args.file)
+    except S3Error as err:
+        print("MinIO error:", err)
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - started
+    print(f"{size / MIB:.1f} MiB in {elapsed:.2f}s ({size / MIB / elapsed:.1f} MiB/s)")
@@ -0,0 +1,63 @@
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    """Operations per second and latency percentiles in milliseconds"""
+    values = sorted(latencies)
+    result = {
+        'count': len(values),
+        'errors': errors,
+        'elapsed': round(elapsed, 3),
+        'ops_per_sec': round(len(values) / elapsed, 1) if elapsed else 0
+    }
+    if values:
+        result['latency_ms'] = {
+            'mean': round(sum(values) / len(values) * 1000, 3),
+            'p50': round(percentile(values, 50) * 1000, 3),
+            'p95': round(percentile(values, 95) * 1000, 3),
+            'p99': round(percentile(values, 99) * 1000, 3),
+            'max': round(values[-1] * 1000, 3)
+        }
+    return result
+
+def run_operation(call: Callable[[int], object], iterations: int, concurrency: int = 1,
+                  max_seconds: float = 30) -> Dict:
+    """Run call(i) for i in range(iterations) on ``concurrency`` threads.
+
+    Stops early once ``max_seconds`` have passed, so slow backends still
+    finish in bounded time. A call that raises counts as an error.
+    """
+    counter = itertools.count()
+    deadline = time.perf_counter() + max_seconds
+
+    def worker():
+        latencies = []
+        errors = 0
+        while True:
+            i = next(counter)
+            if i >= iterations or time.perf_counter() > deadline:
+                return latencies, errors
+            started = time.perf_counter()
+            try:
+                call(i)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [future.result() for future in [pool.submit(worker) for _ in range(concurrency)]]
+    elapsed = time.perf_counter() - started
+
+    return summarize(
+        [latency for latencies, _ in results for latency in latencies],
+        sum(errors for _, errors in results),
+        elapsed
+    )
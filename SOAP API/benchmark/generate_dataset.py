@@ -0,0 +1,85 @@
+"""Generate a reproducible todos dataset.
+
+    python generate_dataset.py --rows 100k --output data/bench-100k.json [--sqlite]
+
+The same --rows and --seed always produce the same file.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+WORDS = (
+    'buy', 'call', 'review', 'write', 'fix', 'plan', 'book', 'clean', 'send', 'read',
+    'milk', 'report', 'invoice', 'meeting', 'garden', 'car', 'tickets', 'email', 'budget', 'slides',
+    'weekly', 'urgent', 'team', 'client', 'release', 'draft', 'kitchen', 'doctor', 'taxes', 'backup'
+)
+
+def parse_rows(value: str) -> int:
+    value = value.lower()
+    if value in SIZES:
+        return SIZES[value]
+    return int(value.replace('_', ''))
+
+def generate_todos(rows: int, seed: int = 42, completed_ratio: float = 0.3):
+    """Yield todos with ids 1..rows"""
+    rng = random.Random(seed)
+    for todo_id in range(1, rows + 1):
+        yield {
+            'id': todo_id,
+            'title': ' '.join(rng.choices(WORDS, k=rng.randint(2, 5))).capitalize(),
+            'description': ' '.join(rng.choices(WORDS, k=rng.randint(5, 20))),
+            'completed': rng.random() < completed_ratio
+        }
+
+def write_dataset(path: str, rows: int, seed: int = 42, completed_ratio: float = 0.3):
+    """Write the dataset as the JSON array the file backends read, one todo per line"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write('[\n')
+        for todo in generate_todos(rows, seed, completed_ratio):
+            if todo['id'] > 1:
+                f.write(',\n')
+            f.write(json.dumps(todo))
+        f.write('\n]\n')
+    os.replace(tmp_path, path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a todos dataset')
+    parser.add_argument('--rows', default='1k', help='1k, 100k, 1m or a number')
+    parser.add_argument('--output', '-o', help='default: data/bench-<rows>.json')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--completed-ratio', type=float, default=0.3)
+    parser.add_argument('--sqlite', action='store_true', help='also build the matching SQLite database')
+    args = parser.parse_args(argv)
+    try:
+        rows = parse_rows(args.rows)
+    except ValueError:
+        parser.error(f"invalid --rows value: {args.rows!r}")
+
+    # Named after --rows as given, so 100k lands in data/bench-100k.json
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', f'bench-{args.rows.lower()}.json'
+    )
+    started = time.perf_counter()
+    write_dataset(output, rows, args.seed, args.completed_ratio)
+    print(f"Wrote {rows} todos to {output} in {time.perf_counter() - started:.1f}s")
+
+    if args.sqlite:
+        from sqlite_storage import SQLiteTodoStorage
+        db_path = os.path.splitext(output)[0] + '.db'
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        started = time.perf_counter()
+        SQLiteTodoStorage(output, db_path=db_path)
+        print(f"Built {db_path} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == '__main__':
+    main()
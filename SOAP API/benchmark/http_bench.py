@@ -0,0 +1,146 @@
+"""Benchmark the SOAP service over HTTP.
+
+    python http_bench.py --url http://localhost:8000/ --concurrency 16 --iterations 2000
+
+Sends prebuilt SOAP envelopes over keep-alive http.client connections, one
+per worker thread, so the client stays cheap next to the server. Operations
+run one after another: create_todo, get_todo, get_all_todos, update_todo,
+delete_todo (which removes the todos created earlier). Results are printed
+as JSON.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import sys
+import threading
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+from common import run_operation
+
+OPERATIONS = ('create_todo', 'get_todo', 'get_all_todos', 'update_todo', 'delete_todo')
+
+ENVELOPE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tns="todo.soap.service">'
+    '<soapenv:Body><tns:{operation}>{params}</tns:{operation}></soapenv:Body></soapenv:Envelope>'
+)
+
+TODO_ID = re.compile(rb'<(?:\w+:)?id>(\d+)</')
+FAILED = re.compile(rb'<(?:\w+:)?success>false</|Fault>')
+
+def envelope(operation: str, **params) -> bytes:
+    body = ''.join(
+        f'<tns:{name}>{escape(str(value).lower() if isinstance(value, bool) else str(value))}</tns:{name}>'
+        for name, value in params.items()
+    )
+    return ENVELOPE.format(operation=operation, params=body).encode('utf-8')
+
+class SoapCaller:
+    """Posts envelopes over one keep-alive connection per thread"""
+
+    def __init__(self, url: str, timeout: float = 30):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or '/'
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def call(self, operation: str, body: bytes) -> bytes:
+        """Send one request; raises on transport errors and SOAP failures"""
+        conn = self._connection()
+        try:
+            conn.request('POST', self.path, body, {
+                'Content-Type': 'text/xml; charset=utf-8',
+                'SOAPAction': f'"{operation}"'
+            })
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            # Reconnect on the next call
+            conn.close()
+            self._local.conn = None
+            raise
+        if response.will_close:
+            conn.close()
+            self._local.conn = None
+        if response.status != 200 or FAILED.search(data):
+            raise RuntimeError(f'{operation} failed with HTTP {response.status}')
+        return data
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the SOAP service over HTTP')
+    parser.add_argument('--url', default=os.getenv('SOAP_URL', 'http://localhost:8000/'))
+    parser.add_argument('--operations', default=','.join(OPERATIONS), help='comma separated')
+    parser.add_argument('--iterations', type=int, default=1000, help='calls per operation')
+    parser.add_argument('--get-all-iterations', type=int, default=20, help='get_all_todos returns every row')
+    parser.add_argument('--concurrency', '-c', type=int, default=8)
+    parser.add_argument('--max-seconds', type=float, default=30, help='time budget per operation')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', '-o', help='also write the JSON result to this file')
+    args = parser.parse_args(argv)
+
+    operations = [name.strip() for name in args.operations.split(',')]
+    for name in operations:
+        if name not in OPERATIONS:
+            parser.error(f"unknown operation: {name}")
+
+    caller = SoapCaller(args.url)
+    rng = random.Random(args.seed)
+    created_ids = []
+
+    def create(i):
+        data = caller.call('create_todo', envelope('create_todo', title=f'Bench todo {i}', description='created by http_bench'))
+        created_ids.append(int(TODO_ID.search(data).group(1)))
+
+    # Reads and updates target the todos this run created, so any dataset works
+    def pick(i):
+        return created_ids[rng.randrange(len(created_ids))]
+
+    calls = {
+        'create_todo': create,
+        'get_todo': lambda i: caller.call('get_todo', envelope('get_todo', todo_id=pick(i))),
+        'get_all_todos': lambda i: caller.call('get_all_todos', envelope('get_all_todos')),
+        'update_todo': lambda i: caller.call('update_todo', envelope('update_todo', todo_id=pick(i), completed=i % 2 == 0)),
+        'delete_todo': lambda i: caller.call('delete_todo', envelope('delete_todo', todo_id=created_ids[i])),
+    }
+
+    results = {}
+    for operation in operations:
+        if operation in ('get_todo', 'update_todo', 'delete_todo') and not created_ids:
+            print(f"Skipping {operation}: run create_todo first", file=sys.stderr)
+            continue
+        iterations = {
+            'get_all_todos': args.get_all_iterations,
+            'delete_todo': len(created_ids),
+        }.get(operation, args.iterations)
+        results[operation] = run_operation(calls[operation], iterations, args.concurrency, args.max_seconds)
+        print(f"{operation:14} {results[operation]['ops_per_sec']:>10} ops/s", file=sys.stderr)
+
+    result = {
+        'config': {
+            'url': args.url,
+            'iterations': args.iterations,
+            'concurrency': args.concurrency
+        },
+        'operations': results
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+if __name__ == '__main__':
+    main()
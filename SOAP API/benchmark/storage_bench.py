@@ -0,0 +1,112 @@
+"""Benchmark the storage backends directly, without HTTP.
+
+    python storage_bench.py --dataset ../data/bench-100k.json --backends indexed,journal,sqlite --threads 8
+
+Each backend runs against its own temporary copy of the dataset. Results
+(operations per second and latency percentiles per operation and backend)
+are printed as JSON.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import run_operation
+from group_commit import GroupCommitStorage
+from storage import STORAGE_BACKENDS, create_storage
+
+OPERATIONS = ('create', 'read', 'read_page', 'read_all', 'update', 'delete')
+
+def benchmark_backend(backend: str, dataset: str, args) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f'todo-bench-{backend}-')
+    try:
+        data_file = os.path.join(workdir, 'todos.json')
+        shutil.copyfile(dataset, data_file)
+        options = {'db_path': os.path.join(workdir, 'todos.db')} if backend == 'sqlite' else {}
+
+        started = time.perf_counter()
+        storage = create_storage(backend, data_file, **options)
+        load_seconds = time.perf_counter() - started
+        if args.group_commit:
+            storage = GroupCommitStorage(storage)
+
+        existing_ids = [todo['id'] for todo in storage.read_all()]
+        rng = random.Random(args.seed)
+        # Fixed per-iteration inputs so every backend does the same work
+        read_ids = [rng.choice(existing_ids) for _ in range(args.iterations)] if existing_ids else []
+        created_ids = []
+
+        calls = {
+            'create': lambda i: created_ids.append(storage.create(f'Bench todo {i}', 'created by storage_bench')['id']),
+            'read': lambda i: storage.read(read_ids[i]),
+            'read_page': lambda i: storage.read_page(100, after_id=read_ids[i]),
+            'read_all': lambda i: storage.read_all(),
+            'update': lambda i: storage.update(read_ids[i], completed=i % 2 == 0),
+            # Remove what create added so the dataset keeps its size
+            'delete': lambda i: storage.delete(created_ids[i]),
+        }
+
+        results = {}
+        for operation in args.operations:
+            if operation in ('read', 'read_page', 'update') and not read_ids:
+                continue
+            iterations = {
+                'read_all': args.read_all_iterations,
+                'delete': len(created_ids),
+            }.get(operation, args.iterations)
+            results[operation] = run_operation(calls[operation], iterations, args.threads, args.max_seconds)
+            print(f"{backend:8} {operation:10} {results[operation]['ops_per_sec']:>10} ops/s", file=sys.stderr)
+
+        return {
+            'rows': len(existing_ids),
+            'load_seconds': round(load_seconds, 3),
+            'operations': results
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark TodoStorage backends')
+    parser.add_argument('--dataset', required=True, help='JSON file from generate_dataset.py')
+    parser.add_argument('--backends', default=','.join(STORAGE_BACKENDS), help='comma separated')
+    parser.add_argument('--operations', default=','.join(OPERATIONS), help='comma separated')
+    parser.add_argument('--iterations', type=int, default=1000, help='calls per operation')
+    parser.add_argument('--read-all-iterations', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--max-seconds', type=float, default=30, help='time budget per operation')
+    parser.add_argument('--group-commit', action='store_true', help='wrap backends in GroupCommitStorage')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', '-o', help='also write the JSON result to this file')
+    args = parser.parse_args(argv)
+
+    args.operations = [name.strip() for name in args.operations.split(',')]
+    for name in args.operations:
+        if name not in OPERATIONS:
+            parser.error(f"unknown operation: {name}")
+
+    result = {
+        'config': {
+            'dataset': args.dataset,
+            'iterations': args.iterations,
+            'threads': args.threads,
+            'group_commit': args.group_commit
+        },
+        'backends': {
+            backend: benchmark_backend(backend, args.dataset, args)
+            for backend in (name.strip() for name in args.backends.split(','))
+        }
+    }
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from todo_record import TodoRecord
+
+class Change:
+    """One committed mutation: 'create', 'update' or a 'delete' tombstone without a todo"""
+
+    __slots__ = ('version', 'operation', 'todo_id', 'todo')
+
+    def __init__(self, version: int, operation: str, todo_id: int, todo: Optional[TodoRecord]):
+        self.version = version
+        self.operation = operation
+        self.todo_id = todo_id
+        self.todo = todo
+
+class ChangeFeed:
+    """Ring buffer of the most recent changes, one per storage version.
+
+    The buffer always holds every change from ``floor + 1`` to ``latest``
+    without gaps, so any version in ``[floor, latest]`` can be answered by
+    position. Older versions fell out of the buffer and need a snapshot.
+    """
+
+    def __init__(self, capacity: int = 10000, version: int = 0):
+        self._changes = deque(maxlen=max(capacity, 1))
+        self._lock = threading.Lock()
+        self.floor = version
+        self.latest = version
+
+    def append(self, version: int, operation: str, todo_id: int, todo: Optional[TodoRecord]):
+        with self._lock:
+            if version != self.latest + 1:
+                # Versions were used without passing through the feed (a rolled back
+                # transaction), history before this one is unknown
+                self._changes.clear()
+                self.floor = version - 1
+            elif len(self._changes) == self._changes.maxlen:
+                self.floor = self._changes[0].version
+            self._changes.append(Change(version, operation, todo_id, todo))
+            self.latest = version
+
+    def reset(self, version: int):
+        """Forget all history, e.g. after every todo was replaced"""
+        with self._lock:
+            self._changes.clear()
+            self.floor = self.latest = version
+
+    def since(self, version: int, limit: int) -> Optional[Tuple[List[Change], bool]]:
+        """Up to ``limit`` changes after ``version`` and whether more follow.
+
+        None when the feed cannot tell, because the version is older than
+        the buffer or newer than anything it has seen.
+        """
+        with self._lock:
+            if version < self.floor or version > self.latest:
+                return None
+            start = version - self.floor
+            changes = list(islice(self._changes, start, start + limit))
+            return changes, version + len(changes) < self.latest
+
+class ChangeFeedStorage:
+    """Publishes every committed mutation of the wrapped storage to a ChangeFeed.
+
+    Each mutation runs inside a storage transaction, so the version read
+    right after it is its own. Changes are published only once their
+    transaction commits. Reads pass through to the wrapped storage. The feed
+    lives in this process, which is all the json, indexed and journal backends
+    support; SQLite keeps its own feed in the database.
+    """
+
+    def __init__(self, storage, capacity: int = 10000):
+        self.storage = storage
+        self.feed = ChangeFeed(capacity, storage.version)
+        self._local = threading.local()
+        # Held from the start of a transaction until its changes are published,
+        # so the feed sees versions in commit order
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    @contextmanager
+    def transaction(self):
+        """Storage transaction whose changes reach the feed when it commits"""
+        if getattr(self._local, 'pending', None) is not None:
+            # Nested use joins the outer transaction
+            yield
+            return
+
+        with self._lock:
+            self._local.pending = []
+            try:
+                with self.storage.transaction():
+                    yield
+                for version, operation, todo_id, todo in self._local.pending:
+                    if operation == 'reset':
+                        self.feed.reset(version)
+                    else:
+                        self.feed.append(version, operation, todo_id, todo)
+            finally:
+                self._local.pending = None
+
+    def _record(self, operation: str, todo_id: int = None, todo: Dict = None):
+        if todo is not None:
+            # Records are immutable, the plain json backend keeps mutating its dicts
+            todo = TodoRecord.from_dict(todo)
+        self._local.pending.append((self.storage.version, operation, todo_id, todo))
+
+    #ANCHOR Mutations
+    def write_all(self, todos: List[Dict]):
+        """Replace all todos; readers of the feed fall back to a snapshot"""
+        with self.transaction():
+            self.storage.write_all(todos)
+            self._record('reset')
+
+    def create(self, title: str, description: str) -> Dict:
+        """Create a new todo"""
+        with self.transaction():
+            todo = self.storage.create(title, description)
+            self._record('create', todo['id'], todo)
+        return todo
+
+    def update(self, todo_id: int, title: str = None, description: str = None, completed: bool = None) -> Optional[Dict]:
+        """Update a todo"""
+        with self.transaction():
+            todo = self.storage.update(todo_id, title, description, completed)
+            if todo is not None:
+                self._record('update', todo_id, todo)
+        return todo
+
+    def delete(self, todo_id: int) -> bool:
+        """Delete a todo"""
+        with self.transaction():
+            deleted = self.storage.delete(todo_id)
+            if deleted:
+                self._record('delete', todo_id)
+        return deleted
+
+    #ANCHOR Reads
+    def changes_since(self, version: int, limit: int) -> Optional[Tuple[List[Change], bool]]:
+        """Changes after ``version``, or None when the caller needs a snapshot"""
+        with self._lock:
+            current = self.storage.version
+            if current != self.feed.latest:
+                # Versions used outside the feed (a rolled back transaction);
+                # older callers get a snapshot
+                self.feed.reset(current)
+            return self.feed.since(version, limit)
+
+    def snapshot(self) -> Tuple[int, List[Dict]]:
+        """Every todo and the version they are current as of"""
+        with self._lock:
+            return self.storage.version, self.storage.read_all()
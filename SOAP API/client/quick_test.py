@@ -1,9 +1,11 @@
 from zeep import Client
+import os
 import sys
 
 try:
     print("Connecting to SOAP service...")
-    wsdl = 'http://localhost:8000/?wsdl'
+    # SOAP_WSDL may point at a local copy (see wsdl_cache.py) to skip the fetch
+    wsdl = os.getenv('SOAP_WSDL', 'http://localhost:8000/?wsdl')
     client = Client(wsdl=wsdl)
     print("WSDL loaded successfully!")
     
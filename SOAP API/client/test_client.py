@@ -4,7 +4,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import cgi_compat
 from zeep import Client
 
-wsdl = 'http://localhost:8000/?wsdl'
+# SOAP_WSDL may point at a local copy (see wsdl_cache.py) to skip the fetch
+wsdl = os.getenv('SOAP_WSDL', 'http://localhost:8000/?wsdl')
 client = Client(wsdl=wsdl)
 
 def test_crud_operations():
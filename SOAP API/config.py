@@ -5,8 +5,74 @@ load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 SOAP_HOST = os.getenv('SOAP_HOST', 'localhost')
 SOAP_PORT = int(os.getenv('SOAP_PORT', 8000))
+# Service address written into the WSDL
+SOAP_PUBLIC_URL = os.getenv('SOAP_URL', f'http://{SOAP_HOST}:{SOAP_PORT}').rstrip('/') + '/'
 
-DATA_FILE = os.path.join(os.path.dirname(__file__), 'data', 'todos.json')
+# Prebuilt WSDL, regenerated when todo_service.py or SOAP_URL changes
+WSDL_FILE = os.getenv('WSDL_FILE', os.path.join(os.path.dirname(__file__), 'data', 'todo_service.wsdl'))
+WSDL_MAX_AGE = int(os.getenv('WSDL_MAX_AGE', 3600))
+
+# simple: single-threaded wsgiref, threaded: bounded thread pool with keep-alive,
+# prefork: SERVER_WORKERS processes sharing the listening socket (0 = one per core),
+# only with STORAGE_BACKEND=sqlite; other backends fall back to threaded
+SERVER_MODE = os.getenv('SERVER_MODE', 'simple').lower()
+SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', 0))
+SERVER_THREADS = int(os.getenv('SERVER_THREADS', 16))
+SERVER_BACKLOG = int(os.getenv('SERVER_BACKLOG', 128))
+KEEPALIVE_TIMEOUT = float(os.getenv('KEEPALIVE_TIMEOUT', 5))
+
+DATA_FILE = os.getenv('DATA_FILE', os.path.join(os.path.dirname(__file__), 'data', 'todos.json'))
+
+# json: re-read the file on every call, indexed: load once and serve from memory,
+# journal: indexed plus an append-only log that is compacted into the data file,
+# sqlite: SQLite database (seeded from the data file on first start)
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'json').lower()
+
+JOURNAL_COMPACT_BYTES = int(os.getenv('JOURNAL_COMPACT_BYTES', 1024 * 1024))
+JOURNAL_FSYNC = os.getenv('JOURNAL_FSYNC', 'true').lower() == 'true'
+
+SQLITE_FILE = os.getenv('SQLITE_FILE', os.path.join(os.path.dirname(__file__), 'data', 'todos.db'))
+
+# Group commit: coalesce concurrent mutations into one durable write
+GROUP_COMMIT = os.getenv('GROUP_COMMIT', 'false').lower() == 'true'
+GROUP_COMMIT_WINDOW_MS = float(os.getenv('GROUP_COMMIT_WINDOW_MS', 2))
+GROUP_COMMIT_MAX_BATCH = int(os.getenv('GROUP_COMMIT_MAX_BATCH', 128))
+
+# Fraction of requests from TRUSTED_NETWORKS that still get lxml schema
+# validation (1.0 = validate everything, 0 = never validate trusted callers)
+VALIDATION_SAMPLE_RATE = float(os.getenv('VALIDATION_SAMPLE_RATE', 1.0))
+TRUSTED_NETWORKS = os.getenv('TRUSTED_NETWORKS', '127.0.0.1/32,::1/128').split(',')
+
+# Cache serialized responses of read-only operations until the next mutation
+RESPONSE_CACHE = os.getenv('RESPONSE_CACHE', 'false').lower() == 'true'
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+
+# Opt-in request and storage metrics, served at /metrics to METRICS_NETWORKS
+METRICS = os.getenv('METRICS', 'false').lower() == 'true'
+METRICS_NETWORKS = os.getenv('METRICS_NETWORKS', '127.0.0.1/32,::1/128').split(',')
+# Opt-in: POST /debug/profile?seconds=N profiles PROFILE_SAMPLE_RATE of requests into PROFILE_DIR
+PROFILING = os.getenv('PROFILING', 'false').lower() == 'true'
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 1.0))
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(os.path.dirname(__file__), 'data', 'profiles'))
+
+# get_todos_page limits
+PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 100))
+PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 1000))
+
+# get_changes serves the last CHANGE_FEED_SIZE mutations, callers further behind get a snapshot
+CHANGE_FEED_SIZE = int(os.getenv('CHANGE_FEED_SIZE', 10000))
+
+# Extra constructor arguments per backend
+STORAGE_OPTIONS = {
+    'journal': {
+        'compact_threshold': JOURNAL_COMPACT_BYTES,
+        'fsync': JOURNAL_FSYNC,
+    },
+    'sqlite': {
+        'db_path': SQLITE_FILE,
+        'change_feed_size': CHANGE_FEED_SIZE,
+    },
+}
 
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'info').upper()
 DEBUG = os.getenv('DEBUG', 'false').lower() == 'true'
\ No newline at end of file
@@ -0,0 +1,130 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Optional
+
+class _PendingWrite:
+    """A queued mutation and the slot its caller waits on"""
+
+    __slots__ = ('method', 'args', 'result', 'error', 'done')
+
+    def __init__(self, method, args):
+        self.method = method
+        self.args = args
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+class GroupCommitStorage:
+    """Coalesces concurrent mutations into a single storage transaction.
+
+    Mutations are queued to one committer thread. It collects whatever arrives
+    within ``window`` seconds (up to ``max_batch`` writes), runs them inside
+    ``storage.transaction()`` and only then releases the callers, so each
+    caller returns after its own write is durable. Reads go straight to the
+    wrapped storage.
+    """
+
+    def __init__(self, storage, window: float = 0.002, max_batch: int = 128):
+        self.storage = storage
+        self.window = window
+        self.max_batch = max_batch
+
+        self._local = threading.local()
+        self._start_lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    #ANCHOR Committer
+    def _ensure_committer(self):
+        """Start the committer thread (again after a fork)"""
+        if self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+
+            while len(batch) < self.max_batch:
+                try:
+                    remaining = deadline - time.monotonic()
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._commit(batch)
+
+    def _commit(self, batch: List[_PendingWrite]):
+        """Run one batch as a transaction and wake its callers"""
+        try:
+            with self.storage.transaction():
+                for request in batch:
+                    try:
+                        request.result = request.method(*request.args)
+                    except Exception as e:
+                        request.error = e
+        except Exception as e:
+            # Nothing in the batch reached disk
+            for request in batch:
+                request.error = e
+        finally:
+            for request in batch:
+                request.done.set()
+
+    def _submit(self, method, *args):
+        if getattr(self._local, 'depth', 0):
+            # Already inside this thread's transaction, queueing would deadlock
+            return method(*args)
+
+        self._ensure_committer()
+        request = _PendingWrite(method, args)
+        self._queue.put(request)
+        request.done.wait()
+
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    @contextmanager
+    def transaction(self):
+        """Run several operations as one transaction, bypassing the queue"""
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        try:
+            with self.storage.transaction():
+                yield
+        finally:
+            self._local.depth -= 1
+
+    #ANCHOR Mutations
+    def write_all(self, todos: List[Dict]):
+        """Write all todos"""
+        return self._submit(self.storage.write_all, todos)
+
+    def create(self, title: str, description: str) -> Dict:
+        """Create a new todo"""
+        return self._submit(self.storage.create, title, description)
+
+    def update(self, todo_id: int, title: str = None, description: str = None, completed: bool = None) -> Optional[Dict]:
+        """Update a todo"""
+        return self._submit(self.storage.update, todo_id, title, description, completed)
+
+    def delete(self, todo_id: int) -> bool:
+        """Delete a todo"""
+        return self._submit(self.storage.delete, todo_id)
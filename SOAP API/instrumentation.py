@@ -0,0 +1,123 @@
+import io
+import ipaddress
+import time
+
+from metrics import REGISTRY, WindowProfiler, profile_seconds
+from response_cache import BODY_OPERATION
+
+REQUESTS = REGISTRY.counter('soap_requests_total', 'SOAP requests by operation and HTTP status', ('operation', 'status'))
+REQUEST_LATENCY = REGISTRY.histogram('soap_request_seconds', 'SOAP request latency by operation', ('operation',))
+IN_FLIGHT = REGISTRY.gauge('soap_requests_in_flight', 'SOAP requests being handled')
+STORAGE_LATENCY = REGISTRY.histogram('storage_call_seconds', 'TodoStorage call latency', ('backend', 'method'))
+STORAGE_ERRORS = REGISTRY.counter('storage_errors_total', 'TodoStorage calls that raised', ('backend', 'method'))
+
+STORAGE_METHODS = ('read_all', 'write_all', 'create', 'read', 'update', 'delete', 'read_page', 'search', 'changes_since', 'snapshot')
+
+class InstrumentedStorage:
+    """Times every storage call; everything else passes through to the wrapped storage"""
+
+    def __init__(self, storage, backend: str):
+        self.storage = storage
+        self.backend = backend
+        for method in STORAGE_METHODS:
+            if hasattr(storage, method):
+                setattr(self, method, self._timed(method, getattr(storage, method)))
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    def _timed(self, method, call):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return call(*args, **kwargs)
+            except Exception:
+                STORAGE_ERRORS.inc(backend=self.backend, method=method)
+                raise
+            finally:
+                STORAGE_LATENCY.observe(time.perf_counter() - started, backend=self.backend, method=method)
+        timed.__name__ = method
+        return timed
+
+class MetricsMiddleware:
+    """Records per-operation request metrics and serves the local metrics endpoints.
+
+    ``GET /metrics`` returns the text exposition and, when a profiler is
+    given, ``POST /debug/profile?seconds=N`` opens a profiling window. Both
+    only answer callers from ``allowed_networks``.
+    """
+
+    def __init__(self, app, allowed_networks, profiler: WindowProfiler = None):
+        self.app = app
+        self.allowed_networks = [ipaddress.ip_network(network.strip()) for network in allowed_networks if network.strip()]
+        self.profiler = profiler
+
+    def is_allowed(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.allowed_networks)
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path == '/metrics' or path == '/debug/profile':
+            return self.serve_endpoint(path, environ, start_response)
+
+        operation = 'wsdl' if environ['REQUEST_METHOD'] == 'GET' else 'unknown'
+        if environ['REQUEST_METHOD'] == 'POST':
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+            body = environ['wsgi.input'].read(length)
+            environ['wsgi.input'] = io.BytesIO(body)
+            match = BODY_OPERATION.search(body)
+            if match is not None:
+                operation = match.group(1).decode()
+
+        status = ['500']
+        def recording_start_response(response_status, headers, exc_info=None):
+            status[0] = response_status.split(' ', 1)[0]
+            return start_response(response_status, headers, exc_info)
+
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            if self.profiler is not None:
+                with self.profiler.profile():
+                    return self._run(environ, recording_start_response)
+            return self._run(environ, recording_start_response)
+        finally:
+            REQUEST_LATENCY.observe(time.perf_counter() - started, operation=operation)
+            REQUESTS.inc(operation=operation, status=status[0])
+            IN_FLIGHT.dec()
+
+    def _run(self, environ, start_response):
+        # Serialize inside the timed region; spyne produces the body lazily
+        result = self.app(environ, start_response)
+        try:
+            return [b''.join(result)]
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    def serve_endpoint(self, path, environ, start_response):
+        if not self.is_allowed(environ.get('REMOTE_ADDR', '')):
+            start_response('403 Forbidden', [('Content-Type', 'text/plain'), ('Content-Length', '0')])
+            return [b'']
+
+        if path == '/metrics' and environ['REQUEST_METHOD'] == 'GET':
+            status, text = '200 OK', REGISTRY.render()
+        elif path == '/debug/profile' and environ['REQUEST_METHOD'] == 'POST' and self.profiler is not None:
+            try:
+                seconds = profile_seconds(environ.get('QUERY_STRING', ''))
+                status, text = '202 Accepted', f'profiling for {seconds}s into {self.profiler.start(seconds)}\n'
+            except ValueError:
+                status, text = '400 Bad Request', 'seconds must be a number\n'
+        else:
+            status, text = '404 Not Found', ''
+
+        body = text.encode('utf-8')
+        start_response(status, [
+            ('Content-Type', 'text/plain; version=0.0.4; charset=utf-8'),
+            ('Content-Length', str(len(body)))
+        ])
+        return [body]
@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+from typing import List, Dict, Tuple
+
+from storage import IndexedTodoStorage
+from todo_record import TodoRecord
+
+class JournalTodoStorage(IndexedTodoStorage):
+    """Indexed storage that appends each mutation to a journal file.
+
+    The data file is kept as a snapshot in the usual todos.json format. On
+    startup the snapshot is loaded and the journal replayed on top of it. Once
+    the journal grows past ``compact_threshold`` bytes a background thread
+    folds it into a fresh snapshot.
+    """
+
+    def __init__(self, filepath: str = 'data/todos.json', compact_threshold: int = 1024 * 1024, fsync: bool = True):
+        self.journal_path = filepath + '.journal'
+        self.compacting_path = filepath + '.journal.compacting'
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread = None
+        self._journal = None
+
+        super().__init__(filepath)
+
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        if os.path.exists(self.compacting_path):
+            # A previous compaction was interrupted before it finished
+            self.compact()
+
+    #ANCHOR Recovery
+    def _load(self):
+        """Load the snapshot and replay any journal records written after it"""
+        super()._load()
+        for path in (self.compacting_path, self.journal_path):
+            self._replay(path)
+
+    def _replay(self, path: str):
+        """Apply every complete record in a journal file to the index"""
+        if not os.path.exists(path):
+            return
+
+        intact = 0
+        torn = False
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    # Records are written whole with their newline, anything less is torn
+                    if not line.endswith(b'\n'):
+                        raise ValueError('incomplete record')
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash; everything before it is intact
+                    torn = True
+                    break
+                intact += len(line)
+
+                if record['op'] == 'clear':
+                    self._todos = {}
+                    self._search_index.clear()
+                    continue
+
+                todo = record['todo']
+                if record['op'] == 'put':
+                    todo = TodoRecord.from_dict(todo)
+                    self._todos[todo.id] = todo
+                    self._search_index.add(todo)
+                else:
+                    self._todos.pop(todo['id'], None)
+                    self._search_index.remove(todo['id'])
+                self._next_id = max(self._next_id, todo['id'] + 1)
+
+        if torn:
+            # Cut the torn tail off, or records appended after it would share its line
+            # and be skipped along with it on the next replay
+            print(f"Discarding torn journal record at byte {intact} of {path}")
+            os.truncate(path, intact)
+
+        # Replayed puts for new ids land at the end, keep the index id-ordered
+        self._todos = dict(sorted(self._todos.items()))
+
+    #ANCHOR Journal writes
+    def _write_changes(self, changes: List[Tuple[str, Dict]]):
+        """Append mutation records to the journal with a single write"""
+        records = []
+        for op, todo in changes:
+            if op == 'clear':
+                record = {'op': op}
+            elif op == 'delete':
+                record = {'op': op, 'todo': {'id': todo['id']}}
+            else:
+                record = {'op': op, 'todo': todo}
+            records.append(json.dumps(record, separators=(',', ':'), default=dict) + '\n')
+
+        self._journal.write(''.join(records))
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+        if self._journal.tell() >= self.compact_threshold:
+            self._start_compaction()
+
+    def write_all(self, todos: List[Dict]):
+        """Replace all todos, journaled as a clear followed by one put per todo"""
+        with self.transaction():
+            self._reindex(todos)
+            self._persist_change('clear', None)
+            for todo in self._todos.values():
+                self._persist_change('put', todo)
+
+    #ANCHOR Compaction
+    def _start_compaction(self):
+        """Compact in the background unless a compaction is already running"""
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            return
+
+        self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+        self._compaction_thread.start()
+
+    def _rotate_journal(self):
+        """Move the live journal aside so new records go to an empty file"""
+        self._journal.close()
+        if os.path.exists(self.compacting_path):
+            # Fold into the leftover file so no records are lost
+            with open(self.journal_path, 'r', encoding='utf-8') as src, \
+                    open(self.compacting_path, 'a', encoding='utf-8') as dst:
+                dst.write(src.read())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, self.compacting_path)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def compact(self):
+        """Fold the journal into a new snapshot of the data file"""
+        with self._compaction_lock:
+            with self._lock.write():
+                self._rotate_journal()
+                # Stored dicts are replaced rather than mutated, a shallow copy is a stable snapshot
+                snapshot = list(self._todos.values())
+
+            # Writers only touch the new journal from here on
+            self._write_file(snapshot)
+            os.remove(self.compacting_path)
+
+    def close(self):
+        """Wait for a running compaction and close the journal"""
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+        with self._lock.write():
+            self._journal.close()
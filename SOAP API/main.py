@@ -1,25 +1,98 @@
-import cgi_compat
+import os
+import sys
+
+# spyne still imports cgi, which was removed in Python 3.13
+if sys.version_info >= (3, 13):
+    import cgi_compat
 
-from wsgiref.simple_server import make_server
 from spyne.server.wsgi import WsgiApplication
 
-from todo_service import application
+import todo_service
+from todo_service import application, unvalidated_application, TodoService, READ_ONLY_OPERATIONS
+from response_cache import ResponseCache, CachingMiddleware
+from validation import SampledValidation
+from wsdl_cache import load_wsdl, StaticWsdlMiddleware
+from instrumentation import MetricsMiddleware
+from metrics import WindowProfiler
+from wsgi_server import serve
 
 try:
-    from config import SOAP_HOST, SOAP_PORT, DEBUG
+    from config import (
+        SOAP_HOST, SOAP_PORT, DEBUG, STORAGE_BACKEND,
+        SERVER_MODE, SERVER_WORKERS, SERVER_THREADS, SERVER_BACKLOG, KEEPALIVE_TIMEOUT,
+        RESPONSE_CACHE, RESPONSE_CACHE_MAX_BYTES,
+        SOAP_PUBLIC_URL, WSDL_FILE, WSDL_MAX_AGE,
+        VALIDATION_SAMPLE_RATE, TRUSTED_NETWORKS,
+        METRICS, METRICS_NETWORKS, PROFILING, PROFILE_SAMPLE_RATE, PROFILE_DIR
+    )
 except ImportError:
     SOAP_HOST = 'localhost'
     SOAP_PORT = 8000
     DEBUG = False
+    STORAGE_BACKEND = 'json'
+    SERVER_MODE = 'simple'
+    SERVER_WORKERS = 0
+    SERVER_THREADS = 16
+    SERVER_BACKLOG = 128
+    KEEPALIVE_TIMEOUT = 5
+    RESPONSE_CACHE = False
+    RESPONSE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    SOAP_PUBLIC_URL = f'http://{SOAP_HOST}:{SOAP_PORT}/'
+    WSDL_FILE = 'data/todo_service.wsdl'
+    WSDL_MAX_AGE = 3600
+    VALIDATION_SAMPLE_RATE = 1.0
+    TRUSTED_NETWORKS = []
+    METRICS = False
+    METRICS_NETWORKS = []
+    PROFILING = False
+    PROFILE_SAMPLE_RATE = 1.0
+    PROFILE_DIR = 'data/profiles'
 
 if __name__ == '__main__':
+    server_mode = SERVER_MODE
+    if server_mode == 'prefork' and STORAGE_BACKEND != 'sqlite':
+        # Forked workers would each keep their own copy of the json/indexed/journal
+        # data and rewrite the same files, losing writes and reusing ids
+        print(f"Pre-fork mode needs STORAGE_BACKEND=sqlite, the {STORAGE_BACKEND} backend is per process; "
+              "falling back to threaded mode", file=sys.stderr)
+        server_mode = 'threaded'
+
     wsgi_app = WsgiApplication(application)
-    
-    server = make_server(SOAP_HOST, SOAP_PORT, wsgi_app)
+    if VALIDATION_SAMPLE_RATE < 1.0 and TRUSTED_NETWORKS:
+        wsgi_app = SampledValidation(
+            wsgi_app,
+            WsgiApplication(unvalidated_application),
+            TRUSTED_NETWORKS,
+            VALIDATION_SAMPLE_RATE
+        )
+    if RESPONSE_CACHE:
+        wsgi_app = CachingMiddleware(
+            wsgi_app,
+            ResponseCache(RESPONSE_CACHE_MAX_BYTES),
+            lambda: TodoService.storage.version,
+            READ_ONLY_OPERATIONS
+        )
+    wsdl = load_wsdl(application, SOAP_PUBLIC_URL, WSDL_FILE, os.path.abspath(todo_service.__file__))
+    wsgi_app = StaticWsdlMiddleware(wsgi_app, wsdl, WSDL_MAX_AGE)
+    if METRICS:
+        profiler = WindowProfiler(PROFILE_DIR, PROFILE_SAMPLE_RATE) if PROFILING else None
+        wsgi_app = MetricsMiddleware(wsgi_app, METRICS_NETWORKS, profiler)
 
-    print(f"WSDL available at: http://{SOAP_HOST}:{SOAP_PORT}/?wsdl")
-    print(f"Server running on: http://{SOAP_HOST}:{SOAP_PORT}")
+    print(f"WSDL available at: http://{SOAP_HOST}:{SOAP_PORT}/?wsdl (cached in {WSDL_FILE})")
+    print(f"Server running on: http://{SOAP_HOST}:{SOAP_PORT} ({server_mode} mode)")
+    if METRICS:
+        print(f"Metrics available at: http://{SOAP_HOST}:{SOAP_PORT}/metrics" + (" (per worker process)" if server_mode == 'prefork' else ''))
     if DEBUG:
         print("Debug mode enabled")
     
-    server.serve_forever()
\ No newline at end of file
+    try:
+        serve(
+            wsgi_app, SOAP_HOST, SOAP_PORT,
+            mode=server_mode,
+            workers=SERVER_WORKERS,
+            threads=SERVER_THREADS,
+            backlog=SERVER_BACKLOG,
+            keepalive_timeout=KEEPALIVE_TIMEOUT
+        )
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,231 @@
+import cProfile
+import io
+import math
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import parse_qs
+
+# Seconds; covers sub-millisecond cache hits up to multi-second full scans
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+#ANCHOR Metric types
+class Metric:
+    type = 'untyped'
+
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels) -> tuple:
+        return tuple((name, labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self):
+        """Yield (suffix, labels, value) for the exposition"""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield '', key, value
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        for suffix, labels, value in self.samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram; each label set keeps [bucket counts..., sum, count]"""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield '_bucket', key + (('le', _format_value(float(bound))),), cumulative
+            yield '_bucket', key + (('le', '+Inf'),), state[-1]
+            yield '_sum', key, state[-2]
+            yield '_count', key, state[-1]
+
+class Registry:
+    """Named metrics rendered together in the text exposition format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, metric_class, name, help, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, help, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames=()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+REGISTRY = Registry()
+
+# Longest profiling window a caller can ask for
+MAX_PROFILE_SECONDS = 3600
+
+def profile_seconds(query: str, default: float = 30) -> float:
+    """``seconds`` from a query string, clamped to 1..MAX_PROFILE_SECONDS; ValueError if not a number"""
+    seconds = float(parse_qs(query).get('seconds', [default])[0])
+    if not math.isfinite(seconds):
+        raise ValueError(f"seconds must be finite, got {seconds}")
+    return min(max(seconds, 1.0), MAX_PROFILE_SECONDS)
+
+#ANCHOR Profiling
+class WindowProfiler:
+    """Opt-in cProfile of sampled requests over a time window.
+
+    ``start(seconds)`` opens a window; while it is open ``profile()`` runs a
+    ``sample_rate`` fraction of requests under cProfile. When the window
+    closes the merged stats are dumped to a .pstats file under ``output_dir``.
+    """
+
+    def __init__(self, output_dir: str = '.', sample_rate: float = 1.0):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self._stats = None
+        self._path = None
+        self._deadline = 0
+        self._timer = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return time.monotonic() < self._deadline
+
+    def start(self, seconds: float) -> str:
+        """Open a profiling window; returns the file the stats will be written to"""
+        with self._lock:
+            if self.active:
+                return self._path
+            self._stats = None
+            self._path = os.path.join(self.output_dir, f'profile-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}.pstats')
+            self._deadline = time.monotonic() + seconds
+            self._timer = threading.Timer(seconds, self.stop)
+            self._timer.daemon = True
+            self._timer.start()
+            return self._path
+
+    def stop(self):
+        """Close the window and dump what was collected"""
+        with self._lock:
+            self._deadline = 0
+            stats, self._stats = self._stats, None
+        if stats is None:
+            print("Profiling window closed, no requests were sampled")
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+        stats.dump_stats(self._path)
+        summary = io.StringIO()
+        stats.stream = summary
+        stats.sort_stats('cumulative').print_stats(15)
+        print(f"Profile written to {self._path}\n{summary.getvalue()}")
+
+    @contextmanager
+    def profile(self):
+        if not self.active or random.random() >= self.sample_rate:
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already running in this thread
+            yield
+            return
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with self._lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profiler)
+                else:
+                    self._stats.add(profiler)
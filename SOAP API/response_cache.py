@@ -0,0 +1,98 @@
+import hashlib
+import io
+import re
+import threading
+from collections import OrderedDict
+
+#ANCHOR Operation name is the first element inside the SOAP Body
+BODY_OPERATION = re.compile(rb'<(?:[\w.-]+:)?Body[^>]*>\s*<(?:[\w.-]+:)?(\w+)')
+
+class ResponseCache:
+    """LRU cache of serialized responses, bounded by total body size"""
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, headers, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old[1])
+
+            self._entries[key] = (headers, body)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+class CachingMiddleware:
+    """Serves repeated read-only SOAP calls from a ResponseCache.
+
+    Entries are keyed by the storage version and a digest of the request
+    envelope, so any mutation makes older entries unreachable and LRU
+    eviction drops them. Responses carry that key as an ETag; a request whose
+    If-None-Match still matches gets a 304 without touching the service.
+    """
+
+    def __init__(self, app, cache: ResponseCache, get_version, operations):
+        self.app = app
+        self.cache = cache
+        self.get_version = get_version
+        self.operations = {name.encode() for name in operations}
+
+    def __call__(self, environ, start_response):
+        if environ['REQUEST_METHOD'] != 'POST':
+            return self.app(environ, start_response)
+
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        body = environ['wsgi.input'].read(length)
+        environ['wsgi.input'] = io.BytesIO(body)
+
+        match = BODY_OPERATION.search(body)
+        if match is None or match.group(1) not in self.operations:
+            return self.app(environ, start_response)
+
+        version = self.get_version()
+        etag = f'"{version}-{hashlib.sha1(body).hexdigest()}"'
+
+        if environ.get('HTTP_IF_NONE_MATCH') == etag:
+            start_response('304 Not Modified', [('ETag', etag)])
+            return [b'']
+
+        cached = self.cache.get(etag)
+        if cached is not None:
+            headers, response_body = cached
+            start_response('200 OK', headers + [('ETag', etag)])
+            return [response_body]
+
+        captured = {}
+        def capture_start_response(status, headers, exc_info=None):
+            captured['status'] = status
+            captured['headers'] = headers
+            return start_response(status, headers + [('ETag', etag)], exc_info)
+
+        result = self.app(environ, capture_start_response)
+        try:
+            response_body = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+        # Skip caching if a write landed while the response was being built
+        if captured.get('status', '').startswith('200') and self.get_version() == version:
+            headers = [(name, value) for name, value in captured['headers'] if name.lower() != 'content-length']
+            self.cache.put(etag, headers, response_body)
+        return [response_body]
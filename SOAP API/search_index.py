@@ -0,0 +1,82 @@
+import re
+import sys
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+# Letters and digits; underscores split words like SQLite's unicode61 tokenizer does
+TOKEN = re.compile(r'[^\W_]+')
+
+def tokenize(text: Optional[str]) -> FrozenSet[str]:
+    """Distinct case-folded word tokens of the text"""
+    if not text:
+        return frozenset()
+    # Interned so every todo containing a word shares one string for it
+    return frozenset(map(sys.intern, TOKEN.findall(text.casefold())))
+
+def todo_tokens(todo: Dict) -> FrozenSet[str]:
+    return tokenize(todo['title']) | tokenize(todo['description'])
+
+class SearchIndex:
+    """Inverted index over todo title/description tokens plus a completed index.
+
+    Kept up to date one todo at a time by the storage that owns it, under
+    that storage's write lock. A query intersects the posting sets of its
+    terms starting from the smallest, so its cost follows the number of
+    candidates rather than the number of todos.
+    """
+
+    def __init__(self, todos: Iterable[Dict] = ()):
+        self._postings: Dict[str, Set[int]] = {}
+        # Tuples take a fraction of a frozenset's memory and are only iterated
+        self._tokens: Dict[int, Tuple[str, ...]] = {}
+        self._completed: Dict[bool, Set[int]] = {True: set(), False: set()}
+        for todo in todos:
+            self.add(todo)
+
+    def add(self, todo: Dict):
+        """Index a todo, replacing whatever was indexed under its id"""
+        todo_id = todo['id']
+        tokens = todo_tokens(todo)
+        old_tokens = frozenset(self._tokens.get(todo_id, ()))
+
+        for token in old_tokens - tokens:
+            self._discard_posting(token, todo_id)
+        for token in tokens - old_tokens:
+            self._postings.setdefault(token, set()).add(todo_id)
+        self._tokens[todo_id] = tuple(tokens)
+
+        completed = bool(todo['completed'])
+        self._completed[not completed].discard(todo_id)
+        self._completed[completed].add(todo_id)
+
+    def remove(self, todo_id: int):
+        for token in self._tokens.pop(todo_id, ()):
+            self._discard_posting(token, todo_id)
+        self._completed[True].discard(todo_id)
+        self._completed[False].discard(todo_id)
+
+    def _discard_posting(self, token: str, todo_id: int):
+        ids = self._postings.get(token)
+        if ids is not None:
+            ids.discard(todo_id)
+            if not ids:
+                del self._postings[token]
+
+    def clear(self):
+        self._postings.clear()
+        self._tokens.clear()
+        self._completed = {True: set(), False: set()}
+
+    def search(self, query: Optional[str], completed: bool = None) -> List[int]:
+        """Ids of todos containing every query token (and matching completed), ascending.
+
+        An empty query matches every todo.
+        """
+        candidates = [self._postings.get(token, set()) for token in tokenize(query)]
+        if completed is not None:
+            candidates.append(self._completed[bool(completed)])
+        if not candidates:
+            return sorted(self._tokens)
+
+        candidates.sort(key=len)
+        smallest, rest = candidates[0], candidates[1:]
+        return sorted(todo_id for todo_id in smallest if all(todo_id in ids for ids in rest))
@@ -0,0 +1,355 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Tuple
+
+from change_feed import Change
+from search_index import todo_tokens, tokenize
+
+#ANCHOR SQL statements
+# Kept as module constants so every call passes the identical string and
+# sqlite3's per-connection statement cache hands back the prepared statement.
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS todos ('
+    ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+    ' title TEXT NOT NULL,'
+    ' description TEXT,'
+    ' completed INTEGER NOT NULL DEFAULT 0)',
+    'CREATE INDEX IF NOT EXISTS idx_todos_completed ON todos (completed)',
+    # Data version shared by every process using the database
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)',
+    "INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0)",
+    # Change feed, one row per version, shared like the version itself
+    'CREATE TABLE IF NOT EXISTS changes ('
+    ' version INTEGER PRIMARY KEY,'
+    ' operation TEXT NOT NULL,'
+    ' todo_id INTEGER NOT NULL,'
+    ' title TEXT,'
+    ' description TEXT,'
+    ' completed INTEGER)',
+)
+
+SELECT_ALL = 'SELECT id, title, description, completed FROM todos ORDER BY id'
+SELECT_ONE = 'SELECT id, title, description, completed FROM todos WHERE id = ?'
+INSERT = 'INSERT INTO todos (title, description, completed) VALUES (?, ?, 0)'
+INSERT_WITH_ID = 'INSERT INTO todos (id, title, description, completed) VALUES (?, ?, ?, ?)'
+UPDATE = (
+    'UPDATE todos SET title = COALESCE(?, title), description = COALESCE(?, description),'
+    ' completed = COALESCE(?, completed) WHERE id = ?'
+)
+DELETE = 'DELETE FROM todos WHERE id = ?'
+DELETE_ALL = 'DELETE FROM todos'
+SELECT_VERSION = "SELECT value FROM meta WHERE key = 'version'"
+BUMP_VERSION = "UPDATE meta SET value = value + 1 WHERE key = 'version'"
+
+#ANCHOR Change feed
+# Recorded right after BUMP_VERSION in the same transaction, so the rows stay
+# gap-free from the oldest kept version up to the current one
+INSERT_CHANGE = (
+    'INSERT INTO changes (version, operation, todo_id, title, description, completed)'
+    " SELECT value, ?, ?, ?, ?, ? FROM meta WHERE key = 'version'"
+)
+PRUNE_CHANGES = "DELETE FROM changes WHERE version <= (SELECT value FROM meta WHERE key = 'version') - ?"
+DELETE_ALL_CHANGES = 'DELETE FROM changes'
+SELECT_CHANGE_FLOOR = 'SELECT min(version) - 1 FROM changes'
+SELECT_CHANGES = (
+    'SELECT version, operation, todo_id, title, description, completed'
+    ' FROM changes WHERE version > ? ORDER BY version LIMIT ?'
+)
+
+#ANCHOR Full-text index
+# External-content FTS5 table over todos, kept in sync by triggers so every
+# write path (including other processes) updates it in the same transaction.
+HAS_FTS = "SELECT count(*) FROM sqlite_master WHERE name = 'todos_fts'"
+FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE todos_fts USING fts5("
+    " title, description, content='todos', content_rowid='id', tokenize='unicode61 remove_diacritics 0')",
+    'CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos BEGIN'
+    ' INSERT INTO todos_fts (rowid, title, description) VALUES (new.id, new.title, new.description); END',
+    'CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos BEGIN'
+    " INSERT INTO todos_fts (todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    'CREATE TRIGGER todos_fts_update AFTER UPDATE OF title, description ON todos BEGIN'
+    " INSERT INTO todos_fts (todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);"
+    ' INSERT INTO todos_fts (rowid, title, description) VALUES (new.id, new.title, new.description); END',
+    # Index rows that existed before the table did
+    "INSERT INTO todos_fts (todos_fts) VALUES ('rebuild')",
+)
+
+def _page_query(after_id, completed, title_prefix) -> Tuple[str, list]:
+    """Build the page query; the handful of filter combinations each get a cached statement"""
+    conditions = []
+    params = []
+    if after_id is not None:
+        conditions.append('id > ?')
+        params.append(after_id)
+    if completed is not None:
+        conditions.append('completed = ?')
+        params.append(int(completed))
+    if title_prefix:
+        # Case-sensitive, unlike LIKE
+        conditions.append('substr(title, 1, ?) = ?')
+        params.extend([len(title_prefix), title_prefix])
+
+    sql = 'SELECT id, title, description, completed FROM todos'
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    return sql + ' ORDER BY id LIMIT ? OFFSET ?', params
+
+def _search_query(terms, completed, after_id) -> Tuple[str, list]:
+    """Build the FTS query; quoted terms are ANDed and matched as whole tokens"""
+    sql = (
+        'SELECT todos.id, todos.title, todos.description, todos.completed'
+        ' FROM todos_fts JOIN todos ON todos.id = todos_fts.rowid WHERE todos_fts MATCH ?'
+    )
+    params = [' '.join(f'"{term}"' for term in sorted(terms))]
+    if completed is not None:
+        sql += ' AND todos.completed = ?'
+        params.append(int(completed))
+    if after_id is not None:
+        sql += ' AND todos.id > ?'
+        params.append(after_id)
+    return sql + ' ORDER BY todos.id LIMIT ?', params
+
+def _row_to_change(row) -> Change:
+    version, operation, todo_id, title, description, completed = row
+    if operation == 'delete':
+        return Change(version, operation, todo_id, None)
+    todo = {'id': todo_id, 'title': title, 'description': description, 'completed': bool(completed)}
+    return Change(version, operation, todo_id, todo)
+
+def _row_to_dict(cursor, row) -> Dict:
+    """Build the same todo dict the JSON backends return"""
+    return {
+        'id': row[0],
+        'title': row[1],
+        'description': row[2],
+        'completed': bool(row[3])
+    }
+
+class SQLiteTodoStorage:
+    """TodoStorage backed by a SQLite database in WAL mode.
+
+    Each thread gets its own connection. On first start the database is
+    seeded from the existing JSON data file so switching backends keeps data.
+    The last ``change_feed_size`` mutations are kept in a ``changes`` table,
+    so every process sharing the database serves the same change feed.
+    """
+
+    def __init__(self, filepath: str = 'data/todos.json', db_path: str = None, cached_statements: int = 64,
+                 change_feed_size: int = 10000):
+        self.filepath = filepath
+        self.db_path = db_path or os.path.splitext(filepath)[0] + '.db'
+        self.cached_statements = cached_statements
+        self.change_feed_size = max(change_feed_size, 1)
+        self._local = threading.local()
+        self.full_text = False
+        self._init_db()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None: we issue BEGIN/COMMIT ourselves
+            conn = sqlite3.connect(
+                self.db_path,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=self.cached_statements
+            )
+            conn.row_factory = _row_to_dict
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        """Create the schema and import the JSON data file into a new database"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        is_new = not os.path.exists(self.db_path)
+
+        conn = self._connection()
+        for statement in SCHEMA:
+            conn.execute(statement)
+
+        if is_new and os.path.exists(self.filepath):
+            with open(self.filepath, 'r') as f:
+                self.write_all(json.load(f))
+
+        self.full_text = self._init_full_text()
+
+    def _init_full_text(self) -> bool:
+        """Create the FTS index if needed; False when SQLite was built without FTS5"""
+        cursor = self._connection().cursor()
+        cursor.row_factory = None
+        try:
+            with self.transaction():
+                if cursor.execute(HAS_FTS).fetchone()[0] == 0:
+                    for statement in FTS_SCHEMA:
+                        cursor.execute(statement)
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"SQLite full-text search unavailable ({e}), search_todos will scan")
+            return False
+
+    @contextmanager
+    def transaction(self):
+        """Group several operations into one atomic commit"""
+        conn = self._connection()
+        if conn.in_transaction:
+            # Nested use joins the outer transaction
+            yield
+            return
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    @contextmanager
+    def _read_transaction(self):
+        """Run several reads against one snapshot, unaffected by concurrent commits"""
+        conn = self._connection()
+        if conn.in_transaction:
+            yield
+            return
+
+        conn.execute('BEGIN')
+        try:
+            yield
+        finally:
+            conn.execute('COMMIT')
+
+    def _record_change(self, operation: str, todo_id: int, todo: Dict = None):
+        """Add the change for the version just bumped and drop the oldest beyond the feed size"""
+        conn = self._connection()
+        if todo is None:
+            conn.execute(INSERT_CHANGE, (operation, todo_id, None, None, None))
+        else:
+            conn.execute(INSERT_CHANGE, (operation, todo_id, todo['title'], todo['description'], int(todo['completed'])))
+        conn.execute(PRUNE_CHANGES, (self.change_feed_size,))
+
+    @property
+    def version(self) -> int:
+        """Counter bumped by every mutation"""
+        cursor = self._connection().cursor()
+        # Plain tuple rows, the todo row factory does not apply here
+        cursor.row_factory = None
+        return cursor.execute(SELECT_VERSION).fetchone()[0]
+
+    def read_all(self) -> List[Dict]:
+        """Read all todos ordered by id"""
+        return self._connection().execute(SELECT_ALL).fetchall()
+
+    def write_all(self, todos: List[Dict]):
+        """Replace all todos"""
+        with self.transaction():
+            conn = self._connection()
+            conn.execute(DELETE_ALL)
+            conn.executemany(INSERT_WITH_ID, (
+                (todo['id'], todo['title'], todo['description'], int(todo['completed']))
+                for todo in todos
+            ))
+            conn.execute(BUMP_VERSION)
+            # Readers of the feed fall back to a snapshot
+            conn.execute(DELETE_ALL_CHANGES)
+
+    def create(self, title: str, description: str) -> Dict:
+        """Create a new todo"""
+        with self.transaction():
+            conn = self._connection()
+            cursor = conn.execute(INSERT, (title, description))
+            conn.execute(BUMP_VERSION)
+            todo = {
+                'id': cursor.lastrowid,
+                'title': title,
+                'description': description,
+                'completed': False
+            }
+            self._record_change('create', todo['id'], todo)
+        return todo
+
+    def read(self, todo_id: int) -> Optional[Dict]:
+        """Read a specific todo by ID"""
+        return self._connection().execute(SELECT_ONE, (todo_id,)).fetchone()
+
+    def update(self, todo_id: int, title: str = None, description: str = None, completed: bool = None) -> Optional[Dict]:
+        """Update a todo"""
+        if completed is not None:
+            completed = int(completed)
+
+        with self.transaction():
+            conn = self._connection()
+            cursor = conn.execute(UPDATE, (title, description, completed, todo_id))
+            if cursor.rowcount == 0:
+                return None
+            conn.execute(BUMP_VERSION)
+            todo = self.read(todo_id)
+            self._record_change('update', todo_id, todo)
+            return todo
+
+    def read_page(self, limit: int, after_id: int = None, offset: int = 0,
+                  completed: bool = None, title_prefix: str = None) -> Tuple[List[Dict], bool]:
+        """Read up to ``limit`` todos with id > ``after_id`` matching the filters.
+
+        Returns the page and whether more matching todos follow it.
+        """
+        sql, params = _page_query(after_id, completed, title_prefix)
+        page = self._connection().execute(sql, params + [limit + 1, offset]).fetchall()
+        return page[:limit], len(page) > limit
+
+    def search(self, query: str, completed: bool = None, limit: int = 100,
+               after_id: int = None) -> Tuple[List[Dict], bool]:
+        """Find todos whose title or description contain every word of the query"""
+        terms = tokenize(query)
+        if not terms:
+            return self.read_page(limit, after_id=after_id, completed=completed)
+
+        if self.full_text:
+            sql, params = _search_query(terms, completed, after_id)
+            page = self._connection().execute(sql, params + [limit + 1]).fetchall()
+        else:
+            sql, params = _page_query(after_id, completed, None)
+            matches = (
+                todo for todo in self._connection().execute(sql, params + [-1, 0])
+                if terms <= todo_tokens(todo)
+            )
+            page = [todo for _, todo in zip(range(limit + 1), matches)]
+        return page[:limit], len(page) > limit
+
+    def delete(self, todo_id: int) -> bool:
+        """Delete a todo"""
+        with self.transaction():
+            conn = self._connection()
+            cursor = conn.execute(DELETE, (todo_id,))
+            if cursor.rowcount == 0:
+                return False
+            conn.execute(BUMP_VERSION)
+            self._record_change('delete', todo_id)
+        return True
+
+    def changes_since(self, version: int, limit: int) -> Optional[Tuple[List[Change], bool]]:
+        """Up to ``limit`` changes after ``version`` and whether more follow.
+
+        None when the caller needs a snapshot, because the version is older
+        than the kept changes or newer than the database.
+        """
+        cursor = self._connection().cursor()
+        cursor.row_factory = None
+        with self._read_transaction():
+            current = cursor.execute(SELECT_VERSION).fetchone()[0]
+            floor = cursor.execute(SELECT_CHANGE_FLOOR).fetchone()[0]
+            if version < (current if floor is None else floor) or version > current:
+                return None
+            rows = cursor.execute(SELECT_CHANGES, (version, limit)).fetchall()
+        changes = [_row_to_change(row) for row in rows]
+        return changes, version + len(changes) < current
+
+    def snapshot(self) -> Tuple[int, List[Dict]]:
+        """Every todo and the version they are current as of"""
+        with self._read_transaction():
+            return self.version, self.read_all()
@@ -1,44 +1,157 @@
+import bisect
+import importlib
 import json
 import os
-from typing import List, Dict, Optional
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
+from typing import List, Dict, Optional, Tuple
+
+from search_index import SearchIndex, todo_tokens, tokenize
+from todo_record import TodoRecord
+
+class RWLock:
+    """Readers share the lock, writers hold it exclusively.
+
+    Waiting writers block new readers so a steady read load cannot starve
+    them. The thread holding the write lock may re-acquire it and may also
+    take the read lock, which lets locked methods call each other.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        if self._writer == threading.get_ident():
+            yield
+            return
+
+        with self._cond:
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                self._waiting_writers += 1
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+                self._waiting_writers -= 1
+                self._writer = me
+            self._write_depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._writer = None
+                    self._cond.notify_all()
 
 class TodoStorage:
     def __init__(self, filepath: str = 'data/todos.json'):
         self.filepath = filepath
+        self._lock = RWLock()
+        self._pending_todos = None
+        # Bumped by every mutation so callers can tell whether data changed. Starts
+        # at the clock in microseconds so versions keep increasing across restarts.
+        self.version = time.time_ns() // 1000
         self._ensure_file_exists()
     
     def _ensure_file_exists(self):
         """Create data directory and file if they don't exist"""
         os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
         if not os.path.exists(self.filepath):
-            with open(self.filepath, 'w') as f:
-                json.dump([], f)
+            self._write_file([])
+    
+    def _write_file(self, todos: List[Dict]):
+        """Write todos to a temp file and atomically rename it over the data file"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.filepath), prefix='.todos-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                # default=dict writes TodoRecords like plain todo dicts
+                json.dump(todos, f, indent=2, default=dict)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.filepath)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    
+    @contextmanager
+    def transaction(self):
+        """Group several operations into one write of the data file"""
+        with self._lock.write():
+            if self._pending_todos is not None:
+                # Nested use joins the outer transaction
+                yield
+                return
+
+            self._pending_todos = self.read_all()
+            try:
+                yield
+                self._write_file(self._pending_todos)
+            finally:
+                self._pending_todos = None
     
     def read_all(self) -> List[Dict]:
         """Read all todos from file"""
+        with self._lock.read():
+            return self._load_todos()
+    
+    def _load_todos(self) -> List[Dict]:
+        """Current todos, for callers already holding the lock.
+        
+        Taking the read lock again would deadlock once a writer queues
+        between the two acquisitions, since waiting writers block new readers.
+        """
+        if self._pending_todos is not None:
+            return self._pending_todos
         with open(self.filepath, 'r') as f:
             return json.load(f)
     
     def write_all(self, todos: List[Dict]):
         """Write all todos to file"""
-        with open(self.filepath, 'w') as f:
-            json.dump(todos, f, indent=2)
+        with self._lock.write():
+            if self._pending_todos is not None:
+                self._pending_todos = todos
+            else:
+                self._write_file(todos)
+            self.version += 1
     
     def create(self, title: str, description: str) -> Dict:
         """Create a new todo"""
-        todos = self.read_all()
-        new_id = max([todo['id'] for todo in todos], default=0) + 1
-        
-        new_todo = {
-            'id': new_id,
-            'title': title,
-            'description': description,
-            'completed': False
-        }
-        
-        todos.append(new_todo)
-        self.write_all(todos)
-        return new_todo
+        with self._lock.write():
+            todos = self.read_all()
+            new_id = max([todo['id'] for todo in todos], default=0) + 1
+            
+            new_todo = {
+                'id': new_id,
+                'title': title,
+                'description': description,
+                'completed': False
+            }
+            
+            todos.append(new_todo)
+            self.write_all(todos)
+            return new_todo
     
     def read(self, todo_id: int) -> Optional[Dict]:
         """Read a specific todo by ID"""
@@ -48,33 +161,223 @@ class TodoStorage:
                 return todo
         return None
     
-    def update(self, todo_id: int, title: str = None, description: str = None, completed: bool = None) -> Optional[Dict]:
-        """Update a todo"""
-        todos = self.read_all()
+    def _iter_ordered(self):
+        """Yield todos in ascending id order (the caller holds the read lock)"""
+        return iter(sorted(self._load_todos(), key=lambda todo: todo['id']))
+    
+    def read_page(self, limit: int, after_id: int = None, offset: int = 0,
+                  completed: bool = None, title_prefix: str = None) -> Tuple[List[Dict], bool]:
+        """Read up to ``limit`` todos with id > ``after_id`` matching the filters.
         
-        for i, todo in enumerate(todos):
-            if todo['id'] == todo_id:
-                if title is not None:
-                    todos[i]['title'] = title
-                if description is not None:
-                    todos[i]['description'] = description
-                if completed is not None:
-                    todos[i]['completed'] = completed
-                
-                self.write_all(todos)
-                return todos[i]
+        Returns the page and whether more matching todos follow it.
+        """
+        with self._lock.read():
+            matches = (
+                todo for todo in self._iter_ordered()
+                if (after_id is None or todo['id'] > after_id)
+                and (completed is None or todo['completed'] == completed)
+                and (not title_prefix or todo['title'].startswith(title_prefix))
+            )
+            page = list(islice(matches, offset, offset + limit + 1))
+        return page[:limit], len(page) > limit
+    
+    def search(self, query: str, completed: bool = None, limit: int = 100,
+               after_id: int = None) -> Tuple[List[Dict], bool]:
+        """Find todos whose title or description contain every word of the query.
         
-        return None
+        Scans every todo; the indexed backends override this. Returns up to
+        ``limit`` matches with id > ``after_id`` and whether more follow.
+        """
+        terms = tokenize(query)
+        with self._lock.read():
+            matches = (
+                todo for todo in self._iter_ordered()
+                if (after_id is None or todo['id'] > after_id)
+                and (completed is None or todo['completed'] == completed)
+                and terms <= todo_tokens(todo)
+            )
+            page = list(islice(matches, limit + 1))
+        return page[:limit], len(page) > limit
+    
+    def update(self, todo_id: int, title: str = None, description: str = None, completed: bool = None) -> Optional[Dict]:
+        """Update a todo"""
+        with self._lock.write():
+            todos = self.read_all()
+            
+            for i, todo in enumerate(todos):
+                if todo['id'] == todo_id:
+                    if title is not None:
+                        todos[i]['title'] = title
+                    if description is not None:
+                        todos[i]['description'] = description
+                    if completed is not None:
+                        todos[i]['completed'] = completed
+                    
+                    self.write_all(todos)
+                    return todos[i]
+            
+            return None
     
     def delete(self, todo_id: int) -> bool:
         """Delete a todo"""
-        todos = self.read_all()
-        original_length = len(todos)
-        
-        todos = [todo for todo in todos if todo['id'] != todo_id]
-        
-        if len(todos) < original_length:
-            self.write_all(todos)
+        with self._lock.write():
+            todos = self.read_all()
+            original_length = len(todos)
+            
+            todos = [todo for todo in todos if todo['id'] != todo_id]
+            
+            if len(todos) < original_length:
+                self.write_all(todos)
+                return True
+            
+            return False
+
+class IndexedTodoStorage(TodoStorage):
+    """TodoStorage that loads the file once and serves lookups from an id-keyed index.
+
+    Every mutation is still written through to disk before it returns.
+    Todos are held as immutable TodoRecords; updates swap in a new record,
+    so a todo handed to a reader cannot change underneath it.
+    """
+
+    def __init__(self, filepath: str = 'data/todos.json'):
+        super().__init__(filepath)
+        self._todos: Dict[int, TodoRecord] = {}
+        self._next_id = 1
+        self._pending_changes = None
+        self._search_index = SearchIndex()
+        self._load()
+
+    def _load(self):
+        """Build the in-memory index from the data file"""
+        with open(self.filepath, 'r') as f:
+            # Each JSON object becomes a record as it is parsed, so the dicts never pile up
+            todos = json.load(f, object_hook=TodoRecord.from_dict)
+        self._reindex(todos)
+
+    def _reindex(self, todos: List[Dict]):
+        """Replace the index with the given todos, ordered by id"""
+        records = (TodoRecord.from_dict(todo) for todo in todos)
+        self._todos = {todo.id: todo for todo in sorted(records, key=lambda t: t.id)}
+        self._next_id = max(self._next_id, max(self._todos, default=0) + 1)
+        self._search_index = SearchIndex(self._todos.values())
+
+    def _write_snapshot(self):
+        """Write the whole index to the data file"""
+        self._write_file(list(self._todos.values()))
+
+    def _persist_change(self, op: str, todo: Optional[Dict]):
+        """Make a single mutation durable ('put', 'delete' or 'clear')"""
+        self.version += 1
+        if self._pending_changes is not None:
+            self._pending_changes.append((op, todo))
+        else:
+            self._write_changes([(op, todo)])
+
+    def _write_changes(self, changes: List[Tuple[str, Dict]]):
+        """Write a group of mutations to disk"""
+        self._write_snapshot()
+
+    @contextmanager
+    def transaction(self):
+        """Apply several operations in memory and persist them together"""
+        with self._lock.write():
+            if self._pending_changes is not None:
+                yield
+                return
+
+            self._pending_changes = []
+            try:
+                yield
+                if self._pending_changes:
+                    self._write_changes(self._pending_changes)
+            except BaseException:
+                # Drop the half-applied changes by reloading what is on disk
+                self._load()
+                self.version += 1
+                raise
+            finally:
+                self._pending_changes = None
+
+    def read_all(self) -> List[Dict]:
+        """Read all todos from the index"""
+        with self._lock.read():
+            return list(self._todos.values())
+
+    def write_all(self, todos: List[Dict]):
+        """Replace all todos and write them to file"""
+        with self._lock.write():
+            self._reindex(todos)
+            self._write_snapshot()
+            self.version += 1
+
+    def create(self, title: str, description: str) -> Dict:
+        """Create a new todo"""
+        with self._lock.write():
+            new_todo = TodoRecord(self._next_id, title, description, False)
+            self._next_id += 1
+
+            self._todos[new_todo.id] = new_todo
+            self._search_index.add(new_todo)
+            self._persist_change('put', new_todo)
+            return new_todo
+
+    def read(self, todo_id: int) -> Optional[Dict]:
+        """Read a specific todo by ID"""
+        with self._lock.read():
+            return self._todos.get(todo_id)
+
+    def _iter_ordered(self):
+        """Yield todos from the index, which is kept in id order"""
+        return iter(self._todos.values())
+
+    def search(self, query: str, completed: bool = None, limit: int = 100,
+               after_id: int = None) -> Tuple[List[Dict], bool]:
+        """Find todos containing every word of the query using the search index"""
+        with self._lock.read():
+            ids = self._search_index.search(query, completed)
+            start = bisect.bisect_right(ids, after_id) if after_id is not None else 0
+            page = [self._todos[todo_id] for todo_id in ids[start:start + limit + 1]]
+        return page[:limit], len(page) > limit
+
+    def update(self, todo_id: int, title: str = None, description: str = None, completed: bool = None) -> Optional[Dict]:
+        """Update a todo"""
+        with self._lock.write():
+            todo = self._todos.get(todo_id)
+            if todo is None:
+                return None
+
+            todo = todo.replace(title, description, completed)
+            self._todos[todo_id] = todo
+            self._search_index.add(todo)
+            self._persist_change('put', todo)
+            return todo
+
+    def delete(self, todo_id: int) -> bool:
+        """Delete a todo"""
+        with self._lock.write():
+            todo = self._todos.pop(todo_id, None)
+            if todo is None:
+                return False
+
+            self._search_index.remove(todo_id)
+            self._persist_change('delete', todo)
             return True
-        
-        return False
\ No newline at end of file
+
+
+#ANCHOR Backends are imported lazily so unused engines cost nothing at startup
+STORAGE_BACKENDS = {
+    'json': 'storage:TodoStorage',
+    'indexed': 'storage:IndexedTodoStorage',
+    'journal': 'journal_storage:JournalTodoStorage',
+    'sqlite': 'sqlite_storage:SQLiteTodoStorage',
+}
+
+def create_storage(backend: str = 'json', filepath: str = 'data/todos.json', **options) -> TodoStorage:
+    """Create the storage backend registered under the given name"""
+    try:
+        module_name, class_name = STORAGE_BACKENDS[backend].split(':')
+    except KeyError:
+        raise ValueError(f"Unknown storage backend: {backend}")
+    storage_class = getattr(importlib.import_module(module_name), class_name)
+    return storage_class(filepath, **options)
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# The service modules are flat and import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# todo_service opens its storage at import time; keep that out of data/
+os.environ.setdefault('DATA_FILE', os.path.join(tempfile.mkdtemp(prefix='todo-tests-'), 'todos.json'))
@@ -0,0 +1,133 @@
+import pytest
+
+from change_feed import ChangeFeed, ChangeFeedStorage
+from sqlite_storage import SQLiteTodoStorage
+from storage import create_storage
+
+def open_feed(backend, tmp_path, capacity=10000):
+    """Storage with a change feed, the way todo_service builds it"""
+    if backend == 'sqlite':
+        return SQLiteTodoStorage(str(tmp_path / 'todos.json'), change_feed_size=capacity)
+    return ChangeFeedStorage(create_storage(backend, str(tmp_path / 'todos.json')), capacity)
+
+@pytest.fixture(params=['json', 'indexed', 'journal', 'sqlite'])
+def backend(request):
+    return request.param
+
+def test_mutations_are_listed_in_version_order(backend, tmp_path):
+    storage = open_feed(backend, tmp_path)
+    start = storage.version
+    storage.create('First', None)
+    storage.create('Second', 'details')
+    storage.update(1, completed=True)
+    storage.delete(2)
+
+    changes, has_more = storage.changes_since(start, 10)
+    assert not has_more
+    assert [change.version for change in changes] == [start + 1, start + 2, start + 3, start + 4]
+    assert [(change.operation, change.todo_id) for change in changes] == [
+        ('create', 1), ('create', 2), ('update', 1), ('delete', 2)
+    ]
+    assert changes[2].todo['completed'] is True
+    assert changes[3].todo is None
+
+def test_limit_pages_through_changes(backend, tmp_path):
+    storage = open_feed(backend, tmp_path)
+    start = storage.version
+    for index in range(5):
+        storage.create(f'Todo {index}', None)
+
+    first, has_more = storage.changes_since(start, 3)
+    assert has_more
+    rest, has_more = storage.changes_since(first[-1].version, 3)
+    assert not has_more
+    assert [change.todo_id for change in first + rest] == [1, 2, 3, 4, 5]
+
+def test_versions_outside_the_feed_need_a_snapshot(backend, tmp_path):
+    storage = open_feed(backend, tmp_path, capacity=2)
+    start = storage.version
+    for index in range(4):
+        storage.create(f'Todo {index}', None)
+
+    assert storage.changes_since(start, 10) is None
+    assert storage.changes_since(storage.version + 1, 10) is None
+    changes, _ = storage.changes_since(storage.version - 2, 10)
+    assert [change.todo_id for change in changes] == [3, 4]
+
+def test_write_all_resets_the_feed(backend, tmp_path):
+    storage = open_feed(backend, tmp_path)
+    storage.create('Old', None)
+    before = storage.version
+    storage.write_all([{'id': 7, 'title': 'Imported', 'description': None, 'completed': False}])
+
+    assert storage.changes_since(before, 10) is None
+    version, todos = storage.snapshot()
+    assert version == storage.version
+    assert [todo['id'] for todo in todos] == [7]
+    assert storage.changes_since(version, 10) == ([], False)
+
+def test_rolled_back_transaction_publishes_nothing(backend, tmp_path):
+    storage = open_feed(backend, tmp_path)
+    storage.create('Kept', None)
+    before = storage.version
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.create('Discarded', None)
+            raise RuntimeError
+    storage.create('Next', None)
+
+    result = storage.changes_since(before, 10)
+    # Backends that used up a version for the rollback make older callers
+    # take a snapshot; the discarded todo must never be reported as created
+    if result is not None:
+        assert [change.todo['title'] for change in result[0]] == ['Next']
+
+def test_sqlite_feed_is_shared_between_processes(tmp_path):
+    # Two storages on one database stand in for two prefork workers
+    writer = open_feed('sqlite', tmp_path)
+    reader = open_feed('sqlite', tmp_path)
+    start = reader.version
+    writer.create('From another worker', None)
+    writer.update(1, title='Renamed')
+
+    changes, has_more = reader.changes_since(start, 10)
+    assert not has_more
+    assert [(change.operation, change.todo['title']) for change in changes] == [
+        ('create', 'From another worker'), ('update', 'Renamed')
+    ]
+    assert reader.version == writer.version
+
+def test_ring_buffer_keeps_versions_gap_free():
+    feed = ChangeFeed(capacity=3, version=10)
+    for version in range(11, 16):
+        feed.append(version, 'create', version, None)
+    assert feed.floor == 12
+    changes, has_more = feed.since(12, 10)
+    assert [change.version for change in changes] == [13, 14, 15]
+    assert not has_more
+
+    # A version that skipped the feed drops the history before it
+    feed.append(20, 'delete', 1, None)
+    assert feed.since(15, 10) is None
+    assert feed.since(19, 10)[0][0].version == 20
+
+def test_get_changes_falls_back_to_a_snapshot(backend, tmp_path, monkeypatch):
+    from todo_service import TodoService
+    storage = open_feed(backend, tmp_path)
+    monkeypatch.setattr(TodoService, 'storage', storage)
+    storage.create('First', None)
+
+    snapshot = TodoService.get_changes(None, None, None)
+    assert snapshot.success and snapshot.snapshot
+    assert [todo.title for todo in snapshot.todos] == ['First']
+
+    storage.create('Second', None)
+    storage.delete(1)
+    # A negative limit is clamped to one change per call
+    first = TodoService.get_changes(None, snapshot.version, -1)
+    assert not first.snapshot and first.has_more
+    rest = TodoService.get_changes(None, first.version, None)
+    assert [(change.operation, change.todo_id) for change in first.changes + rest.changes] == [
+        ('create', 2), ('delete', 1)
+    ]
+    assert rest.version == storage.version
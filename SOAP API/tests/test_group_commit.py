@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from group_commit import GroupCommitStorage
+from storage import create_storage
+
+class CountingStorage:
+    """Forwards to a real storage and counts the transactions it runs"""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.transactions = 0
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    def transaction(self):
+        self.transactions += 1
+        return self.storage.transaction()
+
+@pytest.fixture
+def counted(tmp_path):
+    return CountingStorage(create_storage('indexed', str(tmp_path / 'todos.json')))
+
+def create_concurrently(storage, count):
+    start = threading.Barrier(count, timeout=5)
+    results = [None] * count
+
+    def create(index):
+        start.wait()
+        results[index] = storage.create(f'Todo {index}', None)
+
+    threads = [threading.Thread(target=create, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return results
+
+def test_concurrent_writes_share_transactions(counted):
+    storage = GroupCommitStorage(counted, window=0.05)
+    results = create_concurrently(storage, 16)
+
+    assert sorted(todo['id'] for todo in results) == list(range(1, 17))
+    assert counted.transactions < 16
+
+def test_max_batch_caps_a_transaction(counted):
+    storage = GroupCommitStorage(counted, window=0.05, max_batch=4)
+    create_concurrently(storage, 16)
+    assert counted.transactions >= 4
+
+def test_each_caller_gets_its_own_result_and_error(counted):
+    storage = GroupCommitStorage(counted)
+    storage.create('Exists', None)
+    assert storage.update(1, completed=True)['completed'] is True
+    assert storage.update(99, completed=True) is None
+
+    def broken(*args):
+        raise ValueError('bad input')
+    with pytest.raises(ValueError):
+        storage._submit(broken)
+    # The failure stayed with its caller
+    assert storage.create('After', None)['id'] == 2
+
+def test_transaction_bypasses_the_queue(counted):
+    storage = GroupCommitStorage(counted)
+    with storage.transaction():
+        storage.create('One', None)
+        storage.create('Two', None)
+    assert counted.transactions == 1
+    assert [todo['title'] for todo in storage.read_all()] == ['One', 'Two']
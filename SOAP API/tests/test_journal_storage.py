@@ -0,0 +1,70 @@
+import json
+
+from journal_storage import JournalTodoStorage
+
+def open_storage(tmp_path, **options):
+    return JournalTodoStorage(str(tmp_path / 'todos.json'), **options)
+
+def test_replays_journal_on_restart(tmp_path):
+    storage = open_storage(tmp_path)
+    first = storage.create('First', 'a')
+    second = storage.create('Second', None)
+    storage.update(first['id'], completed=True)
+    storage.delete(second['id'])
+    storage.close()
+
+    storage = open_storage(tmp_path)
+    assert [dict(todo) for todo in storage.read_all()] == [
+        {'id': 1, 'title': 'First', 'description': 'a', 'completed': True}
+    ]
+    # Deleted ids are not reused
+    assert storage.create('Third', None)['id'] == 3
+    storage.close()
+
+def test_torn_tail_is_truncated_before_appending(tmp_path):
+    storage = open_storage(tmp_path)
+    storage.create('One', None)
+    storage.create('Two', None)
+    storage.close()
+
+    journal = tmp_path / 'todos.json.journal'
+    with open(journal, 'a') as f:
+        f.write('{"op":"put","todo":{"id":3,"ti')
+
+    # Recovery drops the torn record and later writes survive another restart
+    storage = open_storage(tmp_path)
+    assert [todo['id'] for todo in storage.read_all()] == [1, 2]
+    storage.create('Three', None)
+    storage.create('Four', None)
+    storage.close()
+
+    storage = open_storage(tmp_path)
+    assert [todo['title'] for todo in storage.read_all()] == ['One', 'Two', 'Three', 'Four']
+    storage.close()
+    for line in journal.read_text().splitlines():
+        json.loads(line)
+
+def test_record_without_newline_counts_as_torn(tmp_path):
+    storage = open_storage(tmp_path)
+    storage.create('One', None)
+    storage.close()
+
+    journal = tmp_path / 'todos.json.journal'
+    journal.write_text(journal.read_text() + '{"op":"delete","todo":{"id":1}}')
+
+    storage = open_storage(tmp_path)
+    assert [todo['id'] for todo in storage.read_all()] == [1]
+    storage.close()
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    storage = open_storage(tmp_path, compact_threshold=1)
+    for index in range(5):
+        storage.create(f'Todo {index}', None)
+    storage.compact()
+    storage.close()
+
+    with open(tmp_path / 'todos.json') as f:
+        assert [todo['id'] for todo in json.load(f)] == [1, 2, 3, 4, 5]
+    storage = open_storage(tmp_path)
+    assert len(storage.read_all()) == 5
+    storage.close()
@@ -0,0 +1,35 @@
+import pytest
+
+from instrumentation import MetricsMiddleware
+from metrics import MAX_PROFILE_SECONDS, profile_seconds
+
+class RecordingProfiler:
+    def __init__(self):
+        self.windows = []
+
+    def start(self, seconds):
+        self.windows.append(seconds)
+        return 'profile.pstats'
+
+def post_profile(middleware, query):
+    statuses = []
+    environ = {'PATH_INFO': '/debug/profile', 'REQUEST_METHOD': 'POST', 'QUERY_STRING': query, 'REMOTE_ADDR': '127.0.0.1'}
+    body = b''.join(middleware(environ, lambda status, headers: statuses.append(status)))
+    return statuses[0], body
+
+@pytest.mark.parametrize('query, expected', [
+    ('', 30), ('seconds=5', 5), ('seconds=0', 1), ('seconds=-3', 1), ('seconds=1e9', MAX_PROFILE_SECONDS)
+])
+def test_profile_seconds_are_clamped(query, expected):
+    assert profile_seconds(query) == expected
+
+@pytest.mark.parametrize('query', ['seconds=abc', 'seconds=nan', 'seconds=inf'])
+def test_bad_profile_seconds_get_a_400(query):
+    profiler = RecordingProfiler()
+    middleware = MetricsMiddleware(None, ['127.0.0.1/32'], profiler)
+    status, body = post_profile(middleware, query)
+    assert status.startswith('400') and b'seconds' in body
+    assert profiler.windows == []
+
+    status, _ = post_profile(middleware, 'seconds=10')
+    assert status.startswith('202') and profiler.windows == [10]
@@ -0,0 +1,79 @@
+import io
+
+from response_cache import CachingMiddleware, ResponseCache
+
+ENVELOPE = b'<soapenv:Envelope><soapenv:Body><tns:%s><tns:todo_id>1</tns:todo_id></tns:%s></soapenv:Body></soapenv:Envelope>'
+
+class App:
+    """WSGI app that counts its calls and answers with the current version"""
+
+    def __init__(self):
+        self.version = 1
+        self.calls = 0
+
+    def __call__(self, environ, start_response):
+        self.calls += 1
+        environ['wsgi.input'].read()
+        start_response('200 OK', [('Content-Type', 'text/xml'), ('Content-Length', '9')])
+        return [f'version {self.version}'.encode()]
+
+def call(app, operation='get_todo', etag=None):
+    body = ENVELOPE % (operation.encode(), operation.encode())
+    environ = {'REQUEST_METHOD': 'POST', 'CONTENT_LENGTH': str(len(body)), 'wsgi.input': io.BytesIO(body)}
+    if etag:
+        environ['HTTP_IF_NONE_MATCH'] = etag
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = status
+        response['headers'] = dict(headers)
+
+    response['body'] = b''.join(app(environ, start_response))
+    return response
+
+def make_cached(max_bytes=1024):
+    app = App()
+    return app, CachingMiddleware(app, ResponseCache(max_bytes), lambda: app.version, ('get_todo',))
+
+def test_repeated_reads_are_served_from_the_cache():
+    app, cached = make_cached()
+    first = call(cached)
+    second = call(cached)
+    assert app.calls == 1
+    assert second['body'] == first['body'] == b'version 1'
+    assert second['headers']['ETag'] == first['headers']['ETag']
+
+def test_matching_etag_gets_not_modified():
+    app, cached = make_cached()
+    etag = call(cached)['headers']['ETag']
+    response = call(cached, etag=etag)
+    assert response['status'].startswith('304')
+    assert app.calls == 1
+
+def test_a_new_version_misses_the_cache():
+    app, cached = make_cached()
+    etag = call(cached)['headers']['ETag']
+    app.version = 2
+    response = call(cached, etag=etag)
+    assert response['status'].startswith('200')
+    assert response['body'] == b'version 2'
+    assert app.calls == 2
+
+def test_other_operations_pass_through():
+    app, cached = make_cached()
+    call(cached, 'create_todo')
+    call(cached, 'create_todo')
+    assert app.calls == 2
+
+def test_cache_evicts_least_recently_used_within_its_size():
+    cache = ResponseCache(max_bytes=10)
+    cache.put('a', [], b'aaaa')
+    cache.put('b', [], b'bbbb')
+    cache.get('a')
+    cache.put('c', [], b'cccc')
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.size == 8
+    # Bodies larger than the whole cache are not stored
+    cache.put('big', [], b'x' * 11)
+    assert cache.get('big') is None
@@ -0,0 +1,38 @@
+from search_index import SearchIndex, tokenize
+
+def todo(todo_id, title, description=None, completed=False):
+    return {'id': todo_id, 'title': title, 'description': description, 'completed': completed}
+
+def test_tokenize_folds_case_and_splits_on_punctuation():
+    assert tokenize('Buy MILK, then snake_case!') == {'buy', 'milk', 'then', 'snake', 'case'}
+    assert tokenize(None) == frozenset()
+
+def test_search_matches_every_term_in_title_or_description():
+    index = SearchIndex([
+        todo(1, 'Buy milk', 'from the shop'),
+        todo(2, 'Buy stamps'),
+        todo(3, 'Milk the cow', 'buy a bucket first'),
+    ])
+    assert index.search('buy milk') == [1, 3]
+    assert index.search('STAMPS') == [2]
+    assert index.search('buy bread') == []
+    # An empty query matches everything
+    assert index.search('') == [1, 2, 3]
+
+def test_completed_filter():
+    index = SearchIndex([todo(1, 'Write tests'), todo(2, 'Write docs', completed=True)])
+    assert index.search('write', completed=True) == [2]
+    assert index.search(None, completed=False) == [1]
+
+def test_updates_and_removals_keep_the_index_current():
+    index = SearchIndex([todo(1, 'Old title'), todo(2, 'Other')])
+    index.add(todo(1, 'New title', completed=True))
+    assert index.search('old') == []
+    assert index.search('new', completed=True) == [1]
+    assert index.search(None, completed=False) == [2]
+
+    index.remove(1)
+    assert index.search('title') == []
+    assert index.search('') == [2]
+    # Postings for words no todo uses any more are dropped
+    assert 'new' not in index._postings
@@ -0,0 +1,35 @@
+import json
+
+from sqlite_storage import SQLiteTodoStorage
+
+def test_new_database_is_seeded_from_the_json_file(tmp_path):
+    data_file = tmp_path / 'todos.json'
+    data_file.write_text(json.dumps([
+        {'id': 4, 'title': 'Imported', 'description': 'from json', 'completed': True},
+    ]))
+    storage = SQLiteTodoStorage(str(data_file))
+    assert storage.read_all() == [{'id': 4, 'title': 'Imported', 'description': 'from json', 'completed': True}]
+    assert storage.create('Next', None)['id'] == 5
+
+    # Only a new database is seeded; later edits to the json file are ignored
+    data_file.write_text('[]')
+    assert len(SQLiteTodoStorage(str(data_file)).read_all()) == 2
+
+def test_connections_share_data_and_version(tmp_path):
+    # Two storages on one database behave like two server processes
+    first = SQLiteTodoStorage(str(tmp_path / 'todos.json'))
+    second = SQLiteTodoStorage(str(tmp_path / 'todos.json'))
+    first.create('Shared', None)
+    assert second.read(1)['title'] == 'Shared'
+    assert second.version == first.version
+    second.delete(1)
+    assert first.read(1) is None
+
+def test_search_without_full_text_scans(tmp_path):
+    storage = SQLiteTodoStorage(str(tmp_path / 'todos.json'))
+    storage.create('Buy milk', 'and bread')
+    storage.create('Buy stamps', None)
+    results = storage.search('BUY bread')[0]
+    storage.full_text = False
+    assert [todo['id'] for todo in results] == [1]
+    assert storage.search('buy bread') == (results, False)
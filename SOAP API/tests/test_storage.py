@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from storage import RWLock, TodoStorage
+
+def queue_writer_during_first_read(storage, write) -> threading.Thread:
+    """Start ``write`` in a thread as soon as a reader holds the lock, and wait until it queues"""
+    original_read = storage._lock.read
+    writer = threading.Thread(target=write, daemon=True)
+
+    @contextmanager
+    def read():
+        with original_read():
+            if writer.ident is None:
+                writer.start()
+                while not storage._lock._waiting_writers:
+                    time.sleep(0.001)
+            yield
+
+    storage._lock.read = read
+    return writer
+
+def run_with_timeout(call, timeout=5):
+    """Run call in a thread; returns its result or fails if it never finishes"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(call()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), 'deadlocked'
+    return result[0]
+
+def test_read_page_with_queued_writer_does_not_deadlock(tmp_path):
+    storage = TodoStorage(str(tmp_path / 'todos.json'))
+    storage.create('First', None)
+    writer = queue_writer_during_first_read(storage, lambda: storage.create('Second', None))
+
+    page, has_more = run_with_timeout(lambda: storage.read_page(10))
+    assert [todo['title'] for todo in page] == ['First'] and not has_more
+    writer.join(5)
+    assert not writer.is_alive()
+    assert len(storage.read_all()) == 2
+
+def test_search_with_queued_writer_does_not_deadlock(tmp_path):
+    storage = TodoStorage(str(tmp_path / 'todos.json'))
+    storage.create('Buy milk', None)
+    writer = queue_writer_during_first_read(storage, lambda: storage.create('Buy bread', None))
+
+    matches, has_more = run_with_timeout(lambda: storage.search('buy'))
+    assert [todo['title'] for todo in matches] == ['Buy milk'] and not has_more
+    writer.join(5)
+    assert not writer.is_alive()
+
+def test_readers_share_the_lock():
+    lock = RWLock()
+    inside = threading.Barrier(3, timeout=5)
+
+    def read():
+        with lock.read():
+            inside.wait()
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    for reader in readers:
+        reader.start()
+    # All three hold the read lock at once or the barrier times out
+    read()
+    for reader in readers:
+        reader.join(5)
+
+def test_waiting_writer_blocks_new_readers():
+    lock = RWLock()
+    events = []
+
+    def write():
+        with lock.write():
+            events.append('write')
+
+    def read():
+        with lock.read():
+            events.append('late read')
+
+    with lock.read():
+        writer = threading.Thread(target=write)
+        writer.start()
+        while not lock._waiting_writers:
+            time.sleep(0.001)
+        reader = threading.Thread(target=read)
+        reader.start()
+        time.sleep(0.05)
+        # Neither gets in while the first reader holds the lock
+        assert events == []
+    writer.join(5)
+    reader.join(5)
+    assert events == ['write', 'late read']
+
+def test_writer_may_reenter_and_read():
+    lock = RWLock()
+    with lock.write():
+        with lock.write():
+            with lock.read():
+                pass
+
+    def write():
+        with lock.write():
+            return True
+
+    # Released completely: another thread can write now
+    assert run_with_timeout(write)
+
+def test_concurrent_creates_get_distinct_ids(tmp_path):
+    storage = TodoStorage(str(tmp_path / 'todos.json'))
+    threads = [threading.Thread(target=storage.create, args=(f'Todo {i}', None)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert sorted(todo['id'] for todo in storage.read_all()) == list(range(1, 21))
+
+def test_failed_write_keeps_the_old_file(tmp_path, monkeypatch):
+    storage = TodoStorage(str(tmp_path / 'todos.json'))
+    storage.create('Safe', None)
+
+    def broken_dump(*args, **kwargs):
+        raise OSError('disk full')
+    monkeypatch.setattr('storage.json.dump', broken_dump)
+    with pytest.raises(OSError):
+        storage.create('Lost', None)
+    monkeypatch.undo()
+
+    assert [todo['title'] for todo in storage.read_all()] == ['Safe']
+    # The temp file was cleaned up
+    assert os.listdir(tmp_path) == ['todos.json']
@@ -0,0 +1,108 @@
+import pytest
+
+from storage import create_storage
+
+BACKENDS = ['json', 'indexed', 'journal', 'sqlite']
+
+def open_storage(backend, tmp_path):
+    return create_storage(backend, str(tmp_path / 'todos.json'))
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    return request.param
+
+@pytest.fixture
+def storage(backend, tmp_path):
+    return open_storage(backend, tmp_path)
+
+def test_crud_round_trip(storage):
+    first = storage.create('Buy milk', 'two litres')
+    second = storage.create('Walk dog', None)
+    assert (first['id'], second['id']) == (1, 2)
+    assert dict(storage.read(1)) == {'id': 1, 'title': 'Buy milk', 'description': 'two litres', 'completed': False}
+
+    updated = storage.update(1, completed=True)
+    # Fields that were not passed keep their value
+    assert (updated['title'], updated['description'], updated['completed']) == ('Buy milk', 'two litres', True)
+    assert storage.update(99, title='missing') is None
+
+    assert storage.delete(2)
+    assert not storage.delete(2)
+    assert storage.read(2) is None
+    assert [todo['id'] for todo in storage.read_all()] == [1]
+
+def test_data_survives_reopening(backend, tmp_path):
+    storage = open_storage(backend, tmp_path)
+    storage.create('Kept', 'on disk')
+    storage.create('Removed', None)
+    storage.update(1, completed=True)
+    storage.delete(2)
+
+    reopened = open_storage(backend, tmp_path)
+    assert [dict(todo) for todo in reopened.read_all()] == [
+        {'id': 1, 'title': 'Kept', 'description': 'on disk', 'completed': True}
+    ]
+
+def test_version_increases_with_every_mutation(storage):
+    versions = [storage.version]
+    storage.create('One', None)
+    versions.append(storage.version)
+    storage.update(1, title='Uno')
+    versions.append(storage.version)
+    storage.delete(1)
+    versions.append(storage.version)
+    assert versions == sorted(set(versions))
+
+def test_read_page_filters(storage):
+    for index in range(6):
+        storage.create(f'{"Work" if index % 2 else "Home"} {index}', None)
+    storage.update(2, completed=True)
+    storage.update(4, completed=True)
+
+    page, has_more = storage.read_page(2)
+    assert [todo['id'] for todo in page] == [1, 2] and has_more
+    page, has_more = storage.read_page(10, after_id=4)
+    assert [todo['id'] for todo in page] == [5, 6] and not has_more
+    page, _ = storage.read_page(10, completed=True)
+    assert [todo['id'] for todo in page] == [2, 4]
+    page, _ = storage.read_page(10, title_prefix='Work')
+    assert [todo['id'] for todo in page] == [2, 4, 6]
+    page, has_more = storage.read_page(2, offset=1, title_prefix='Work')
+    assert [todo['id'] for todo in page] == [4, 6] and not has_more
+
+def test_transaction_rolls_back_on_error(storage):
+    storage.create('Before', None)
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.create('Inside', None)
+            storage.update(1, title='Changed')
+            raise RuntimeError
+    assert [(todo['id'], todo['title']) for todo in storage.read_all()] == [(1, 'Before')]
+
+def test_transaction_commits_every_operation(backend, tmp_path):
+    storage = open_storage(backend, tmp_path)
+    with storage.transaction():
+        storage.create('One', None)
+        storage.create('Two', None)
+        storage.delete(1)
+    assert [todo['id'] for todo in open_storage(backend, tmp_path).read_all()] == [2]
+
+def test_write_all_replaces_everything(storage):
+    storage.create('Old', None)
+    storage.write_all([
+        {'id': 5, 'title': 'Five', 'description': None, 'completed': True},
+        {'id': 3, 'title': 'Three', 'description': 'x', 'completed': False},
+    ])
+    assert sorted(todo['id'] for todo in storage.read_all()) == [3, 5]
+    assert storage.create('New', None)['id'] == 6
+
+def test_unknown_backend_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        create_storage('csv', str(tmp_path / 'todos.json'))
+
+def test_indexed_records_do_not_change_under_readers(tmp_path):
+    storage = open_storage('indexed', tmp_path)
+    todo = storage.create('Original', None)
+    storage.update(todo['id'], title='Renamed')
+    assert todo['title'] == 'Original'
+    assert storage.read(todo['id'])['title'] == 'Renamed'
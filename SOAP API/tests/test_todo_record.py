@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from todo_record import TodoRecord
+
+def test_behaves_like_a_read_only_todo_dict():
+    record = TodoRecord(1, 'Title', None, 0)
+    assert record['title'] == 'Title'
+    assert record.get('missing') is None
+    assert dict(record) == {'id': 1, 'title': 'Title', 'description': None, 'completed': False}
+    assert json.loads(json.dumps([record], default=dict)) == [dict(record)]
+    with pytest.raises(AttributeError):
+        record.title = 'Changed'
+    with pytest.raises(TypeError):
+        record['title'] = 'Changed'
+
+def test_replace_changes_only_given_fields():
+    record = TodoRecord(1, 'Title', 'Details', False)
+    done = record.replace(completed=True)
+    assert (done.title, done.description, done.completed) == ('Title', 'Details', True)
+    assert record.completed is False
+
+def test_from_dict_reuses_records_and_interns_strings():
+    record = TodoRecord.from_dict({'id': 1, 'title': ''.join(['Sha', 'red'])})
+    assert TodoRecord.from_dict(record) is record
+    assert record.description is None and record.completed is False
+    other = TodoRecord(2, ''.join(['Sha', 'red']), None)
+    assert other.title is record.title
+
+def test_has_no_instance_dict():
+    assert not hasattr(TodoRecord(1, 'Title', None), '__dict__')
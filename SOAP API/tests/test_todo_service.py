@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+
+import pytest
+
+from storage import create_storage
+from todo_service import TodoInput, TodoService, TodoUpdate
+
+@pytest.fixture(params=['json', 'indexed', 'sqlite'])
+def service(request, tmp_path, monkeypatch):
+    storage = create_storage(request.param, str(tmp_path / 'todos.json'))
+    monkeypatch.setattr(TodoService, 'storage', storage)
+    for index in range(5):
+        storage.create(f'Todo {index}', 'shared word' if index % 2 else None)
+    return TodoService
+
+def test_get_todos_page_follows_cursor(service):
+    first = service.get_todos_page(None, None, None, 2, None, None)
+    assert [todo.id for todo in first.todos] == [1, 2]
+    second = service.get_todos_page(None, first.next_cursor, None, 10, None, None)
+    assert [todo.id for todo in second.todos] == [3, 4, 5]
+    assert second.next_cursor is None
+
+@pytest.mark.parametrize('limit', [-5, -1, 0])
+def test_non_positive_limit_is_clamped(service, limit):
+    response = service.get_todos_page(None, None, None, limit, None, None)
+    assert response.success
+    # 0 means "default", negative values are raised to one todo
+    assert len(response.todos) == (5 if limit == 0 else 1)
+
+def test_negative_offset_is_ignored(service):
+    response = service.get_todos_page(None, None, -3, 2, None, None)
+    assert response.success
+    assert [todo.id for todo in response.todos] == [1, 2]
+
+def test_invalid_cursor_is_reported(service):
+    response = service.get_todos_page(None, 'not-a-number', None, 2, None, None)
+    assert not response.success
+    assert response.message == 'Invalid cursor: not-a-number'
+
+def test_storage_errors_are_not_reported_as_cursor_errors(service, monkeypatch):
+    def broken(*args, **kwargs):
+        raise ValueError('disk says no')
+    monkeypatch.setattr(service.storage, 'read_page', broken)
+    response = service.get_todos_page(None, None, None, 2, None, None)
+    assert not response.success
+    assert response.message == 'Error retrieving todos: disk says no'
+
+def test_search_todos_clamps_limit(service):
+    response = service.search_todos(None, 'shared', None, None, -2)
+    assert response.success
+    assert [todo.id for todo in response.todos] == [2]
+    assert response.next_cursor == '2'
+
+def test_batch_operations_answer_each_item(service):
+    created = service.create_todos(None, [TodoInput(title='Six', description=None), TodoInput(title='Seven', description='x')])
+    assert [(response.success, response.todo.id) for response in created] == [(True, 6), (True, 7)]
+
+    updated = service.update_todos(None, [TodoUpdate(id=6, completed=True), TodoUpdate(id=99, title='Missing')])
+    assert updated[0].success and updated[0].todo.completed
+    assert not updated[1].success and updated[1].message == 'Todo with ID 99 not found'
+
+    fetched = service.get_todos_by_ids(None, [7, 99, 6])
+    assert [response.success for response in fetched] == [True, False, True]
+    assert [fetched[0].todo.title, fetched[2].todo.title] == ['Seven', 'Six']
+
+    deleted = service.delete_todos(None, [6, 6])
+    assert [response.success for response in deleted] == [True, False]
+    assert [todo.id for todo in service.get_todos_page(None, None, None, 10, None, None).todos] == [1, 2, 3, 4, 5, 7]
+
+def test_batch_runs_in_one_transaction(service, monkeypatch):
+    original = service.storage.transaction
+    outer, depth = [], []
+
+    @contextmanager
+    def transaction():
+        # Backends open nested transactions of their own, count only the outermost
+        if not depth:
+            outer.append(1)
+        depth.append(1)
+        try:
+            with original():
+                yield
+        finally:
+            depth.pop()
+
+    monkeypatch.setattr(service.storage, 'transaction', transaction)
+    service.create_todos(None, [TodoInput(title=f'Batch {index}', description=None) for index in range(3)])
+    assert len(outer) == 1
+
+def test_empty_batches_return_nothing(service):
+    assert service.create_todos(None, None) == []
+    assert service.get_todos_by_ids(None, None) == []
+    assert service.delete_todos(None, []) == []
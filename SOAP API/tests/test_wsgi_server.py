@@ -0,0 +1,84 @@
+import http.client
+import socket
+import threading
+import time
+
+import pytest
+
+from wsgi_server import make_threaded_server
+
+def hello(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'hello']
+
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start(app, threads, backlog=128, keepalive_timeout=5):
+        server = make_threaded_server('127.0.0.1', 0, app, threads, backlog, keepalive_timeout)
+        threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        servers.append(server)
+        return server.server_address[1]
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def get(connection, path='/'):
+    connection.request('GET', path)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+def test_idle_keepalive_connections_do_not_hold_workers(start_server):
+    port = start_server(hello, threads=2)
+    idle = [http.client.HTTPConnection('127.0.0.1', port, timeout=5) for _ in range(2)]
+    for connection in idle:
+        assert get(connection) == (200, b'hello')
+
+    # Both workers would be stuck on the idle connections above until they time out
+    started = time.monotonic()
+    third = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    assert get(third) == (200, b'hello')
+    assert time.monotonic() - started < 1
+
+    # The parked connections are still usable
+    for connection in idle + [third]:
+        assert get(connection) == (200, b'hello')
+        connection.close()
+
+def test_idle_connections_are_closed_after_the_keepalive_timeout(start_server):
+    port = start_server(hello, threads=1, keepalive_timeout=0.2)
+    client = socket.create_connection(('127.0.0.1', port), timeout=5)
+    client.sendall(b'GET / HTTP/1.1\r\nHost: test\r\n\r\n')
+    received = b''
+    while not received.endswith(b'hello'):
+        received += client.recv(4096)
+    assert received.startswith(b'HTTP/1.1 200')
+    assert client.recv(4096) == b''
+    client.close()
+
+def test_full_queue_rejects_new_connections(start_server):
+    entered, release = threading.Event(), threading.Event()
+
+    def slow(environ, start_response):
+        entered.set()
+        release.wait(5)
+        return hello(environ, start_response)
+
+    port = start_server(slow, threads=1, backlog=1)
+    busy = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    busy.request('GET', '/')
+    assert entered.wait(5)
+
+    queued = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    queued.request('GET', '/')
+    rejected = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    assert get(rejected)[0] == 503
+
+    release.set()
+    assert busy.getresponse().read() == b'hello'
+    assert queued.getresponse().read() == b'hello'
+    for connection in (busy, queued, rejected):
+        connection.close()
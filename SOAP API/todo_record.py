@@ -0,0 +1,59 @@
+import sys
+from collections.abc import Mapping
+from typing import Dict, Optional
+
+FIELDS = ('id', 'title', 'description', 'completed')
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    # Repeated titles/descriptions ("Build SOAP API") then share one string
+    return sys.intern(value) if type(value) is str else value
+
+class TodoRecord(Mapping):
+    """Immutable todo held by the in-memory backends.
+
+    Uses ``__slots__`` instead of a per-todo dict and interns its strings,
+    which roughly halves the memory of a large index. It is a read-only
+    Mapping, so code written against todo dicts (``todo['title']``,
+    ``dict(todo)``, ``json.dump(..., default=dict)``) keeps working.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, id: int, title: str, description: Optional[str], completed: bool = False):
+        set_field = object.__setattr__
+        set_field(self, 'id', id)
+        set_field(self, 'title', _intern(title))
+        set_field(self, 'description', _intern(description))
+        set_field(self, 'completed', bool(completed))
+
+    @classmethod
+    def from_dict(cls, todo: Dict) -> 'TodoRecord':
+        if type(todo) is cls:
+            return todo
+        return cls(todo['id'], todo['title'], todo.get('description'), todo.get('completed', False))
+
+    def replace(self, title: str = None, description: str = None, completed: bool = None) -> 'TodoRecord':
+        """Copy with the given fields changed; None leaves a field as it is"""
+        return TodoRecord(
+            self.id,
+            self.title if title is None else title,
+            self.description if description is None else description,
+            self.completed if completed is None else completed
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError('TodoRecord is immutable, use replace()')
+
+    def __getitem__(self, key: str):
+        if key in FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f'TodoRecord(id={self.id!r}, title={self.title!r}, description={self.description!r}, completed={self.completed!r})'
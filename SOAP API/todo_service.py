@@ -2,7 +2,51 @@ from spyne import Application, rpc, ServiceBase, Integer, Unicode, Boolean
 from spyne.protocol.soap import Soap11
 from spyne.model.complex import ComplexModel, Array
 
-from storage import TodoStorage
+from storage import create_storage
+from change_feed import ChangeFeedStorage
+from group_commit import GroupCommitStorage
+from instrumentation import InstrumentedStorage
+
+try:
+    from config import (
+        DATA_FILE, STORAGE_BACKEND, STORAGE_OPTIONS,
+        GROUP_COMMIT, GROUP_COMMIT_WINDOW_MS, GROUP_COMMIT_MAX_BATCH
+    )
+except ImportError:
+    DATA_FILE = 'data/todos.json'
+    STORAGE_BACKEND = 'json'
+    STORAGE_OPTIONS = {}
+    GROUP_COMMIT = False
+    GROUP_COMMIT_WINDOW_MS = 2
+    GROUP_COMMIT_MAX_BATCH = 128
+
+try:
+    from config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+except ImportError:
+    PAGE_SIZE_DEFAULT = 100
+    PAGE_SIZE_MAX = 1000
+
+try:
+    from config import METRICS
+except ImportError:
+    METRICS = False
+
+try:
+    from config import CHANGE_FEED_SIZE
+except ImportError:
+    CHANGE_FEED_SIZE = 10000
+
+def _create_storage():
+    """Build the configured storage backend with its change feed, wrapped for group commit and metrics if enabled"""
+    storage = create_storage(STORAGE_BACKEND, DATA_FILE, **STORAGE_OPTIONS.get(STORAGE_BACKEND, {}))
+    if not hasattr(storage, 'changes_since'):
+        # SQLite keeps its feed in the database; the per-process backends get one in memory
+        storage = ChangeFeedStorage(storage, CHANGE_FEED_SIZE)
+    if GROUP_COMMIT:
+        storage = GroupCommitStorage(storage, GROUP_COMMIT_WINDOW_MS / 1000, GROUP_COMMIT_MAX_BATCH)
+    if METRICS:
+        storage = InstrumentedStorage(storage, STORAGE_BACKEND)
+    return storage
 
 #ANCHOR Define Todo complex type
 class Todo(ComplexModel):
@@ -21,38 +65,88 @@ class TodoListResponse(ComplexModel):
     success = Boolean
     message = Unicode
     todos = Array(Todo)
+    next_cursor = Unicode
 
 class SimpleResponse(ComplexModel):
     success = Boolean
     message = Unicode
 
+class TodoChange(ComplexModel):
+    version = Integer
+    operation = Unicode  # create, update or delete
+    todo_id = Integer
+    todo = Todo  # empty for deletes
+
+class TodoChangesResponse(ComplexModel):
+    success = Boolean
+    message = Unicode
+    version = Integer  # pass back as since_version
+    snapshot = Boolean  # todos then holds every todo, replacing whatever the caller had
+    changes = Array(TodoChange)
+    todos = Array(Todo)
+    has_more = Boolean
+
+#ANCHOR Define batch input types
+class TodoInput(ComplexModel):
+    title = Unicode
+    description = Unicode
+
+class TodoUpdate(ComplexModel):
+    id = Integer
+    title = Unicode
+    description = Unicode
+    completed = Boolean
+
+#ANCHOR Fast model construction
+# ComplexModel.__init__ walks the type info and validates every field on each
+# instantiation. Responses are built from trusted storage values, so fill the
+# instance dict directly instead.
+_MODEL_FIELDS = {}
+
+def _build(model_class, **values):
+    """Instantiate a ComplexModel from field values without per-field init"""
+    fields = _MODEL_FIELDS.get(model_class)
+    if fields is None:
+        fields = _MODEL_FIELDS[model_class] = dict.fromkeys(model_class.get_flat_type_info(model_class))
+    instance = model_class.__new__(model_class)
+    instance.__dict__.update(fields)
+    instance.__dict__.update(values)
+    return instance
+
+def _todo_from_dict(todo_dict):
+    """Map a stored todo straight onto a Todo model"""
+    return _build(
+        Todo,
+        id=todo_dict['id'],
+        title=todo_dict['title'],
+        description=todo_dict['description'],
+        completed=todo_dict['completed']
+    )
+
+def _todo_response(todo_dict, message):
+    """Build a successful TodoResponse for a stored todo"""
+    return _build(TodoResponse, success=True, message=message, todo=_todo_from_dict(todo_dict))
+
+def _error_response(response_class, message):
+    """Build a failed response of the given type"""
+    return _build(response_class, success=False, message=message)
+
+def _page_limit(limit):
+    """Requested page size clamped to 1..PAGE_SIZE_MAX, PAGE_SIZE_DEFAULT when missing"""
+    return max(1, min(limit or PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX))
+
 #ANCHOR SOAP Service
 class TodoService(ServiceBase):
-    storage = TodoStorage()
+    storage = _create_storage()
     
     @rpc(Unicode, Unicode, _returns=TodoResponse)
     def create_todo(ctx, title, description):
         """Create a new todo item"""
         try:
             todo_dict = TodoService.storage.create(title, description)
-            
-            todo = Todo()
-            todo.id = todo_dict['id']
-            todo.title = todo_dict['title']
-            todo.description = todo_dict['description']
-            todo.completed = todo_dict['completed']
-            
-            response = TodoResponse()
-            response.success = True
-            response.message = "Todo created successfully"
-            response.todo = todo
-            
-            return response
+            return _todo_response(todo_dict, "Todo created successfully")
         except Exception as e:
-            response = TodoResponse()
-            response.success = False
-            response.message = f"Error creating todo: {str(e)}"
-            return response
+            return _error_response(TodoResponse, f"Error creating todo: {str(e)}")
     
     @rpc(Integer, _returns=TodoResponse)
     def get_todo(ctx, todo_id):
@@ -61,55 +155,125 @@ class TodoService(ServiceBase):
             todo_dict = TodoService.storage.read(todo_id)
             
             if todo_dict is None:
-                response = TodoResponse()
-                response.success = False
-                response.message = f"Todo with ID {todo_id} not found"
-                return response
-            
-            todo = Todo()
-            todo.id = todo_dict['id']
-            todo.title = todo_dict['title']
-            todo.description = todo_dict['description']
-            todo.completed = todo_dict['completed']
+                return _error_response(TodoResponse, f"Todo with ID {todo_id} not found")
             
-            response = TodoResponse()
-            response.success = True
-            response.message = "Todo retrieved successfully"
-            response.todo = todo
-            
-            return response
+            return _todo_response(todo_dict, "Todo retrieved successfully")
         except Exception as e:
-            response = TodoResponse()
-            response.success = False
-            response.message = f"Error retrieving todo: {str(e)}"
-            return response
+            return _error_response(TodoResponse, f"Error retrieving todo: {str(e)}")
     
     @rpc(_returns=Array(TodoResponse))
     def get_all_todos(ctx):
         """Get all todos"""
         try:
             todos_dict = TodoService.storage.read_all()
+            # Models are built one at a time as spyne serializes the array
+            return (_todo_response(todo_dict, "Todo retrieved successfully") for todo_dict in todos_dict)
+        except Exception as e:
+            return [_error_response(TodoResponse, f"Error retrieving todos: {str(e)}")]
+    
+    @rpc(Unicode, Integer, Integer, Boolean, Unicode, _returns=TodoListResponse)
+    def get_todos_page(ctx, cursor, offset, limit, completed, title_prefix):
+        """Get one page of todos in id order, optionally filtered.
+        
+        Pass the returned next_cursor back as cursor to get the following page;
+        it is empty on the last page.
+        """
+        try:
+            after_id = int(cursor) if cursor else None
+        except ValueError:
+            return _error_response(TodoListResponse, f"Invalid cursor: {cursor}")
+        
+        try:
+            todo_dicts, has_more = TodoService.storage.read_page(
+                _page_limit(limit),
+                after_id=after_id,
+                offset=max(offset or 0, 0),
+                completed=completed,
+                title_prefix=title_prefix
+            )
             
-            responses = []
-            for todo_dict in todos_dict:
-                todo = Todo()
-                todo.id = todo_dict['id']
-                todo.title = todo_dict['title']
-                todo.description = todo_dict['description']
-                todo.completed = todo_dict['completed']
-                
-                response = TodoResponse()
-                response.success = True
-                response.message = "Todo retrieved successfully"
-                response.todo = todo
-                responses.append(response)
+            return _build(
+                TodoListResponse,
+                success=True,
+                message=f"Retrieved {len(todo_dicts)} todos",
+                todos=[_todo_from_dict(todo_dict) for todo_dict in todo_dicts],
+                next_cursor=str(todo_dicts[-1]['id']) if has_more else None
+            )
+        except Exception as e:
+            return _error_response(TodoListResponse, f"Error retrieving todos: {str(e)}")
+    
+    @rpc(Unicode, Boolean, Unicode, Integer, _returns=TodoListResponse)
+    def search_todos(ctx, query, completed, cursor, limit):
+        """Find todos whose title or description contain every word of the query.
+        
+        Results are in id order and paged like get_todos_page.
+        """
+        try:
+            after_id = int(cursor) if cursor else None
+        except ValueError:
+            return _error_response(TodoListResponse, f"Invalid cursor: {cursor}")
+        
+        try:
+            todo_dicts, has_more = TodoService.storage.search(
+                query,
+                completed=completed,
+                limit=_page_limit(limit),
+                after_id=after_id
+            )
             
-            return responses
+            return _build(
+                TodoListResponse,
+                success=True,
+                message=f"Found {len(todo_dicts)} todos",
+                todos=[_todo_from_dict(todo_dict) for todo_dict in todo_dicts],
+                next_cursor=str(todo_dicts[-1]['id']) if has_more else None
+            )
         except Exception as e:
-            error_response = TodoResponse()
-            error_response.success = False
-            error_response.message = f"Error retrieving todos: {str(e)}"
-            return [error_response]
+            return _error_response(TodoListResponse, f"Error searching todos: {str(e)}")
+    
+    @rpc(Integer, Integer, _returns=TodoChangesResponse)
+    def get_changes(ctx, since_version, limit):
+        """Get the todos created, updated and deleted after since_version, oldest first.
+        
+        Apply the changes in order (creates and updates as upserts) and pass the
+        returned version back as since_version. Without since_version, or when it
+        is too old for the change feed, a snapshot of every todo comes back instead.
+        """
+        try:
+            limit = _page_limit(limit)
+            storage = TodoService.storage
+            result = storage.changes_since(since_version, limit) if since_version is not None else None
+            
+            if result is None:
+                version, todo_dicts = storage.snapshot()
+                return _build(
+                    TodoChangesResponse,
+                    success=True,
+                    message=f"Snapshot of {len(todo_dicts)} todos",
+                    version=version,
+                    snapshot=True,
+                    todos=[_todo_from_dict(todo_dict) for todo_dict in todo_dicts],
+                    has_more=False
+                )
+            
+            changes, has_more = result
+            return _build(
+                TodoChangesResponse,
+                success=True,
+                message=f"Retrieved {len(changes)} changes",
+                version=changes[-1].version if changes else since_version,
+                snapshot=False,
+                changes=[_build(
+                    TodoChange,
+                    version=change.version,
+                    operation=change.operation,
+                    todo_id=change.todo_id,
+                    todo=_todo_from_dict(change.todo) if change.todo is not None else None
+                ) for change in changes],
+                has_more=has_more
+            )
+        except Exception as e:
+            return _error_response(TodoChangesResponse, f"Error retrieving changes: {str(e)}")
     
     @rpc(Integer, Unicode, Unicode, Boolean, _returns=TodoResponse)
     def update_todo(ctx, todo_id, title, description, completed):
@@ -123,49 +287,101 @@ class TodoService(ServiceBase):
             )
             
             if todo_dict is None:
-                response = TodoResponse()
-                response.success = False
-                response.message = f"Todo with ID {todo_id} not found"
-                return response
-            
-            todo = Todo()
-            todo.id = todo_dict['id']
-            todo.title = todo_dict['title']
-            todo.description = todo_dict['description']
-            todo.completed = todo_dict['completed']
+                return _error_response(TodoResponse, f"Todo with ID {todo_id} not found")
             
-            response = TodoResponse()
-            response.success = True
-            response.message = "Todo updated successfully"
-            response.todo = todo
-            
-            return response
+            return _todo_response(todo_dict, "Todo updated successfully")
         except Exception as e:
-            response = TodoResponse()
-            response.success = False
-            response.message = f"Error updating todo: {str(e)}"
-            return response
+            return _error_response(TodoResponse, f"Error updating todo: {str(e)}")
     
     @rpc(Integer, _returns=SimpleResponse)
     def delete_todo(ctx, todo_id):
         """Delete a todo item"""
         try:
-            success = TodoService.storage.delete(todo_id)
-            
-            response = SimpleResponse()
-            if success:
-                response.success = True
-                response.message = f"Todo with ID {todo_id} deleted successfully"
-            else:
-                response.success = False
-                response.message = f"Todo with ID {todo_id} not found"
-            
-            return response
+            if TodoService.storage.delete(todo_id):
+                return _build(SimpleResponse, success=True, message=f"Todo with ID {todo_id} deleted successfully")
+            return _error_response(SimpleResponse, f"Todo with ID {todo_id} not found")
         except Exception as e:
-            response = SimpleResponse()
-            response.success = False
-            response.message = f"Error deleting todo: {str(e)}"
-            return response
+            return _error_response(SimpleResponse, f"Error deleting todo: {str(e)}")
+
+    #ANCHOR Batch operations, each runs as one storage transaction
+    @rpc(Array(TodoInput), _returns=Array(TodoResponse))
+    def create_todos(ctx, todos):
+        """Create several todo items"""
+        todos = todos or []
+        try:
+            responses = []
+            with TodoService.storage.transaction():
+                for todo_input in todos:
+                    try:
+                        todo_dict = TodoService.storage.create(todo_input.title, todo_input.description)
+                        responses.append(_todo_response(todo_dict, "Todo created successfully"))
+                    except Exception as e:
+                        responses.append(_error_response(TodoResponse, f"Error creating todo: {str(e)}"))
+            return responses
+        except Exception as e:
+            return [_error_response(TodoResponse, f"Error creating todos: {str(e)}") for _ in todos]
+    
+    @rpc(Array(Integer), _returns=Array(TodoResponse))
+    def get_todos_by_ids(ctx, todo_ids):
+        """Get several todos by ID"""
+        responses = []
+        for todo_id in todo_ids or []:
+            try:
+                todo_dict = TodoService.storage.read(todo_id)
+                if todo_dict is None:
+                    responses.append(_error_response(TodoResponse, f"Todo with ID {todo_id} not found"))
+                else:
+                    responses.append(_todo_response(todo_dict, "Todo retrieved successfully"))
+            except Exception as e:
+                responses.append(_error_response(TodoResponse, f"Error retrieving todo: {str(e)}"))
+        return responses
+    
+    @rpc(Array(TodoUpdate), _returns=Array(TodoResponse))
+    def update_todos(ctx, todos):
+        """Update several todo items"""
+        todos = todos or []
+        try:
+            responses = []
+            with TodoService.storage.transaction():
+                for update in todos:
+                    try:
+                        todo_dict = TodoService.storage.update(
+                            update.id,
+                            update.title if update.title else None,
+                            update.description if update.description else None,
+                            update.completed
+                        )
+                        if todo_dict is None:
+                            responses.append(_error_response(TodoResponse, f"Todo with ID {update.id} not found"))
+                        else:
+                            responses.append(_todo_response(todo_dict, "Todo updated successfully"))
+                    except Exception as e:
+                        responses.append(_error_response(TodoResponse, f"Error updating todo: {str(e)}"))
+            return responses
+        except Exception as e:
+            return [_error_response(TodoResponse, f"Error updating todos: {str(e)}") for _ in todos]
+    
+    @rpc(Array(Integer), _returns=Array(SimpleResponse))
+    def delete_todos(ctx, todo_ids):
+        """Delete several todo items"""
+        todo_ids = todo_ids or []
+        try:
+            responses = []
+            with TodoService.storage.transaction():
+                for todo_id in todo_ids:
+                    try:
+                        if TodoService.storage.delete(todo_id):
+                            responses.append(_build(SimpleResponse, success=True, message=f"Todo with ID {todo_id} deleted successfully"))
+                        else:
+                            responses.append(_error_response(SimpleResponse, f"Todo with ID {todo_id} not found"))
+                    except Exception as e:
+                        responses.append(_error_response(SimpleResponse, f"Error deleting todo: {str(e)}"))
+            return responses
+        except Exception as e:
+            return [_error_response(SimpleResponse, f"Error deleting todos: {str(e)}") for _ in todo_ids]
+
+#ANCHOR Operations whose responses depend only on the request and the stored data
+READ_ONLY_OPERATIONS = ('get_todo', 'get_all_todos', 'get_todos_page', 'get_todos_by_ids', 'search_todos', 'get_changes')
 
 #ANCHOR Create SOAP application
 application = Application(
@@ -173,4 +389,15 @@ application = Application(
     tns='todo.soap.service',
     in_protocol=Soap11(validator='lxml'),
     out_protocol=Soap11()
-)
\ No newline at end of file
+)
+
+# Same service without input schema validation, for trusted callers
+unvalidated_application = Application(
+    [TodoService],
+    tns='todo.soap.service',
+    in_protocol=Soap11(),
+    out_protocol=Soap11()
+)
+# Share namespace prefixes so both applications emit identical XML
+unvalidated_application.interface.nsmap.update(application.interface.nsmap)
+unvalidated_application.interface.prefmap.update(application.interface.prefmap)
\ No newline at end of file
@@ -0,0 +1,28 @@
+import ipaddress
+import random
+
+class SampledValidation:
+    """Skips lxml schema validation for trusted callers, except for a sample.
+
+    Requests from ``trusted_networks`` go to ``fast_app`` (same service, no
+    validator) unless they fall in the ``sample_rate`` fraction that is still
+    validated. Everyone else always goes through ``validated_app``.
+    """
+
+    def __init__(self, validated_app, fast_app, trusted_networks, sample_rate: float = 0.0):
+        self.validated_app = validated_app
+        self.fast_app = fast_app
+        self.trusted_networks = [ipaddress.ip_network(network.strip()) for network in trusted_networks if network.strip()]
+        self.sample_rate = sample_rate
+
+    def is_trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_networks)
+
+    def __call__(self, environ, start_response):
+        if self.is_trusted(environ.get('REMOTE_ADDR', '')) and random.random() >= self.sample_rate:
+            return self.fast_app(environ, start_response)
+        return self.validated_app(environ, start_response)
@@ -0,0 +1,71 @@
+import hashlib
+import os
+import sys
+
+from spyne.interface.wsdl import Wsdl11
+
+def build_wsdl(application, url: str) -> bytes:
+    """Generate the WSDL document for the application at the given service URL"""
+    wsdl = Wsdl11(application.interface)
+    wsdl.build_interface_document(url)
+    return wsdl.get_interface_document()
+
+def load_wsdl(application, url: str, path: str, source_path: str = None) -> bytes:
+    """Return the WSDL stored at path, regenerating it if missing or stale.
+
+    The file is stale when it is older than the service module it was built
+    from or was built for a different service URL.
+    """
+    if os.path.exists(path):
+        is_fresh = source_path is None or os.path.getmtime(path) >= os.path.getmtime(source_path)
+        with open(path, 'rb') as f:
+            wsdl = f.read()
+        if is_fresh and url.encode() in wsdl:
+            return wsdl
+
+    wsdl = build_wsdl(application, url)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(wsdl)
+    os.replace(tmp_path, path)
+    return wsdl
+
+class StaticWsdlMiddleware:
+    """Serves GET ?wsdl from a prebuilt byte string with caching headers"""
+
+    def __init__(self, app, wsdl: bytes, max_age: int = 3600):
+        self.app = app
+        self.wsdl = wsdl
+        self.etag = f'"{hashlib.sha1(wsdl).hexdigest()}"'
+        self.headers = [
+            ('Content-Type', 'text/xml; charset=utf-8'),
+            ('Content-Length', str(len(wsdl))),
+            ('Cache-Control', f'public, max-age={max_age}'),
+            ('ETag', self.etag),
+        ]
+
+    def __call__(self, environ, start_response):
+        query = environ.get('QUERY_STRING', '').lower()
+        if environ['REQUEST_METHOD'] != 'GET' or query not in ('wsdl', 'wsdl='):
+            return self.app(environ, start_response)
+
+        if environ.get('HTTP_IF_NONE_MATCH') == self.etag:
+            start_response('304 Not Modified', [('ETag', self.etag)])
+            return [b'']
+
+        start_response('200 OK', list(self.headers))
+        return [self.wsdl]
+
+if __name__ == '__main__':
+    # Build step: python wsdl_cache.py [output path]
+    if sys.version_info >= (3, 13):
+        import cgi_compat
+    import todo_service
+    from config import SOAP_PUBLIC_URL, WSDL_FILE
+
+    output = sys.argv[1] if len(sys.argv) > 1 else WSDL_FILE
+    if os.path.exists(output):
+        os.remove(output)
+    load_wsdl(todo_service.application, SOAP_PUBLIC_URL, output)
+    print(f"WSDL for {SOAP_PUBLIC_URL} written to {output}")
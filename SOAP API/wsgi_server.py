@@ -0,0 +1,337 @@
+import os
+import queue
+import selectors
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, ServerHandler, make_server
+
+#ANCHOR HTTP/1.1 keep-alive handling
+class KeepAliveServerHandler(ServerHandler):
+    http_version = '1.1'
+
+    def cleanup_headers(self):
+        super().cleanup_headers()
+        # Without a length the client can only find the end of the body on close
+        if 'Content-Length' not in self.headers:
+            self.headers['Connection'] = 'close'
+        if self.headers.get('Connection', '').lower() == 'close':
+            self.request_handler.close_connection = True
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """Serves requests on one connection until the client closes or goes idle.
+
+    Between requests an idle connection is parked with the server, so it does
+    not hold a worker while the client thinks.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Idle keep-alive connections are closed after this many seconds
+    timeout = 5
+    parked = False
+
+    def setup(self):
+        super().setup()
+        # Headers and body are separate writes, don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection and self.request_waiting():
+            self.handle_one_request()
+        # The server parks the connection once this worker is done with it
+        self.parked = not self.close_connection and hasattr(self.server, 'park')
+
+    def finish(self):
+        if not self.parked:
+            super().finish()
+
+    def resume(self):
+        """Serve the next request on a parked connection once it is readable"""
+        self.parked = False
+        try:
+            self.handle()
+        finally:
+            self.finish()
+
+    def request_waiting(self):
+        """True if the next request has already arrived, without blocking"""
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def handle_one_request(self):
+        try:
+            self.raw_requestline = self.rfile.readline(65537)
+        except (socket.timeout, ConnectionError):
+            self.close_connection = True
+            return
+
+        if not self.raw_requestline:
+            self.close_connection = True
+            return
+        if len(self.raw_requestline) > 65536:
+            self.requestline = ''
+            self.request_version = ''
+            self.command = ''
+            self.send_error(414)
+            return
+
+        if not self.parse_request():
+            return
+
+        handler = KeepAliveServerHandler(
+            self.rfile, self.wfile, self.get_stderr(), self.get_environ(),
+            multithread=True,
+            multiprocess=self.server.multiprocess
+        )
+        handler.request_handler = self
+        handler.run(self.server.get_app())
+
+def buffered(app):
+    """Collect the response body into one chunk so the server can send a Content-Length"""
+    def buffered_app(environ, start_response):
+        result = app(environ, start_response)
+        try:
+            return [b''.join(result)]
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+    return buffered_app
+
+#ANCHOR Thread pool server
+class ThreadPoolWSGIServer(WSGIServer):
+    """WSGIServer that hands each request to a bounded pool of worker threads.
+
+    Idle keep-alive connections wait in a selector instead of a worker, and
+    once ``backlog`` requests are already waiting for a worker new
+    connections get a 503 instead of joining the queue.
+    """
+
+    multiprocess = False
+
+    def __init__(self, server_address, handler_class=KeepAliveRequestHandler, max_workers=16,
+                 backlog=128, bind_and_activate=True):
+        self.request_queue_size = backlog
+        self.max_workers = max_workers
+        self._pool = None
+        self._queued = 0
+        self._queued_lock = threading.Lock()
+        self._parked = queue.SimpleQueue()
+        self._wakeup = None
+        self._closing = False
+        super().__init__(server_address, handler_class, bind_and_activate)
+
+    def _start(self):
+        # Created on first use so forked workers each get their own threads
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='soap-worker')
+        self._wakeup = socket.socketpair()
+        threading.Thread(target=self._watch_idle, name='soap-idle', daemon=True).start()
+
+    def _submit(self, fn, *args):
+        """Queue work for the pool, or return False when the queue is full"""
+        with self._queued_lock:
+            if self._queued >= self.request_queue_size:
+                return False
+            self._queued += 1
+        self._pool.submit(self._run, fn, *args)
+        return True
+
+    def _run(self, fn, *args):
+        with self._queued_lock:
+            self._queued -= 1
+        fn(*args)
+
+    def _reject(self, request):
+        try:
+            request.sendall(b'HTTP/1.1 503 Service Unavailable\r\n'
+                            b'Content-Length: 0\r\nConnection: close\r\n\r\n')
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def process_request(self, request, client_address):
+        if self._pool is None:
+            self._start()
+        if not self._submit(self._process_request_thread, request, client_address):
+            self._reject(request)
+
+    def _process_request_thread(self, request, client_address):
+        handler = None
+        try:
+            handler = self.RequestHandlerClass(request, client_address, self)
+        except Exception:
+            self.handle_error(request, client_address)
+        if getattr(handler, 'parked', False):
+            self.park(handler)
+        else:
+            self.shutdown_request(request)
+
+    def _resume(self, handler):
+        try:
+            handler.resume()
+        except Exception:
+            handler.parked = False
+            self.handle_error(handler.request, handler.client_address)
+        if handler.parked:
+            self.park(handler)
+        else:
+            self.shutdown_request(handler.request)
+
+    def _close_idle(self, handler):
+        handler.parked = False
+        try:
+            handler.finish()
+        except OSError:
+            pass
+        self.shutdown_request(handler.request)
+
+    #ANCHOR Idle keep-alive connections
+    def park(self, handler):
+        """Wait for the next request on ``handler``'s connection without a worker"""
+        if self._closing:
+            self._close_idle(handler)
+            return
+        self._parked.put(handler)
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wakeup[1].send(b'\0')
+        except OSError:
+            pass
+
+    def _watch_idle(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self._wakeup[0], selectors.EVENT_READ)
+        deadlines = {}
+        while not self._closing:
+            timeout = None
+            if deadlines:
+                timeout = max(0, min(deadlines.values()) - time.monotonic())
+            for key, _ in selector.select(timeout):
+                if key.fileobj is self._wakeup[0]:
+                    self._wakeup[0].recv(4096)
+                    continue
+                handler = key.data
+                selector.unregister(handler.request)
+                del deadlines[handler]
+                # A connection that cannot get a worker is dropped, the
+                # client retries like it would after an idle timeout
+                if not self._submit(self._resume, handler):
+                    self._close_idle(handler)
+            while True:
+                try:
+                    handler = self._parked.get_nowait()
+                except queue.Empty:
+                    break
+                selector.register(handler.request, selectors.EVENT_READ, handler)
+                deadlines[handler] = time.monotonic() + handler.timeout
+            now = time.monotonic()
+            for handler in [handler for handler, deadline in deadlines.items() if deadline <= now]:
+                selector.unregister(handler.request)
+                del deadlines[handler]
+                self._close_idle(handler)
+        for handler in deadlines:
+            self._close_idle(handler)
+        while not self._parked.empty():
+            self._close_idle(self._parked.get())
+        selector.close()
+        for sock in self._wakeup:
+            sock.close()
+
+    def server_close(self):
+        super().server_close()
+        if self._pool is not None:
+            self._closing = True
+            self._wake()
+            self._pool.shutdown(wait=False)
+
+def make_threaded_server(host, port, app, threads=16, backlog=128, keepalive_timeout=5):
+    """Create a thread pool server with HTTP keep-alive"""
+    handler_class = type('RequestHandler', (KeepAliveRequestHandler,), {'timeout': keepalive_timeout})
+    server = ThreadPoolWSGIServer((host, port), handler_class, max_workers=threads, backlog=backlog)
+    server.set_app(buffered(app))
+    return server
+
+#ANCHOR Pre-fork server
+def serve_prefork(server, workers):
+    """Fork worker processes that all accept on the server's listening socket.
+
+    The parent only supervises: it restarts workers that exit and terminates
+    them all on Ctrl+C or SIGTERM.
+    """
+    server.multiprocess = True
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            except Exception:
+                code = 1
+            finally:
+                os._exit(code)
+        children.add(pid)
+
+    def terminate(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, terminate)
+    for _ in range(workers):
+        spawn()
+
+    try:
+        while children:
+            pid, status = os.wait()
+            children.discard(pid)
+            if not stopping:
+                print(f"Worker {pid} exited with status {status}, restarting", file=sys.stderr)
+                spawn()
+    except KeyboardInterrupt:
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(children):
+            os.waitpid(pid, 0)
+    finally:
+        server.server_close()
+
+def serve(app, host, port, mode='simple', workers=None, threads=16, backlog=128, keepalive_timeout=5):
+    """Run the WSGI app with the selected serving mode (simple, threaded or prefork)"""
+    if mode == 'simple':
+        make_server(host, port, app).serve_forever()
+        return
+
+    if mode not in ('threaded', 'prefork'):
+        raise ValueError(f"Unknown server mode: {mode}")
+
+    server = make_threaded_server(host, port, app, threads, backlog, keepalive_timeout)
+    if mode == 'prefork':
+        if not hasattr(os, 'fork'):
+            print("Pre-fork mode needs os.fork, falling back to threaded mode", file=sys.stderr)
+        else:
+            serve_prefork(server, workers or os.cpu_count() or 1)
+            return
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,181 @@
+import asyncio
+import socket
+from datetime import datetime
+
+from framing import FrameError, create_framer
+from server import SimpleSocketServer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+class AsyncClientConnection:
+    """Event-loop counterpart of ClientConnection: a bounded queue drained by a writer task"""
+
+    def __init__(self, writer, address, framer, max_queue=1024):
+        self.writer = writer
+        self.address = address
+        self.framer = framer
+        self.queue = asyncio.Queue(max_queue)
+        self.task = asyncio.ensure_future(self._write_loop())
+
+    async def _write_loop(self):
+        while True:
+            data = await self.queue.get()
+            if data is None:
+                return
+            self.writer.write(data)
+            try:
+                await self.writer.drain()
+            except ConnectionError:
+                return
+
+    async def send(self, data):
+        await self.queue.put(data)
+
+    def offer(self, payload) -> bool:
+        try:
+            self.queue.put_nowait(self.framer.encode(payload))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def abort(self):
+        """Drop the connection now; the reader sees EOF and cleans up"""
+        self.writer.transport.abort()
+
+    async def finish(self, timeout=5):
+        """Flush queued writes, then stop the writer task"""
+        try:
+            await asyncio.wait_for(self.queue.put(None), timeout)
+            await asyncio.wait_for(self.task, timeout)
+        except asyncio.TimeoutError:
+            self.abort()
+            self.task.cancel()
+
+class AsyncSocketServer(SimpleSocketServer):
+    """SimpleSocketServer on an asyncio event loop.
+
+    Each connection is a coroutine instead of an OS thread, so idle clients
+    cost a few KB each. Connections beyond ``max_connections`` are refused
+    and clients silent for ``idle_timeout`` seconds are disconnected, unless
+    they are subscribed to a channel.
+    """
+
+    def __init__(self, host='0.0.0.0', port=8080, backlog=1024, framing='raw', send_queue_size=1024,
+                 slow_consumer_policy='disconnect', max_connections=10000, idle_timeout=300, reuse_port=False):
+        super().__init__(host, port, backlog, framing, send_queue_size, slow_consumer_policy, reuse_port)
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self._drain_timeout = 0
+        self._server = None
+        self._loop = None
+        self._stop = None
+
+    def start_server(self):
+        try:
+            raise_file_limit()
+            asyncio.run(self._serve())
+        except OSError as e:
+            print(f"Failed to start server: {e}")
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port,
+            backlog=self.backlog,
+            reuse_address=True,
+            reuse_port=self.reuse_port or None
+        )
+        self.running = True
+
+        print(f"Socket Server (asyncio) started on {self.host}:{self.port}")
+
+        # Not serve_forever() or ``async with``: both end in wait_closed(), which
+        # since Python 3.12.1 waits for every client to disconnect, before we drain
+        await self._stop.wait()
+        self._server.close()
+        if self._drain_timeout:
+            await self.drain(self._drain_timeout)
+        for writer in list(self.clients):
+            writer.transport.abort()
+        await self._server.wait_closed()
+
+    async def handle_connection(self, reader, writer):
+        client_address = writer.get_extra_info('peername')[:2]
+
+        if len(self.clients) >= self.max_connections:
+            print(f"Refusing {client_address}: {self.max_connections} clients connected")
+            writer.write(b'server busy')
+            writer.close()
+            return
+
+        print(f"Client connected: {client_address}")
+        self.clients[writer] = {
+            'address': client_address,
+            'connected_at': datetime.now()
+        }
+
+        client = AsyncClientConnection(writer, client_address, create_framer(self.framing), self.send_queue_size)
+        self.client_opened()
+        try:
+            while self.running:
+                try:
+                    data = await asyncio.wait_for(
+                        reader.read(1024 if client.framer.name == 'raw' else 65536),
+                        self.idle_timeout
+                    )
+                except asyncio.TimeoutError:
+                    if self.pubsub.is_subscribed(client):
+                        # Subscribers only listen, pushes are their traffic
+                        continue
+                    print(f"Client {client_address} idle for {self.idle_timeout}s")
+                    break
+                if not data:
+                    break
+
+                client.framer.feed(data)
+                client.framer, output = self.handle_frames(client.framer, client_address, client)
+                if output:
+                    await client.send(output)
+
+        except (ConnectionError, UnicodeDecodeError, FrameError) as e:
+            print(f"Error with client {client_address}: {e}")
+        finally:
+            self.pubsub.unsubscribe_all(client)
+            await client.finish()
+            writer.close()
+            self.clients.pop(writer, None)
+            self.client_closed()
+            print(f"Client {client_address} disconnected")
+
+    def stop_server(self, drain_timeout=0):
+        """Stop the server; start_server returns once clients are drained for up to drain_timeout seconds"""
+        self.running = False
+        self._drain_timeout = drain_timeout
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop.set)
+        print("Socket server stopped")
+
+    async def drain(self, timeout):
+        """Close every client's read side so it finishes, flushes its replies and disconnects"""
+        for writer in list(self.clients):
+            try:
+                writer.get_extra_info('socket').shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+        deadline = self._loop.time() + timeout
+        while self.clients and self._loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        if self.clients:
+            print(f"{len(self.clients)} clients still connected after draining for {timeout}s")
+
+def raise_file_limit():
+    """Lift the open file soft limit to the hard limit, one descriptor per client"""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
@@ -0,0 +1,252 @@
+"""Load generator for the socket server.
+
+Opens N connections, sends a weighted mix of ping/echo/time commands at a
+target rate and prints throughput, latency percentiles and error counts as
+JSON. Example:
+
+    python benchmark.py --connections 200 --rate 20000 --framing line --pipeline 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+
+from framing import create_framer
+
+COMMANDS = ('ping', 'echo', 'time')
+
+def parse_mix(value):
+    """Parse 'ping=2,echo=1' into command weights"""
+    weights = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip().lower()
+        if name not in COMMANDS:
+            raise argparse.ArgumentTypeError(f"unknown command in mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(latencies):
+    """Latency summary in milliseconds"""
+    values = sorted(latencies)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values) * 1000, 3),
+        'p50': round(percentile(values, 50) * 1000, 3),
+        'p95': round(percentile(values, 95) * 1000, 3),
+        'p99': round(percentile(values, 99) * 1000, 3),
+        'max': round(values[-1] * 1000, 3)
+    }
+
+class Stats:
+    def __init__(self):
+        self.latencies = {name: [] for name in COMMANDS}
+        self.errors = {'connect': 0, 'timeout': 0, 'mismatch': 0, 'closed': 0}
+        self.connected = 0
+
+    def record(self, command, latency):
+        self.latencies[command].append(latency)
+
+#ANCHOR Client connection
+class BenchmarkConnection:
+    """One client connection: a sender paced to its share of the rate and a receiver matching replies in order"""
+
+    def __init__(self, args, stats, rng, deadline):
+        self.args = args
+        self.stats = stats
+        self.rng = rng
+        self.deadline = deadline
+        self.framer = create_framer(args.framing)
+        self.pending = deque()
+        self.wakeup = asyncio.Event()
+        # raw replies have no boundaries, so only one request may be in flight
+        self.slots = asyncio.Semaphore(1 if args.framing == 'raw' else args.pipeline)
+        self.commands = list(args.mix)
+        self.weights = [args.mix[name] for name in self.commands]
+        self.payload = 'x' * args.payload_size
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.args.host, self.args.port), self.args.timeout
+        )
+        if self.args.framing != self.args.server_framing:
+            # Negotiate in the server's default framing, the ack comes back in it too
+            server_framer = create_framer(self.args.server_framing)
+            self.writer.write(server_framer.encode(f'frame {self.args.framing}'.encode()))
+            while True:
+                data = await asyncio.wait_for(self.reader.read(65536), self.args.timeout)
+                if not data:
+                    raise ConnectionError('closed during framing negotiation')
+                server_framer.feed(data)
+                reply = server_framer.next_frame()
+                if reply is not None:
+                    break
+            if reply != b'ok':
+                raise ConnectionError(f'framing rejected: {reply!r}')
+            self.framer.feed(server_framer.buffer)
+
+    def next_message(self):
+        command = self.rng.choices(self.commands, self.weights)[0]
+        if command == 'echo':
+            return command, f'echo {self.payload}', self.payload.encode()
+        return command, command, b'pong' if command == 'ping' else None
+
+    async def send_loop(self, interval):
+        try:
+            await self._send(interval)
+        finally:
+            self.wakeup.set()
+
+    async def _send(self, interval):
+        loop = asyncio.get_running_loop()
+        next_send = loop.time()
+        while loop.time() < self.deadline:
+            await self.slots.acquire()
+            if interval:
+                delay = next_send - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                # Latency counts from the scheduled send time, so a stalled
+                # server shows up as latency instead of a lower send rate
+                scheduled = next_send
+                next_send += interval
+            else:
+                scheduled = loop.time()
+            if scheduled >= self.deadline:
+                self.slots.release()
+                break
+
+            command, message, expected = self.next_message()
+            self.pending.append((command, expected, scheduled))
+            self.wakeup.set()
+            self.writer.write(self.framer.encode(message.encode('utf-8')))
+            await self.writer.drain()
+
+    async def receive_loop(self, sender):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.pending:
+                if sender.done():
+                    return
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            try:
+                data = await asyncio.wait_for(self.reader.read(65536), self.args.timeout)
+            except asyncio.TimeoutError:
+                self.stats.errors['timeout'] += len(self.pending)
+                return
+            if not data:
+                self.stats.errors['closed'] += len(self.pending)
+                return
+
+            now = loop.time()
+            self.framer.feed(data)
+            reply = self.framer.next_frame()
+            while reply is not None and self.pending:
+                command, expected, scheduled = self.pending.popleft()
+                self.slots.release()
+                if expected is not None and reply.strip() != expected:
+                    self.stats.errors['mismatch'] += 1
+                else:
+                    self.stats.record(command, now - scheduled)
+                reply = self.framer.next_frame()
+
+    async def run(self, interval):
+        try:
+            await self.connect()
+        except (OSError, asyncio.TimeoutError, ConnectionError):
+            self.stats.errors['connect'] += 1
+            return
+        self.stats.connected += 1
+
+        sender = asyncio.ensure_future(self.send_loop(interval))
+        try:
+            await self.receive_loop(sender)
+        except (OSError, ConnectionError):
+            self.stats.errors['closed'] += len(self.pending)
+        finally:
+            sender.cancel()
+            self.writer.close()
+
+#ANCHOR Runner
+async def run_benchmark(args):
+    rng = random.Random(args.seed)
+    stats = Stats()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + args.duration
+    # Each connection sends its share of the target rate; 0 means as fast as replies allow
+    interval = args.connections / args.rate if args.rate else 0
+
+    connections = [
+        BenchmarkConnection(args, stats, random.Random(rng.random()), deadline)
+        for _ in range(args.connections)
+    ]
+    started = time.perf_counter()
+    await asyncio.gather(*(connection.run(interval) for connection in connections))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [latency for values in stats.latencies.values() for latency in values]
+    return {
+        'config': {
+            'host': args.host,
+            'port': args.port,
+            'connections': args.connections,
+            'duration': args.duration,
+            'rate': args.rate,
+            'mix': args.mix,
+            'framing': args.framing,
+            'pipeline': args.pipeline if args.framing != 'raw' else 1,
+            'payload_size': args.payload_size
+        },
+        'elapsed': round(elapsed, 3),
+        'connected': stats.connected,
+        'requests': len(all_latencies),
+        'throughput': round(len(all_latencies) / elapsed, 1) if elapsed else 0,
+        'latency_ms': summarize(all_latencies),
+        'commands': {name: summarize(values) for name, values in stats.latencies.items() if name in args.mix},
+        'errors': stats.errors
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Socket server load generator')
+    parser.add_argument('--host', default=os.getenv('SOCKET_HOST', 'localhost'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('SOCKET_PORT', 8080)))
+    parser.add_argument('--connections', '-c', type=int, default=50)
+    parser.add_argument('--duration', '-d', type=float, default=10, help='seconds to send for')
+    parser.add_argument('--rate', '-r', type=float, default=0, help='target requests/s over all connections, 0 = unthrottled')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('ping=1,echo=1,time=1'), help='e.g. ping=2,echo=1')
+    parser.add_argument('--framing', choices=('raw', 'line', 'length'), default='raw')
+    parser.add_argument('--server-framing', choices=('raw', 'line', 'length'),
+                        default=os.getenv('SOCKET_FRAMING', 'raw').lower(), help="server's SOCKET_FRAMING")
+    parser.add_argument('--pipeline', type=int, default=1, help='requests in flight per connection (framed modes)')
+    parser.add_argument('--payload-size', type=int, default=32, help='echo payload bytes')
+    parser.add_argument('--timeout', type=float, default=5, help='seconds to wait for a reply')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', '-o', help='also write the JSON result to this file')
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run_benchmark(args))
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return 0 if not any(result['errors'].values()) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Run several socket server processes on one port.
+
+    SOCKET_WORKERS=4 python main.py
+
+Each forked worker binds the same host and port with SO_REUSEPORT and the
+kernel spreads new connections across them, so commands are handled on as
+many cores as there are workers. The supervisor restarts workers that die
+and, on Ctrl+C or SIGTERM, asks every worker to drain its clients before it
+exits. Workers count their connections and commands in shared memory so any
+of them can answer ``status`` for the whole cluster. Channels are per worker:
+a publish only reaches subscribers connected to the same process.
+"""
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from multiprocessing.sharedctypes import RawArray
+from typing import Callable, Dict
+
+STAT_FIELDS = ('connections', 'accepted', 'commands')
+# A worker dying sooner than this after starting is restarted only after a pause
+MIN_WORKER_LIFETIME = 1.0
+
+class ClusterStats:
+    """Per-worker counters in memory shared by every process of the cluster.
+
+    Created by the supervisor before forking. Each worker only writes its own
+    slot (``worker``), so the lock just guards against its own threads.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.worker = None
+        self.values = RawArray('q', workers * len(STAT_FIELDS))
+        self._lock = threading.Lock()
+
+    def add(self, field: str, amount: int = 1):
+        offset = self.worker * len(STAT_FIELDS) + STAT_FIELDS.index(field)
+        with self._lock:
+            self.values[offset] += amount
+
+    def reset(self, worker: int, field: str):
+        self.values[worker * len(STAT_FIELDS) + STAT_FIELDS.index(field)] = 0
+
+    def totals(self) -> Dict[str, int]:
+        """Each counter summed over all workers"""
+        values = self.values[:]
+        return {
+            field: sum(values[index::len(STAT_FIELDS)])
+            for index, field in enumerate(STAT_FIELDS)
+        }
+
+def serve_cluster(build_server: Callable, workers: int, drain_timeout: float = 10):
+    """Fork ``workers`` processes, each running ``build_server(worker_index).start_server()``.
+
+    The servers must be created with ``reuse_port=True``. Blocks until the
+    cluster is stopped with Ctrl+C or SIGTERM.
+    """
+    if not hasattr(os, 'fork') or not hasattr(socket, 'SO_REUSEPORT'):
+        print("Cluster mode needs os.fork and SO_REUSEPORT, running a single server", file=sys.stderr)
+        server = build_server(0)
+        signal.signal(signal.SIGINT, lambda signum, frame: server.stop_server(drain_timeout))
+        server.start_server()
+        return
+
+    stats = ClusterStats(workers)
+    children = {}
+    started = [0.0] * workers
+    stopping = False
+
+    def spawn(worker):
+        started[worker] = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                # Ctrl+C reaches the whole process group; let the supervisor decide
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                stats.worker = worker
+                server = build_server(worker)
+                server.cluster = stats
+                signal.signal(signal.SIGTERM, lambda signum, frame: server.stop_server(drain_timeout))
+                server.start_server()
+            except Exception:
+                traceback.print_exc()
+                code = 1
+            finally:
+                sys.stdout.flush()
+                os._exit(code)
+        children[pid] = worker
+
+    def terminate(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, terminate)
+    for worker in range(workers):
+        spawn(worker)
+    print(f"Socket cluster started with {workers} workers")
+
+    try:
+        while children:
+            pid, status = os.wait()
+            worker = children.pop(pid)
+            # Its clients were disconnected when it died
+            stats.reset(worker, 'connections')
+            if not stopping:
+                print(f"Worker {worker + 1} (pid {pid}) exited with status {status}, restarting", file=sys.stderr)
+                if time.monotonic() - started[worker] < MIN_WORKER_LIFETIME:
+                    time.sleep(MIN_WORKER_LIFETIME)
+                spawn(worker)
+    except KeyboardInterrupt:
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        # Workers exit once drained; anything still running after that is killed
+        deadline = time.monotonic() + drain_timeout + 5
+        while children and time.monotonic() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                children.pop(pid, None)
+            else:
+                time.sleep(0.05)
+        for pid in children:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        print("Socket cluster stopped")
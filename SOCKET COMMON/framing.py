@@ -0,0 +1,72 @@
+import struct
+
+class FrameError(ValueError):
+    pass
+
+class RawFramer:
+    """Legacy mode: whatever one recv() returned is one message"""
+
+    name = 'raw'
+
+    def __init__(self, max_frame_size=1024 * 1024):
+        self.max_frame_size = max_frame_size
+        self.buffer = b''
+
+    def feed(self, data):
+        self.buffer += data
+
+    def next_frame(self):
+        if not self.buffer:
+            return None
+        frame, self.buffer = self.buffer, b''
+        return frame
+
+    def encode(self, payload):
+        return payload
+
+class LineFramer(RawFramer):
+    """Newline-delimited messages; a trailing \\r is stripped"""
+
+    name = 'line'
+
+    def next_frame(self):
+        end = self.buffer.find(b'\n')
+        if end < 0:
+            if len(self.buffer) > self.max_frame_size:
+                raise FrameError(f"line longer than {self.max_frame_size} bytes")
+            return None
+        frame, self.buffer = self.buffer[:end], self.buffer[end + 1:]
+        return frame.rstrip(b'\r')
+
+    def encode(self, payload):
+        return payload + b'\n'
+
+class LengthPrefixFramer(RawFramer):
+    """Each message is preceded by its length as a 4-byte big-endian integer"""
+
+    name = 'length'
+    header = struct.Struct('!I')
+
+    def next_frame(self):
+        if len(self.buffer) < self.header.size:
+            return None
+        (length,) = self.header.unpack_from(self.buffer)
+        if length > self.max_frame_size:
+            raise FrameError(f"frame of {length} bytes exceeds {self.max_frame_size}")
+
+        end = self.header.size + length
+        if len(self.buffer) < end:
+            return None
+        frame, self.buffer = self.buffer[self.header.size:end], self.buffer[end:]
+        return frame
+
+    def encode(self, payload):
+        return self.header.pack(len(payload)) + payload
+
+FRAMERS = {framer.name: framer for framer in (RawFramer, LineFramer, LengthPrefixFramer)}
+
+def create_framer(mode='raw', max_frame_size=1024 * 1024):
+    try:
+        return FRAMERS[mode](max_frame_size)
+    except KeyError:
+        raise FrameError(f"unknown framing mode: {mode}")
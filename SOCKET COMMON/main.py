@@ -1,94 +1,45 @@
-import socket
-import threading
-import json
-from datetime import datetime
+import os
+import signal
 
-class SimpleSocketServer:
-    def __init__(self, host='0.0.0.0', port=8080):
-        self.host = host
-        self.port = port
-        self.server_socket = None
-        self.clients = {}
-        self.running = False
-        
-    def start_server(self):
-        try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(5)
-            self.running = True
-            
-            print(f"Socket Server started on {self.host}:{self.port}")
-            
-            while self.running:
-                try:
-                    client_socket, client_address = self.server_socket.accept()
-                    print(f"Client connected: {client_address}")
-                    
-                    self.clients[client_socket] = {
-                        'address': client_address,
-                        'connected_at': datetime.now()
-                    }
-                    
-                    thread = threading.Thread(target=self.handle_client, args=(client_socket, client_address))
-                    thread.daemon = True
-                    thread.start()
-                    
-                except socket.error as e:
-                    if self.running:
-                        print(f"Server error: {e}")
-                        
-        except Exception as e:
-            print(f"Failed to start server: {e}")
-            
-    def handle_client(self, client_socket, client_address):
-        try:
-            while self.running:
-                data = client_socket.recv(1024)
-                if not data:
-                    break
-                    
-                message = data.decode('utf-8').strip()
-                print(f"From {client_address}: {message}")
-                
-                response = self.process_message(message, client_address)
-                client_socket.send(response.encode('utf-8'))
-                
-        except Exception as e:
-            print(f"Error with client {client_address}: {e}")
-        finally:
-            if client_socket in self.clients:
-                del self.clients[client_socket]
-            client_socket.close()
-            print(f"Client {client_address} disconnected")
-    
-    def process_message(self, message, client_address):
-        message_lower = message.lower().strip()
-        
-        if message_lower == 'ping':
-            return 'pong'
-        elif message_lower == 'time':
-            return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        elif message_lower == 'status':
-            return f'Connected from {client_address[0]}:{client_address[1]}'
-        elif message_lower.startswith('echo '):
-            return message[5:]
-        elif message_lower == 'help':
-            return 'Commands: ping, time, status, echo <text>, help'
-        else:
-            return 'this is reply from server'
-            
-    def stop_server(self):
-        """Stop the server"""
-        self.running = False
-        if self.server_socket:
-            self.server_socket.close()
-        print("Socket server stopped")
+from metrics import WindowProfiler, start_http_server
+from server import create_server
 
 if __name__ == "__main__":
-    server = SimpleSocketServer()
-    try:
+    # threaded: one OS thread per connection, asyncio: single event loop
+    engine = os.getenv('SOCKET_ENGINE', 'threaded').lower()
+    options = {
+        'port': int(os.getenv('SOCKET_PORT', 8080)),
+        'backlog': int(os.getenv('SOCKET_BACKLOG', 128)),
+        'framing': os.getenv('SOCKET_FRAMING', 'raw').lower(),
+        'send_queue_size': int(os.getenv('SOCKET_SEND_QUEUE', 1024)),
+        'slow_consumer_policy': os.getenv('SOCKET_SLOW_CONSUMER', 'disconnect').lower()
+    }
+    if engine == 'asyncio':
+        options['max_connections'] = int(os.getenv('SOCKET_MAX_CONNECTIONS', 10000))
+        options['idle_timeout'] = float(os.getenv('SOCKET_IDLE_TIMEOUT', 300))
+    # Worker processes sharing the port; 1 runs a single server in this process
+    workers = int(os.getenv('SOCKET_WORKERS', 1))
+    drain_timeout = float(os.getenv('SOCKET_DRAIN_TIMEOUT', 10))
+    
+    # Local /metrics endpoint (and opt-in POST /profile?seconds=N), off when 0
+    metrics_port = int(os.getenv('SOCKET_METRICS_PORT', 0))
+    
+    def build_server(worker=0):
+        server = create_server(engine, reuse_port=workers > 1, **options)
+        if metrics_port:
+            if os.getenv('PROFILING', 'false').lower() == 'true':
+                server.profiler = WindowProfiler(os.getenv('PROFILE_DIR', '.'), float(os.getenv('PROFILE_SAMPLE_RATE', 1.0)))
+            # Each worker serves its own metrics on the next port up
+            start_http_server(metrics_port + worker, profiler=server.profiler)
+            print(f"Metrics available at: http://127.0.0.1:{metrics_port + worker}/metrics")
+        return server
+    
+    if workers > 1:
+        from cluster import serve_cluster
+        serve_cluster(build_server, workers, drain_timeout)
+    else:
+        server = build_server()
+        # Ctrl+C drains clients like SIGTERM does for cluster workers; as a
+        # KeyboardInterrupt it would tear down the asyncio loop before draining
+        signal.signal(signal.SIGINT, lambda signum, frame: server.stop_server(drain_timeout))
         server.start_server()
-    except KeyboardInterrupt:
-        server.stop_server()
\ No newline at end of file
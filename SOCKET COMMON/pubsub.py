@@ -0,0 +1,71 @@
+import threading
+
+from metrics import REGISTRY
+
+DROPPED = REGISTRY.counter('socket_pubsub_dropped_total', 'Channel messages a full subscriber queue could not take', ('policy',))
+
+SLOW_CONSUMER_POLICIES = ('disconnect', 'drop')
+
+class PubSubHub:
+    """Channel registry that fans published messages out to subscribers.
+
+    Subscribers are connection objects with a bounded outbound queue exposing
+    ``offer(payload) -> bool`` (never blocks) and ``abort()``. When a
+    subscriber's queue is full the slow-consumer policy decides: ``drop``
+    skips the message for that subscriber, ``disconnect`` unsubscribes it and
+    closes its connection. Either way the publisher is never held up.
+    """
+
+    def __init__(self, slow_consumer_policy='disconnect'):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        self.slow_consumer_policy = slow_consumer_policy
+        self.channels = {}
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel, client):
+        with self._lock:
+            self.channels.setdefault(channel, set()).add(client)
+
+    def unsubscribe(self, channel, client) -> bool:
+        with self._lock:
+            subscribers = self.channels.get(channel)
+            if not subscribers or client not in subscribers:
+                return False
+            subscribers.discard(client)
+            if not subscribers:
+                del self.channels[channel]
+            return True
+
+    def is_subscribed(self, client) -> bool:
+        with self._lock:
+            return any(client in subscribers for subscribers in self.channels.values())
+
+    def unsubscribe_all(self, client):
+        """Remove client from every channel, e.g. on disconnect"""
+        with self._lock:
+            for channel in [name for name, subscribers in self.channels.items() if client in subscribers]:
+                self.channels[channel].discard(client)
+                if not self.channels[channel]:
+                    del self.channels[channel]
+
+    def publish(self, channel, message: str) -> int:
+        """Queue ``message <channel> <message>`` to every subscriber; returns how many accepted it"""
+        with self._lock:
+            subscribers = list(self.channels.get(channel, ()))
+
+        payload = f'message {channel} {message}'.encode('utf-8')
+        delivered = 0
+        for client in subscribers:
+            if client.offer(payload):
+                delivered += 1
+                continue
+
+            self.dropped += 1
+            DROPPED.inc(policy=self.slow_consumer_policy)
+            if self.slow_consumer_policy == 'disconnect':
+                print(f"Disconnecting slow consumer {client.address} on '{channel}'")
+                self.unsubscribe_all(client)
+                client.abort()
+        return delivered
@@ -0,0 +1,410 @@
+import selectors
+import socket
+import threading
+import time
+import json
+from collections import deque
+from datetime import datetime
+
+from framing import FrameError, create_framer
+from metrics import REGISTRY
+from pubsub import PubSubHub
+
+COMMANDS = ('ping', 'time', 'status', 'echo', 'help', 'frame', 'subscribe', 'unsubscribe', 'publish')
+COMMAND_COUNT = REGISTRY.counter('socket_commands_total', 'Socket commands handled', ('command',))
+COMMAND_LATENCY = REGISTRY.histogram('socket_command_seconds', 'Socket command handling latency', ('command',))
+ACTIVE_CONNECTIONS = REGISTRY.gauge('socket_connections_active', 'Connected socket clients')
+CONNECTIONS = REGISTRY.counter('socket_connections_total', 'Socket clients accepted')
+
+# A send that returns at once when the socket buffer is full; without
+# MSG_DONTWAIT (Windows) pushes to a slow client block the publisher instead
+NONBLOCKING_SEND = getattr(socket, 'MSG_DONTWAIT', 0)
+
+class Sender:
+    """One thread per server finishing pushes that did not fit in a client's socket buffer.
+
+    ``watch`` hands over a connection whose non-blocking write came up short.
+    Once its socket is writable again the thread carries on flushing it, so
+    slow subscribers neither hold up the publisher nor need a thread each.
+    """
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._wakeup, self._waker = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._waker.setblocking(False)
+        self._selector.register(self._wakeup, selectors.EVENT_READ)
+        self._watch = deque()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def watch(self, client):
+        self._watch.append(client)
+        try:
+            self._waker.send(b'\0')
+        except BlockingIOError:
+            # Plenty of wakeups already pending
+            pass
+
+    def _register(self, client):
+        try:
+            self._selector.register(client.socket, selectors.EVENT_WRITE, client)
+        except KeyError:
+            # A connection closed while watched left its descriptor behind and the number was reused
+            self._selector.unregister(client.socket)
+            self._selector.register(client.socket, selectors.EVENT_WRITE, client)
+        except (ValueError, OSError):
+            # Already closed; flushing fails and releases the connection
+            client.flush()
+
+    def _run(self):
+        while True:
+            for key, _ in self._selector.select():
+                if key.fileobj is self._wakeup:
+                    try:
+                        self._wakeup.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    while self._watch:
+                        self._register(self._watch.popleft())
+                else:
+                    self._selector.unregister(key.fileobj)
+                    key.data.flush()
+
+class ClientConnection:
+    """A client socket whose writes are serialized per connection.
+
+    Whoever writes owns the socket until the buffer is empty, so replies and
+    pushed channel messages never interleave. ``send`` writes a reply from the
+    client's own thread and blocks until the socket takes it, which stops the
+    client's reader until it catches up. ``offer`` is for broadcasts: it
+    buffers up to ``max_queue`` messages, writes without blocking and leaves
+    what the socket cannot take yet to the server's Sender.
+    """
+
+    def __init__(self, sock, address, framer, max_queue=1024, sender=None):
+        self.socket = sock
+        self.address = address
+        self.framer = framer
+        self.max_queue = max_queue
+        self.sender = sender
+        self._buffer = deque()
+        # True while a thread (or the Sender) is writing the buffer out
+        self._writing = False
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def _write(self, blocking):
+        """Write the buffer out; the caller has set _writing"""
+        while True:
+            with self._lock:
+                if not self._buffer:
+                    self._writing = False
+                    self._idle.notify_all()
+                    return
+                data = self._buffer[0]
+            try:
+                if blocking:
+                    self.socket.sendall(data)
+                    sent = len(data)
+                else:
+                    sent = self.socket.send(data, NONBLOCKING_SEND)
+            except BlockingIOError:
+                sent = 0
+            except OSError:
+                with self._lock:
+                    self._buffer.clear()
+                    self._writing = False
+                    self._idle.notify_all()
+                if blocking:
+                    raise
+                return
+
+            with self._lock:
+                if sent == len(data):
+                    self._buffer.popleft()
+                else:
+                    self._buffer[0] = memoryview(data)[sent:]
+            if sent < len(data):
+                # Socket buffer full; the Sender keeps _writing until it is flushed
+                self.sender.watch(self)
+                return
+
+    def flush(self):
+        """Continue a non-blocking write, called by the Sender once the socket is writable"""
+        self._write(blocking=False)
+
+    def send(self, data):
+        with self._lock:
+            self._buffer.append(data)
+            while self._writing:
+                self._idle.wait()
+            if not self._buffer:
+                # Written out by the Sender while we waited
+                return
+            self._writing = True
+        self._write(blocking=True)
+
+    def offer(self, payload) -> bool:
+        data = self.framer.encode(payload)
+        with self._lock:
+            if len(self._buffer) >= self.max_queue:
+                return False
+            self._buffer.append(data)
+            if self._writing:
+                return True
+            self._writing = True
+        self._write(blocking=self.sender is None)
+        return True
+
+    def abort(self):
+        """Drop the connection now; the reader sees EOF and cleans up"""
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def finish(self, timeout=5):
+        """Wait for buffered pushes to go out, aborting the connection after timeout seconds"""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self._writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._idle.wait(remaining)
+            else:
+                return
+        self.abort()
+
+class SimpleSocketServer:
+    def __init__(self, host='0.0.0.0', port=8080, backlog=128, framing='raw',
+                 send_queue_size=1024, slow_consumer_policy='disconnect', reuse_port=False):
+        self.host = host
+        self.port = port
+        self.backlog = backlog
+        # SO_REUSEPORT lets several worker processes bind the same port, see cluster.py
+        self.reuse_port = reuse_port
+        # raw: one recv is one message, line / length: framed and pipelinable
+        self.framing = framing
+        # Outbound messages buffered per client before it counts as a slow consumer
+        self.send_queue_size = send_queue_size
+        self.pubsub = PubSubHub(slow_consumer_policy)
+        # WindowProfiler for opt-in profiling of process_message, see SOCKET_METRICS_PORT
+        self.profiler = None
+        # ClusterStats shared with the other workers when running under cluster.py
+        self.cluster = None
+        self.server_socket = None
+        # Finishes pushes to clients whose socket buffer was full, see ClientConnection
+        self.sender = None
+        self.clients = {}
+        self.clients_lock = threading.Lock()
+        self.running = False
+        
+    def start_server(self):
+        try:
+            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            self.server_socket.bind((self.host, self.port))
+            self.server_socket.listen(self.backlog)
+            self.sender = Sender()
+            self.running = True
+            
+            print(f"Socket Server started on {self.host}:{self.port}")
+            
+            while self.running:
+                try:
+                    client_socket, client_address = self.server_socket.accept()
+                    print(f"Client connected: {client_address}")
+                    
+                    with self.clients_lock:
+                        self.clients[client_socket] = {
+                            'address': client_address,
+                            'connected_at': datetime.now()
+                        }
+                    
+                    thread = threading.Thread(target=self.handle_client, args=(client_socket, client_address))
+                    thread.daemon = True
+                    thread.start()
+                    
+                except socket.error as e:
+                    if self.running:
+                        print(f"Server error: {e}")
+                        
+        except Exception as e:
+            print(f"Failed to start server: {e}")
+            
+    def handle_client(self, client_socket, client_address):
+        client = ClientConnection(client_socket, client_address, create_framer(self.framing),
+                                  self.send_queue_size, self.sender)
+        self.client_opened()
+        try:
+            while self.running:
+                data = client_socket.recv(1024 if client.framer.name == 'raw' else 65536)
+                if not data:
+                    break
+                
+                client.framer.feed(data)
+                client.framer, output = self.handle_frames(client.framer, client_address, client)
+                if output:
+                    client.send(output)
+                
+        except Exception as e:
+            print(f"Error with client {client_address}: {e}")
+        finally:
+            self.pubsub.unsubscribe_all(client)
+            client.finish()
+            client_socket.close()
+            # Only now, so drain() waits for the queued replies to go out
+            with self.clients_lock:
+                self.clients.pop(client_socket, None)
+            self.client_closed()
+            print(f"Client {client_address} disconnected")
+    
+    def client_opened(self):
+        CONNECTIONS.inc()
+        ACTIVE_CONNECTIONS.inc()
+        if self.cluster is not None:
+            self.cluster.add('accepted')
+            self.cluster.add('connections')
+    
+    def client_closed(self):
+        ACTIVE_CONNECTIONS.dec()
+        if self.cluster is not None:
+            self.cluster.add('connections', -1)
+    
+    def handle_frames(self, framer, client_address, client=None):
+        """Answer every complete message buffered in framer, in order.
+        
+        Returns the framer to use from now on (``frame <mode>`` switches it)
+        and the encoded responses to send in one write.
+        """
+        output = []
+        frame = framer.next_frame()
+        while frame is not None:
+            message = frame.decode('utf-8').strip()
+            print(f"From {client_address}: {message}")
+            command = message.split(' ', 1)[0].lower()
+            if command not in COMMANDS:
+                command = 'other'
+            started = time.perf_counter()
+            
+            if command == 'frame':
+                try:
+                    new_framer = create_framer(message[6:].strip().lower(), framer.max_frame_size)
+                except FrameError as e:
+                    output.append(framer.encode(f'error: {e}'.encode('utf-8')))
+                else:
+                    # Acknowledge in the old framing, then carry over anything already buffered
+                    output.append(framer.encode(b'ok'))
+                    new_framer.feed(framer.buffer)
+                    framer = new_framer
+            elif self.profiler is not None:
+                with self.profiler.profile():
+                    response = self.process_message(message, client_address, client)
+                output.append(framer.encode(response.encode('utf-8')))
+            else:
+                response = self.process_message(message, client_address, client)
+                output.append(framer.encode(response.encode('utf-8')))
+            
+            COMMAND_COUNT.inc(command=command)
+            if self.cluster is not None:
+                self.cluster.add('commands')
+            COMMAND_LATENCY.observe(time.perf_counter() - started, command=command)
+            frame = framer.next_frame()
+        return framer, b''.join(output)
+    
+    def process_message(self, message, client_address, client=None):
+        message_lower = message.lower().strip()
+        
+        if client is not None and message_lower.split(' ', 1)[0] in ('subscribe', 'unsubscribe', 'publish'):
+            return self.process_pubsub(message, client)
+        
+        if message_lower == 'ping':
+            return 'pong'
+        elif message_lower == 'time':
+            return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        elif message_lower == 'status':
+            status = f'Connected from {client_address[0]}:{client_address[1]}'
+            if self.cluster is not None:
+                totals = self.cluster.totals()
+                status += (f' (worker {self.cluster.worker + 1} of {self.cluster.workers}; cluster: '
+                           f'{totals["connections"]} connected, {totals["accepted"]} accepted, '
+                           f'{totals["commands"]} commands)')
+            return status
+        elif message_lower.startswith('echo '):
+            return message[5:]
+        elif message_lower == 'help':
+            return ('Commands: ping, time, status, echo <text>, frame <raw|line|length>, '
+                    'subscribe <channel>, unsubscribe <channel>, publish <channel> <text>, help')
+        else:
+            return 'this is reply from server'
+    
+    def process_pubsub(self, message, client):
+        parts = message.strip().split(' ', 2)
+        command = parts[0].lower()
+        
+        if len(parts) < 2 or not parts[1] or (command == 'publish' and len(parts) < 3):
+            return f'error: usage: {command} <channel>' + (' <text>' if command == 'publish' else '')
+        
+        channel = parts[1]
+        if command == 'subscribe':
+            self.pubsub.subscribe(channel, client)
+            return f'subscribed {channel}'
+        elif command == 'unsubscribe':
+            if self.pubsub.unsubscribe(channel, client):
+                return f'unsubscribed {channel}'
+            return f'error: not subscribed to {channel}'
+        else:
+            delivered = self.pubsub.publish(channel, parts[2])
+            return f'published to {delivered} subscribers'
+            
+    def stop_server(self, drain_timeout=0):
+        """Stop the server, draining connected clients for up to drain_timeout seconds"""
+        self.running = False
+        if self.server_socket:
+            try:
+                # Wakes the accept() blocked in start_server, close() alone does not
+                self.server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.server_socket.close()
+        if drain_timeout:
+            self.drain(drain_timeout)
+        # Whoever is still connected is cut off
+        with self.clients_lock:
+            sockets = list(self.clients)
+        for client_socket in sockets:
+            try:
+                client_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        print("Socket server stopped")
+    
+    def drain(self, timeout):
+        """Let every client finish the messages it is handling, flush its replies and disconnect.
+        
+        Closing the read side ends each client's loop at its next recv; no new
+        messages are read once the server is stopped.
+        """
+        with self.clients_lock:
+            sockets = list(self.clients)
+        for client_socket in sockets:
+            try:
+                client_socket.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+        deadline = time.monotonic() + timeout
+        while self.clients and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if self.clients:
+            print(f"{len(self.clients)} clients still connected after draining for {timeout}s")
+
+def create_server(engine='threaded', **options):
+    """SimpleSocketServer, or AsyncSocketServer for engine='asyncio'"""
+    if engine == 'asyncio':
+        from async_server import AsyncSocketServer
+        return AsyncSocketServer(**options)
+    return SimpleSocketServer(**options)
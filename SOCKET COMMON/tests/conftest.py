@@ -0,0 +1,55 @@
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+# The server modules are flat and import each other by name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import create_server
+
+@pytest.fixture
+def serve():
+    """Start a server on a free port in a background thread; returns (server, port)"""
+    servers = []
+
+    def start(engine='threaded', **options):
+        server = create_server(engine, host='127.0.0.1', port=0, **options)
+        threading.Thread(target=server.start_server, daemon=True).start()
+        deadline = time.monotonic() + 5
+        while not server.running and time.monotonic() < deadline:
+            time.sleep(0.01)
+        servers.append(server)
+        if engine == 'asyncio':
+            port = server._server.sockets[0].getsockname()[1]
+        else:
+            port = server.server_socket.getsockname()[1]
+        return server, port
+
+    yield start
+    for server in servers:
+        # Let handlers of the clients a test closed finish before the loop goes away
+        deadline = time.monotonic() + 5
+        while server.clients and time.monotonic() < deadline:
+            time.sleep(0.01)
+        server.stop_server()
+
+def connect(port, framing='line'):
+    """Client socket on the server, switched to the given framing"""
+    client = socket.create_connection(('127.0.0.1', port), timeout=5)
+    if framing != 'raw':
+        client.sendall(f'frame {framing}'.encode('utf-8'))
+        assert client.recv(16) == b'ok'
+    return client
+
+def read_lines(client, count):
+    data = b''
+    while data.count(b'\n') < count:
+        chunk = client.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return data.decode('utf-8').splitlines()
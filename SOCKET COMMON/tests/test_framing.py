@@ -0,0 +1,62 @@
+import pytest
+
+from conftest import connect, read_lines
+from framing import FrameError, create_framer
+
+@pytest.mark.parametrize('mode', ['line', 'length'])
+def test_round_trip_in_pieces(mode):
+    framer = create_framer(mode)
+    data = b''.join(framer.encode(payload) for payload in (b'first', b'', b'third message'))
+    # Fed one byte at a time, frames only come out once complete
+    frames = []
+    for index in range(len(data)):
+        framer.feed(data[index:index + 1])
+        frame = framer.next_frame()
+        while frame is not None:
+            frames.append(frame)
+            frame = framer.next_frame()
+    assert frames == [b'first', b'', b'third message']
+
+def test_line_framing_strips_carriage_returns():
+    framer = create_framer('line')
+    framer.feed(b'ping\r\npong')
+    assert framer.next_frame() == b'ping'
+    assert framer.next_frame() is None
+    assert framer.buffer == b'pong'
+
+def test_raw_framing_takes_whatever_arrived():
+    framer = create_framer('raw')
+    framer.feed(b'one two')
+    assert framer.next_frame() == b'one two'
+    assert framer.next_frame() is None
+
+@pytest.mark.parametrize('mode, data', [('line', b'x' * 11), ('length', b'\x00\x00\x00\x0b')])
+def test_oversized_frames_are_rejected(mode, data):
+    framer = create_framer(mode, max_frame_size=10)
+    framer.feed(data)
+    with pytest.raises(FrameError):
+        framer.next_frame()
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(FrameError):
+        create_framer('xml')
+
+@pytest.mark.parametrize('engine', ['threaded', 'asyncio'])
+def test_pipelined_requests_are_answered_in_order(serve, engine):
+    server, port = serve(engine)
+    client = connect(port)
+    client.sendall(b'ping\necho one\necho two\n')
+    assert read_lines(client, 3) == ['pong', 'one', 'two']
+    client.close()
+
+def test_frame_switch_keeps_buffered_messages(serve):
+    server, port = serve()
+    client = connect(port)
+    # The switch and a length-prefixed ping arrive in one packet
+    client.sendall(b'frame length\n' + create_framer('length').encode(b'ping'))
+    assert client.recv(3) == b'ok\n'
+    framer = create_framer('length')
+    while (frame := framer.next_frame()) is None:
+        framer.feed(client.recv(64))
+    assert frame == b'pong'
+    client.close()
@@ -0,0 +1,131 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from conftest import connect, read_lines
+from framing import create_framer
+from server import ClientConnection, Sender
+from pubsub import PubSubHub
+
+class FakeClient:
+    def __init__(self, accepts=True):
+        self.address = ('127.0.0.1', 0)
+        self.accepts = accepts
+        self.received = []
+        self.aborted = False
+
+    def offer(self, payload):
+        if self.accepts:
+            self.received.append(payload)
+        return self.accepts
+
+    def abort(self):
+        self.aborted = True
+
+def test_publish_reaches_every_subscriber_of_the_channel():
+    hub = PubSubHub()
+    first, second, other = FakeClient(), FakeClient(), FakeClient()
+    hub.subscribe('news', first)
+    hub.subscribe('news', second)
+    hub.subscribe('sport', other)
+
+    assert hub.publish('news', 'hello') == 2
+    assert first.received == second.received == [b'message news hello']
+    assert other.received == []
+
+def test_unsubscribe_all_drops_empty_channels():
+    hub = PubSubHub()
+    client = FakeClient()
+    hub.subscribe('a', client)
+    hub.subscribe('b', client)
+    hub.unsubscribe_all(client)
+    assert hub.channels == {}
+    assert not hub.unsubscribe('a', client)
+
+@pytest.mark.parametrize('policy', ['drop', 'disconnect'])
+def test_slow_consumer_policy(policy):
+    hub = PubSubHub(policy)
+    slow, fast = FakeClient(accepts=False), FakeClient()
+    hub.subscribe('news', slow)
+    hub.subscribe('news', fast)
+
+    assert hub.publish('news', 'hello') == 1
+    assert hub.dropped == 1
+    assert slow.aborted == (policy == 'disconnect')
+    assert (slow in hub.channels['news']) == (policy == 'drop')
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        PubSubHub('block')
+
+def test_offer_is_bounded_and_the_sender_flushes_the_rest():
+    local, peer = socket.socketpair()
+    local.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+    client = ClientConnection(local, ('peer', 0), create_framer('line'), max_queue=10, sender=Sender())
+
+    started = time.monotonic()
+    accepted = [client.offer(b'x' * 1000) for _ in range(200)]
+    # Offers never wait for the peer, a full buffer refuses them instead
+    assert time.monotonic() - started < 1
+    assert not accepted[-1]
+
+    lines = read_lines(peer, accepted.count(True))
+    assert lines == ['x' * 1000] * accepted.count(True)
+    client.finish(1)
+    assert not client._writing
+
+def test_replies_and_pushes_do_not_interleave():
+    local, peer = socket.socketpair()
+    client = ClientConnection(local, ('peer', 0), create_framer('line'), sender=Sender())
+
+    def push():
+        for index in range(200):
+            while not client.offer(f'push {index}'.encode('utf-8')):
+                time.sleep(0.001)
+
+    received = []
+    reader = threading.Thread(target=lambda: received.extend(read_lines(peer, 400)))
+    reader.start()
+    pusher = threading.Thread(target=push)
+    pusher.start()
+    for index in range(200):
+        client.send(f'reply {index}\n'.encode('utf-8'))
+    pusher.join()
+    reader.join(5)
+
+    lines = received
+    assert sorted(lines) == sorted([f'push {i}' for i in range(200)] + [f'reply {i}' for i in range(200)])
+    assert [line for line in lines if line.startswith('push')] == [f'push {i}' for i in range(200)]
+    assert [line for line in lines if line.startswith('reply')] == [f'reply {i}' for i in range(200)]
+
+@pytest.mark.parametrize('engine', ['threaded', 'asyncio'])
+def test_publish_over_the_server(serve, engine):
+    server, port = serve(engine)
+    subscriber = connect(port)
+    subscriber.sendall(b'subscribe news\n')
+    assert read_lines(subscriber, 1) == ['subscribed news']
+
+    publisher = connect(port)
+    publisher.sendall(b'publish news hello there\n')
+    assert read_lines(publisher, 1) == ['published to 1 subscribers']
+    assert read_lines(subscriber, 1) == ['message news hello there']
+    subscriber.close()
+    publisher.close()
+
+def test_idle_timeout_spares_subscribers(serve):
+    server, port = serve('asyncio', idle_timeout=0.2)
+    subscriber = connect(port)
+    subscriber.sendall(b'subscribe news\n')
+    assert read_lines(subscriber, 1) == ['subscribed news']
+    idle = connect(port)
+
+    time.sleep(0.6)
+    # The silent client was disconnected, the subscriber still gets pushes
+    assert idle.recv(16) == b''
+    publisher = connect(port)
+    publisher.sendall(b'publish news still here\n')
+    assert read_lines(subscriber, 1) == ['message news still here']
+    for client in (subscriber, idle, publisher):
+        client.close()
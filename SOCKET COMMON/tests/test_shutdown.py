@@ -0,0 +1,31 @@
+import threading
+import time
+
+import pytest
+
+from conftest import connect, read_lines
+from server import create_server
+
+@pytest.mark.parametrize('engine', ['threaded', 'asyncio'])
+@pytest.mark.parametrize('drain_timeout', [0, 1])
+def test_stop_with_a_client_connected(engine, drain_timeout):
+    server = create_server(engine, host='127.0.0.1', port=0)
+    thread = threading.Thread(target=server.start_server, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not server.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    port = (server._server.sockets[0] if engine == 'asyncio' else server.server_socket).getsockname()[1]
+
+    client = connect(port)
+    client.sendall(b'ping\n')
+    assert read_lines(client, 1) == ['pong']
+
+    started = time.monotonic()
+    server.stop_server(drain_timeout)
+    # The connected client is disconnected rather than holding up the shutdown
+    assert client.recv(16) == b''
+    thread.join(5)
+    assert not thread.is_alive()
+    assert time.monotonic() - started < drain_timeout + 2
+    client.close()
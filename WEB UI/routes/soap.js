@@ -130,6 +130,51 @@ router.get('/todos', async (req, res) => {
     }
 });
 
+//ANCHOR Get changes since a version (poll with the returned version instead of re-fetching all todos)
+function toTodo(todo) {
+    return {
+        id: parseInt(todo.id),
+        title: todo.title,
+        description: todo.description,
+        completed: todo.completed === 'true'
+    };
+}
+
+function asArray(value) {
+    if (!value) {
+        return [];
+    }
+    return Array.isArray(value) ? value : [value];
+}
+
+router.get('/todos/changes', async (req, res) => {
+    try {
+        const since = req.query.since ? `<tns:since_version>${parseInt(req.query.since)}</tns:since_version>` : '';
+        const limit = req.query.limit ? `<tns:limit>${parseInt(req.query.limit)}</tns:limit>` : '';
+        const soapBody = `<tns:get_changes>${since}${limit}</tns:get_changes>`;
+        const parsedResult = await makeSoapRequest(soapBody, 'get_changes');
+        const result = parsedResult.Envelope.Body.get_changesResponse.get_changesResult;
+        
+        res.json({
+            success: result.success === 'true',
+            message: result.message,
+            version: result.version,
+            snapshot: result.snapshot === 'true',
+            hasMore: result.has_more === 'true',
+            todos: asArray(result.todos && result.todos.Todo).map(toTodo),
+            changes: asArray(result.changes && result.changes.TodoChange).map(change => ({
+                version: change.version,
+                operation: change.operation,
+                id: parseInt(change.todo_id),
+                todo: change.todo ? toTodo(change.todo) : null
+            }))
+        });
+    } catch (error) {
+        console.error('SOAP get_changes error:', error);
+        res.status(500).json({ success: false, error: error.message });
+    }
+});
+
 //ANCHOR Get todo by ID
 router.get('/todos/:id', async (req, res) => {
     try {
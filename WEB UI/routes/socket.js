@@ -222,4 +222,101 @@ router.post('/echo', async (req, res) => {
     }
 });
 
+//ANCHOR Send several messages pipelined over one connection
+router.post('/batch', async (req, res) => {
+    try {
+        const { messages } = req.body;
+        
+        if (!Array.isArray(messages) || messages.length === 0) {
+            return res.status(400).json({ success: false, error: 'Messages array is required' });
+        }
+        if (messages.some(message => typeof message !== 'string' || message.includes('\n'))) {
+            return res.status(400).json({ success: false, error: 'Messages must be single-line strings' });
+        }
+        
+        const client = new net.Socket();
+        
+        const batchPromise = new Promise((resolve, reject) => {
+            const timeout = setTimeout(() => {
+                client.destroy();
+                reject(new Error('Batch timeout'));
+            }, 10000);
+            
+            let switched = false;
+            let buffer = '';
+            const responses = [];
+            
+            client.connect(SOCKET_PORT, SOCKET_HOST, () => {
+                // Switch this connection to newline framing before pipelining
+                client.write('frame line\n');
+            });
+            
+            client.on('data', (data) => {
+                buffer += data.toString();
+                
+                if (!switched) {
+                    if (!buffer.startsWith('ok')) {
+                        clearTimeout(timeout);
+                        client.destroy();
+                        reject(new Error('Server does not support framing: ' + buffer));
+                        return;
+                    }
+                    switched = true;
+                    buffer = buffer.replace(/^ok\n?/, '');
+                    client.write(messages.join('\n') + '\n');
+                }
+                
+                let newline;
+                while ((newline = buffer.indexOf('\n')) >= 0) {
+                    responses.push(buffer.slice(0, newline));
+                    buffer = buffer.slice(newline + 1);
+                }
+                
+                if (responses.length >= messages.length) {
+                    clearTimeout(timeout);
+                    client.destroy();
+                    resolve(responses);
+                }
+            });
+            
+            client.on('error', (err) => {
+                clearTimeout(timeout);
+                reject(err);
+            });
+        });
+        
+        const responses = await batchPromise;
+        const timestamp = new Date().toISOString();
+        const results = messages.map((message, i) => ({
+            message: message,
+            response: responses[i]
+        }));
+        
+        results.forEach((result, i) => {
+            messageHistory.unshift({
+                id: Date.now() + i,
+                message: result.message,
+                response: result.response,
+                timestamp: timestamp,
+                client_info: req.ip || 'unknown'
+            });
+        });
+        messageHistory = messageHistory.slice(0, 50);
+        
+        res.json({
+            success: true,
+            message_count: results.length,
+            results: results,
+            timestamp: timestamp
+        });
+        
+    } catch (error) {
+        console.error('Socket batch error:', error);
+        res.status(500).json({ 
+            success: false, 
+            error: 'Batch failed: ' + error.message 
+        });
+    }
+});
+
 module.exports = router;
\ No newline at end of file